@@ -0,0 +1,99 @@
+"""Shared helpers for the benchmark scripts."""
+
+import random
+import resource
+import socket
+import subprocess
+import sys
+import time
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from pathlib import Path
+
+import chess
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Knight moves that return to the start position, so a connection can keep
+# playing legal moves for as long as a benchmark needs.
+SHUFFLE = ('g1-f3', 'g8-f6', 'f3-g1', 'f6-g8')
+
+
+def free_port() -> int:
+    """Return a TCP port that is currently free on localhost."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def raise_fd_limit() -> int:
+    """Raise the soft open-files limit to the hard limit and return it."""
+    _, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    return hard
+
+
+def percentile(samples: Sequence[float], pct: float) -> float:
+    """Return the nearest-rank percentile of an unsorted sample list."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def proc_status(pid: int) -> dict[str, int]:
+    """Return thread count and resident memory (KiB) of a Linux process."""
+    status: dict[str, int] = {}
+    for line in Path(f'/proc/{pid}/status').read_text(encoding='utf-8').splitlines():
+        key, _, value = line.partition(':')
+        if key in {'Threads', 'VmRSS'}:
+            status[key] = int(value.split()[0])
+    return status
+
+
+@contextmanager
+def spawn_server(*args: str) -> Iterator[tuple[subprocess.Popen[bytes], int]]:
+    """Run `chess_server` in a subprocess and yield it with its port."""
+    port = free_port()
+    cmd = [sys.executable, '-m', 'src.cli.chess_server', '-p', str(port), *args]
+    proc = subprocess.Popen(cmd, cwd=ROOT, stderr=subprocess.DEVNULL)  # noqa: S603
+    try:
+        deadline = time.monotonic() + 10.0
+        while True:
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline or proc.poll() is not None:
+                    raise
+                time.sleep(0.05)
+        yield proc, port
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def random_games(count: int, seed: int = 0, max_plies: int = 120) -> list[list[str]]:
+    """
+    Return reproducible random legal games as lists of `a2-a4` style moves.
+
+    Promotions cannot be expressed in the text protocol, so they are never
+    chosen; a game ends early once only promotions (or no moves) are left.
+    """
+    rng = random.Random(seed)  # noqa: S311
+    games = []
+    for _ in range(count):
+        board = chess.Board()
+        moves: list[str] = []
+        while len(moves) < max_plies:
+            legal = [m for m in board.legal_moves if m.promotion is None]
+            if not legal:
+                break
+            move = rng.choice(legal)
+            moves.append(
+                f'{chess.square_name(move.from_square)}-{chess.square_name(move.to_square)}'
+            )
+            board.push(move)
+        games.append(moves)
+    return games
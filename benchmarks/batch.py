@@ -0,0 +1,88 @@
+"""
+Compare move throughput of the scalar path and the batched bitboard engine.
+
+The same random games are played move by move on one `GameBoard` each
+through `process_line`, and in lockstep on `BatchBoards`, one move of every
+game per `process_batch` call, at each batch size. Every batched reply is
+checked against the scalar one. Rounds alternate between the two.
+
+    python -m benchmarks.batch --games 4096 --rounds 3
+"""
+
+import statistics
+import time
+from typing import Annotated
+
+import chess
+import typer
+
+from benchmarks._support import random_games
+from src.protocol.batch import BatchBoards, process_batch
+from src.protocol.board import GameBoard
+from src.protocol.core import GameOver, process_line
+
+app = typer.Typer(add_completion=False)
+
+
+def _scalar(corpus: list[list[str]]) -> tuple[float, list[list[tuple[str, bool]]]]:
+    replies = []
+    start = time.perf_counter()
+    for game in corpus:
+        board, answers = GameBoard(), []
+        for line in game:
+            try:
+                answers.append((process_line(board, line), False))
+            except GameOver as exc:
+                answers.append((str(exc), True))
+        replies.append(answers)
+    return time.perf_counter() - start, replies
+
+
+def _batched(corpus: list[list[str]], size: int) -> tuple[float, list[list[tuple[str, bool]]]]:
+    replies: list[list[tuple[str, bool]]] = [[] for _ in corpus]
+    start = time.perf_counter()
+    for first in range(0, len(corpus), size):
+        games = corpus[first : first + size]
+        boards = BatchBoards(len(games))
+        for ply in range(max(map(len, games))):
+            playing = [game for game, moves in enumerate(games) if ply < len(moves)]
+            lines = [games[game][ply] for game in playing]
+            for game, reply in zip(playing, process_batch(boards, playing, lines), strict=True):
+                replies[first + game].append(reply)
+    return time.perf_counter() - start, replies
+
+
+@app.command()
+def main(
+    games: Annotated[int, typer.Option(help='Random games in the corpus.')] = 4096,
+    sizes: Annotated[str, typer.Option(help='Comma-separated batch sizes.')] = '16,256,4096',
+    rounds: Annotated[int, typer.Option(help='Rounds on each path.')] = 3,
+) -> None:
+    """Print the median time per move of each path, and the speedup."""
+    corpus = random_games(games, seed=25)
+    moves = sum(map(len, corpus))
+    batch_sizes = [int(size) for size in sizes.split(',')]
+    scalar: list[float] = []
+    batched: dict[int, list[float]] = {size: [] for size in batch_sizes}
+    for _ in range(rounds):
+        elapsed, expected = _scalar(corpus)
+        scalar.append(elapsed)
+        for size in batch_sizes:
+            elapsed, replies = _batched(corpus, size)
+            if replies != expected:
+                msg = f'batch size {size} disagrees with process_line'
+                raise RuntimeError(msg)
+            batched[size].append(elapsed)
+
+    scalar_us = statistics.median(scalar) / moves * 1e6
+    typer.echo(f'batch scalar games={games} moves={moves} us_per_move={scalar_us:.2f}')
+    for size, timings in batched.items():
+        batch_us = statistics.median(timings) / moves * 1e6
+        typer.echo(
+            f'batch size={size} us_per_move={batch_us:.2f} speedup={scalar_us / batch_us:.2f}x'
+        )
+    typer.echo(f'python-chess {chess.__version__}')
+
+
+if __name__ == '__main__':
+    app()
@@ -0,0 +1,173 @@
+"""
+Soak a server with churning clients and watch its threads and memory.
+
+`--clients` loops run for `--duration` seconds, each connecting over and
+over and behaving, at random, like one of:
+
+- play: plays a few moves and disconnects cleanly
+- abort: sends a move and resets the connection without reading the reply
+- stall: sends half a line and waits for the server to time it out
+- idle: sends nothing and waits for the server to time it out
+
+The server runs with short timeouts so the stalled and idle connections
+are reaped within the run. Its thread count and resident memory are
+sampled every `--sample-every` seconds; after the warm-up sample both should
+stay flat however long the soak lasts (a 24-hour run is `--duration
+86400`). The summary gives the samples' first, last and highest values,
+and the whole series goes to `--output` as JSON.
+
+    python -m benchmarks.churn --duration 120 --clients 100
+    python -m benchmarks.churn --engine asyncio --duration 86400 -o soak.json
+"""
+
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Annotated
+
+import typer
+
+from benchmarks._support import SHUFFLE, proc_status, raise_fd_limit, spawn_server
+from src.validation import Engine
+
+app = typer.Typer(add_completion=False)
+
+BEHAVIOURS = ('play', 'abort', 'stall', 'idle')
+WEIGHTS = (70, 10, 10, 10)
+BUSY = b'Server is busy, try again later\n\n'
+
+
+async def _play(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, moves: int) -> None:
+    for i in range(moves):
+        writer.write(f'{SHUFFLE[i % len(SHUFFLE)]}\n'.encode())
+        if await reader.readuntil(b'\n\n') == BUSY:
+            raise ConnectionRefusedError
+    writer.close()
+
+
+async def _until_closed(reader: asyncio.StreamReader, wait: float) -> None:
+    """Wait for the server to close the connection, up to `wait` seconds."""
+    async with asyncio.timeout(wait):
+        while await reader.read(4096):
+            pass
+
+
+async def _churn(port: int, deadline: float, seed: int, wait: float, seen: Counter) -> None:
+    rng = random.Random(seed)  # noqa: S311
+    while time.monotonic() < deadline:
+        behaviour = rng.choices(BEHAVIOURS, WEIGHTS)[0]
+        try:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        except OSError:
+            seen['connect error'] += 1
+            await asyncio.sleep(0.1)
+            continue
+        try:
+            if behaviour == 'play':
+                await _play(reader, writer, rng.randint(1, 8))
+            elif behaviour == 'abort':
+                writer.write(b'e2-e4\n')
+                await writer.drain()
+                writer.transport.abort()
+            elif behaviour == 'stall':
+                writer.write(b'e2-')
+                await _until_closed(reader, wait)
+            else:
+                await _until_closed(reader, wait)
+            seen[behaviour] += 1
+        except ConnectionRefusedError:
+            seen['busy'] += 1
+        except TimeoutError:
+            seen[f'{behaviour} not reaped'] += 1
+        except OSError, asyncio.IncompleteReadError:
+            seen[f'{behaviour} error'] += 1
+        finally:
+            writer.close()
+
+
+async def _sample(pid: int, deadline: float, every: float, samples: list[dict]) -> None:
+    start = time.monotonic()
+    while True:
+        status = proc_status(pid)
+        samples.append(
+            {
+                'elapsed_s': round(time.monotonic() - start, 1),
+                'threads': status['Threads'],
+                'rss_kib': status['VmRSS'],
+            }
+        )
+        if time.monotonic() + every > deadline:
+            return
+        await asyncio.sleep(every)
+
+
+async def _soak(
+    pid: int, port: int, clients: int, duration: float, *, every: float, wait: float
+) -> tuple[Counter, list[dict]]:
+    deadline = time.monotonic() + duration
+    seen: Counter[str] = Counter()
+    samples: list[dict] = []
+    await asyncio.gather(
+        _sample(pid, deadline, every, samples),
+        *(_churn(port, deadline, seed, wait, seen) for seed in range(clients)),
+    )
+    return seen, samples
+
+
+@app.command()
+def main(
+    *,
+    duration: Annotated[float, typer.Option(help='Seconds of churn.')] = 60.0,
+    clients: Annotated[int, typer.Option(help='Concurrent churning clients.')] = 50,
+    engine: Annotated[Engine, typer.Option(help='Server engine.')] = Engine.THREADED,
+    max_connections: Annotated[int, typer.Option(help='Server connection limit.')] = 1024,
+    idle_timeout: Annotated[float, typer.Option(help='Server idle timeout.')] = 2.0,
+    read_timeout: Annotated[float, typer.Option(help='Server read timeout.')] = 1.0,
+    sample_every: Annotated[float, typer.Option(help='Seconds between samples.')] = 5.0,
+    output: Annotated[
+        Path | None, typer.Option('--output', '-o', help='Write the samples as JSON here.')
+    ] = None,
+) -> None:
+    """Print connection outcomes and the server's threads and memory."""
+    raise_fd_limit()
+    server_args = (
+        f'--engine={engine}',
+        f'--max-connections={max_connections}',
+        f'--idle-timeout={idle_timeout}',
+        f'--read-timeout={read_timeout}',
+    )
+    # Clients wait for the reaper a little longer than it may take.
+    wait = max(idle_timeout, read_timeout) + 5.0
+    with spawn_server(*server_args) as (proc, port):
+        seen, samples = asyncio.run(
+            _soak(proc.pid, port, clients, duration, every=sample_every, wait=wait)
+        )
+
+    # The first sample is taken before any client connected.
+    warm = samples[1:] or samples
+    result = {
+        'engine': str(engine),
+        'clients': clients,
+        'duration_s': duration,
+        'outcomes': dict(sorted(seen.items())),
+        **{
+            f'{key}_{name}': value
+            for key in ('threads', 'rss_kib')
+            for name, value in (
+                ('first', warm[0][key]),
+                ('last', warm[-1][key]),
+                ('max', max(sample[key] for sample in warm)),
+            )
+        },
+    }
+    typer.echo(' '.join(f'{key}={value}' for key, value in result.items()))
+    if output is not None:
+        result['samples'] = samples
+        output.write_text(json.dumps(result, indent=2) + '\n', encoding='utf-8')
+
+
+if __name__ == '__main__':
+    app()
@@ -0,0 +1,83 @@
+"""
+Compare the text and binary protocols on a corpus of random games.
+
+Reports bytes on the wire in each direction and the time to encode and
+decode every request and reply of the corpus.
+
+    python -m benchmarks.codec --games 500
+"""
+
+import io
+import time
+from typing import Annotated
+
+import chess
+import typer
+
+from benchmarks._support import random_games
+from src.client.codec import encode_binary, encode_text, read_frame, read_message
+from src.protocol import describe_move, play_move
+from src.protocol.binary import FrameDecoder, Opcode, decode_move, encode_event, encode_frame
+from src.server.session import encode_reply
+
+app = typer.Typer(add_completion=False)
+
+
+def _events(games: list[list[str]]) -> list:
+    events = []
+    for game in games:
+        board = chess.Board()
+        events += [play_move(board, chess.Move.from_uci(m.replace('-', ''))) for m in game]
+    return events
+
+
+def _timed(func: object, *args: object) -> tuple[object, float]:
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+@app.command()
+def main(games: Annotated[int, typer.Option(help='Random games in the corpus.')] = 500) -> None:
+    """Print wire size and codec time for each protocol."""
+    corpus = random_games(games)
+    lines = [move for game in corpus for move in game]
+    events = _events(corpus)
+
+    def text_encode() -> tuple[bytes, bytes]:
+        requests = b''.join(encode_text(line) for line in lines)
+        return requests, b''.join(encode_reply(describe_move(e)) for e in events)
+
+    def binary_encode() -> tuple[bytes, bytes]:
+        requests = b''.join(encode_binary(line) for line in lines)
+        return requests, b''.join(encode_frame(Opcode.EVENT, encode_event(e)) for e in events)
+
+    def text_decode(requests: bytes, replies: bytes) -> None:
+        for raw in requests.splitlines():
+            chess.Move.from_uci(raw.decode().replace('-', ''))
+        fh = io.StringIO(replies.decode())
+        while read_message(fh):
+            pass
+
+    def binary_decode(requests: bytes, replies: bytes) -> None:
+        for _, payload in FrameDecoder().feed(requests):
+            decode_move(payload)
+        fh = io.BytesIO(replies)
+        while read_frame(fh):
+            pass
+
+    for name, encode, decode in (
+        ('text', text_encode, text_decode),
+        ('binary', binary_encode, binary_decode),
+    ):
+        (requests, replies), encode_time = _timed(encode)
+        _, decode_time = _timed(decode, requests, replies)
+        typer.echo(
+            f'{name:<7} moves={len(lines)} request_bytes={len(requests)} '
+            f'reply_bytes={len(replies)} encode_ms={encode_time * 1000:.1f} '
+            f'decode_ms={decode_time * 1000:.1f}'
+        )
+
+
+if __name__ == '__main__':
+    app()
@@ -0,0 +1,60 @@
+"""
+Measure move message formatting against the original from-scratch version.
+
+Collects the move events of random legal games, which include captures,
+castling, en passant and checks, then formats all of them with both
+implementations and checks that the messages are identical.
+
+    python -m benchmarks.describe --games 500 --rounds 5
+"""
+
+import time
+from collections.abc import Callable
+from typing import Annotated
+
+import chess
+import typer
+
+from benchmarks._support import random_games
+from src.protocol.core import MoveEvent, describe_move, play_move
+from tests.unit.test_protocol import reference_describe_move
+
+app = typer.Typer(add_completion=False)
+
+
+def _events(games: int) -> list[MoveEvent]:
+    events = []
+    for game in random_games(games, seed=2):
+        board = chess.Board()
+        events.extend(play_move(board, chess.Move.from_uci(move.replace('-', ''))) for move in game)
+    return events
+
+
+def _rate(func: Callable[[MoveEvent], str], events: list[MoveEvent], rounds: int) -> float:
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for event in events:
+            func(event)
+        best = min(best, time.perf_counter() - start)
+    return len(events) / best
+
+
+@app.command()
+def main(
+    games: Annotated[int, typer.Option(help='Random games whose moves are formatted.')] = 500,
+    rounds: Annotated[int, typer.Option(help='Passes over the moves; the best counts.')] = 5,
+) -> None:
+    """Print formatted moves/sec for both implementations."""
+    events = _events(games)
+    mismatches = sum(describe_move(event) != reference_describe_move(event) for event in events)
+    before = _rate(reference_describe_move, events, rounds)
+    after = _rate(describe_move, events, rounds)
+    typer.echo(
+        f'describe moves={len(events)} mismatches={mismatches} '
+        f'before_moves_s={before:.0f} after_moves_s={after:.0f} speedup={after / before:.2f}x'
+    )
+
+
+if __name__ == '__main__':
+    app()
@@ -0,0 +1,78 @@
+"""
+Measure move broadcast cost with many spectators, some of them stalled.
+
+Seats `--spectators` in-process sessions on one game, a `--stalled` share
+of which never drain their queues, then plays `--moves` moves and records
+the mover's per-move latency. Publishing only appends to bounded queues, so
+the latency should stay flat however far the stalled spectators fall behind.
+
+    python -m benchmarks.fanout --spectators 10000 --stalled 0.1
+"""
+
+import time
+from itertools import cycle
+from typing import Annotated
+
+import typer
+from loguru import logger
+
+from benchmarks._support import percentile
+from src.server.fanout import Fanout, Policy
+from src.server.games import GameRegistry
+from src.server.session import Session
+
+app = typer.Typer(add_completion=False)
+
+# Knight shuffles that never end the game.
+_MOVES = ('g1-f3', 'g8-f6', 'f3-g1', 'f6-g8')
+
+
+@app.command()
+def main(
+    spectators: Annotated[int, typer.Option(help='Spectators watching the game.')] = 10_000,
+    stalled: Annotated[float, typer.Option(help='Share of spectators that never read.')] = 0.1,
+    moves: Annotated[int, typer.Option(help='Moves played.')] = 1_000,
+    queue: Annotated[int, typer.Option(help='Per-subscriber queue limit.')] = 256,
+    policy: Annotated[Policy, typer.Option(help='Overflow policy.')] = Policy.DROP,
+) -> None:
+    """Print the mover's publish latency and the broadcasts dropped."""
+    logger.remove()
+    registry = GameRegistry()
+    fanout = Fanout(queue, policy)
+    white, black = Session(registry), Session(registry)
+    for player in (white, black):
+        player.subscriber = fanout.subscribe(lambda: None)
+    white.handle('start_game')
+    game_id = white.game.game_id
+    black.handle(f'join_game {game_id}')
+
+    watchers = []
+    for _ in range(spectators):
+        watcher = Session(registry)
+        watcher.subscriber = fanout.subscribe(lambda: None)
+        watcher.handle(f'join_game {game_id}')
+        watchers.append(watcher)
+    active = watchers[int(spectators * stalled) :]
+
+    latencies = []
+    players = cycle((white, black))
+    for move in cycle(_MOVES):
+        if len(latencies) == moves:
+            break
+        start = time.perf_counter()
+        next(players).handle(move)
+        latencies.append(time.perf_counter() - start)
+        for watcher in active:
+            watcher.subscriber.drain()
+
+    dropped = sum(watcher.subscriber.dropped for watcher in watchers)
+    closed = sum(watcher.subscriber.closed for watcher in watchers)
+    typer.echo(
+        f'fanout spectators={spectators} stalled={spectators - len(active)} '
+        f'publish_p50_ms={percentile(latencies, 50) * 1000:.2f} '
+        f'publish_p99_ms={percentile(latencies, 99) * 1000:.2f} dropped={dropped} closed={closed}'
+    )
+
+
+if __name__ == '__main__':
+    app()
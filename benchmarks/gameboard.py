@@ -0,0 +1,54 @@
+"""
+Measure per-move CPU of full-game replays on a plain and a caching board.
+
+Replays random legal games through `play_move`, which checks legality,
+describes the move, pushes it and tests for check and mate, once on
+`chess.Board` and once on `GameBoard`.
+
+    python -m benchmarks.gameboard --games 300 --rounds 5
+"""
+
+import time
+from typing import Annotated
+
+import chess
+import typer
+
+from benchmarks._support import random_games
+from src.protocol import GameBoard, play_move
+
+app = typer.Typer(add_completion=False)
+
+
+def _replay(board_type: type[chess.Board], games: list[list[chess.Move]], rounds: int) -> float:
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.process_time()
+        for moves in games:
+            board = board_type()
+            for move in moves:
+                play_move(board, move)
+        best = min(best, time.process_time() - start)
+    return best / sum(map(len, games)) * 1e6
+
+
+@app.command()
+def main(
+    games: Annotated[int, typer.Option(help='Random games replayed.')] = 300,
+    rounds: Annotated[int, typer.Option(help='Replays per board; the best counts.')] = 5,
+) -> None:
+    """Print CPU microseconds per move for each board."""
+    moves = [
+        [chess.Move.from_uci(move.replace('-', '')) for move in game]
+        for game in random_games(games, seed=3)
+    ]
+    plain = _replay(chess.Board, moves, rounds)
+    cached = _replay(GameBoard, moves, rounds)
+    typer.echo(
+        f'gameboard moves={sum(map(len, moves))} chess_board_us={plain:.2f} '
+        f'game_board_us={cached:.2f} speedup={plain / cached:.2f}x'
+    )
+
+
+if __name__ == '__main__':
+    app()
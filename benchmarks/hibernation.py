@@ -0,0 +1,89 @@
+"""
+Measure the latency of a request to a hibernated game against a resident one.
+
+Plays `--games` random games to `--plies` half-moves in in-process
+sessions, hibernates them all, then plays the next move of each twice over:
+on a second set of sessions that stayed resident, and on the hibernated
+ones, which first read their game back from the segment file. The
+difference between the two is the cost of rehydration; the raw `put` and
+`take` of the store are timed as well.
+
+    python -m benchmarks.hibernation --games 5000 --plies 60
+"""
+
+import time
+from collections.abc import Callable
+from typing import Annotated
+
+import typer
+from loguru import logger
+
+from benchmarks._support import percentile, random_games
+from src.server.games import GameRegistry
+from src.server.hibernation import HibernationStore
+from src.server.session import Session
+
+app = typer.Typer(add_completion=False)
+
+
+def _sessions(registry: GameRegistry, games: list[list[str]]) -> list[Session]:
+    sessions = []
+    for moves in games:
+        session = Session(registry)
+        session.feed(''.join(f'{move}\n' for move in moves[:-1]).encode())
+        sessions.append(session)
+    return sessions
+
+
+def _latencies(calls: list[Callable[[], object]]) -> list[float]:
+    latencies = []
+    for call in calls:
+        start = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def _format(name: str, latencies: list[float]) -> str:
+    p50, p99 = (percentile(latencies, pct) * 1e6 for pct in (50, 99))
+    return f'{name}_p50_us={p50:.1f} {name}_p99_us={p99:.1f}'
+
+
+@app.command()
+def main(
+    games: Annotated[int, typer.Option(min=1, help='Games hibernated and woken.')] = 5000,
+    plies: Annotated[int, typer.Option(min=1, help='Half-moves played before hibernating.')] = 60,
+) -> None:
+    """Print request latencies for resident and hibernated games."""
+    logger.remove()
+    corpus = [
+        game for game in random_games(games * 2, seed=3, max_plies=plies + 1) if len(game) > plies
+    ][:games]
+    store = HibernationStore()
+    registry = GameRegistry(max_games=len(corpus) * 2, hibernation=store, hibernate_after=1)
+
+    sleeping = _sessions(registry, corpus)
+    registry.hibernate_idle(now=time.monotonic() + 2)
+    resident = _sessions(registry, corpus)
+    size = store.size
+
+    warm = _latencies(
+        [lambda s=s, g=g: s.handle(g[-1]) for s, g in zip(resident, corpus, strict=True)]
+    )
+    cold = _latencies(
+        [lambda s=s, g=g: s.handle(g[-1]) for s, g in zip(sleeping, corpus, strict=True)]
+    )
+    states = [session.game.state for session in sleeping]
+    put = _latencies([lambda i=i, s=s: store.put(str(i), s) for i, s in enumerate(states)])
+    take = _latencies([lambda i=i: store.take(str(i)) for i in range(len(states))])
+    store.close()
+
+    typer.echo(
+        f'hibernation games={len(corpus)} plies={plies} segment_bytes={size} '
+        f'{_format("resident", warm)} {_format("rehydrate", cold)} '
+        f'{_format("put", put)} {_format("take", take)}'
+    )
+
+
+if __name__ == '__main__':
+    app()
@@ -0,0 +1,78 @@
+"""
+Measure the move throughput cost of journaling shared games.
+
+Plays the same shared games through in-process sessions with and without a
+journal, alternating short rounds between the two so that background noise
+hits both alike, and compares the median and mean time per move. The
+journaled rounds include the writer thread's group commits, which the mean
+accounts for in full.
+
+    python -m benchmarks.journal --games 100 --rounds 200
+"""
+
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Annotated
+
+import typer
+from loguru import logger
+
+from benchmarks._support import SHUFFLE
+from src.server.games import GameRegistry, open_registry
+from src.server.journal import FSYNC_INTERVAL
+from src.server.session import Session
+
+app = typer.Typer(add_completion=False)
+
+type Turns = list[tuple[Session, str]]
+
+
+def _seat_games(registry: GameRegistry, games: int) -> Turns:
+    turns = []
+    for _ in range(games):
+        white, black = Session(registry), Session(registry)
+        white.handle('start_game')
+        black.handle(f'join_game {white.game.game_id}')
+        turns += zip((white, black, white, black), SHUFFLE, strict=True)
+    return turns
+
+
+def _round(turns: Turns) -> float:
+    start = time.perf_counter()
+    for session, move in turns:
+        session.handle(move)
+    return (time.perf_counter() - start) / len(turns)
+
+
+@app.command()
+def main(
+    games: Annotated[int, typer.Option(help='Shared games played.')] = 100,
+    rounds: Annotated[int, typer.Option(help='Rounds of four moves per game.')] = 200,
+    interval: Annotated[float, typer.Option(help='Journal fsync interval.')] = FSYNC_INTERVAL,
+) -> None:
+    """Print the time per move with and without a journal."""
+    logger.remove()
+    plain_turns = _seat_games(GameRegistry(), games)
+    plain, journaled = [], []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'games.journal'
+        with open_registry(journal_path=path, fsync_interval=interval) as registry:
+            journal_turns = _seat_games(registry, games)
+            for _ in range(rounds):
+                journaled.append(_round(journal_turns))
+                plain.append(_round(plain_turns))
+
+    for name, average in (('median', statistics.median), ('mean', statistics.mean)):
+        plain_us = average(plain) * 1e6
+        journaled_us = average(journaled) * 1e6
+        typer.echo(
+            f'journal games={games} {name} plain_us_per_move={plain_us:.2f} '
+            f'journaled_us_per_move={journaled_us:.2f} '
+            f'overhead_pct={(journaled_us / plain_us - 1) * 100:.1f}'
+        )
+
+
+if __name__ == '__main__':
+    app()
@@ -0,0 +1,164 @@
+"""
+Drive a chess server with concurrent connections replaying whole games.
+
+Each of `--connections` connections takes the next game from a shared pool
+(game files, or random legal games), plays it line by line in lock-step on
+a fresh connection, then moves on to the next game until `--games` games
+are done. With `--rate` the moves are paced open-loop: every connection
+sends on a fixed schedule and latency is measured from the scheduled send
+time, so a stalled server shows up as latency instead of silently slowing
+the generator down (coordinated omission). Without it connections send as
+fast as replies come back.
+
+The server is started on a free port unless `--port` points at one that is
+already running; `--server-arg` passes options to a started server.
+
+    python -m benchmarks.loadgen --connections 50 --games 500 --rate 5000
+    python -m benchmarks.loadgen --port 2000 --game-file games/ -o load.json
+"""
+
+import asyncio
+import json
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Annotated
+
+import typer
+
+from benchmarks._support import percentile, raise_fd_limit, random_games, spawn_server
+from src.cli.chess_validate import iter_game_files
+from src.protocol.replay import REJECTIONS
+
+app = typer.Typer(add_completion=False)
+
+REPLY_END = b'\n\n'
+
+
+class Load:
+    """What the connections observed, shared by all of them."""
+
+    def __init__(self, games: list[list[str]], rate: float, connections: int) -> None:
+        """Replay `games` at `rate` moves/sec in total, or unpaced if 0."""
+        self.games = iter(games)
+        self.interval = connections / rate if rate else 0.0
+        self.latencies: list[float] = []
+        self.errors: Counter[str] = Counter()
+        self.games_done = 0
+
+
+async def _connection(host: str, port: int, load: Load) -> None:
+    next_send = time.perf_counter()
+    for game in load.games:
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+        except OSError as exc:
+            load.errors[f'connect: {exc.strerror or exc}'] += 1
+            continue
+        try:
+            for line in game:
+                if load.interval:
+                    next_send = max(next_send + load.interval, time.perf_counter() - 1.0)
+                    await asyncio.sleep(next_send - time.perf_counter())
+                    start = next_send
+                else:
+                    start = time.perf_counter()
+                writer.write(f'{line}\n'.encode())
+                reply = (await reader.readuntil(REPLY_END))[: -len(REPLY_END)].decode()
+                load.latencies.append(time.perf_counter() - start)
+                if reply in REJECTIONS:
+                    load.errors[reply] += 1
+                if reply.endswith('wins'):
+                    break
+            load.games_done += 1
+        except (OSError, asyncio.IncompleteReadError) as exc:
+            load.errors[f'connection: {type(exc).__name__}'] += 1
+        finally:
+            writer.close()
+
+
+async def run_load(
+    host: str,
+    port: int,
+    games: list[list[str]],
+    connections: int,
+    rate: float = 0.0,
+) -> dict[str, object]:
+    """Replay `games` over `connections` connections and summarize the run."""
+    load = Load(games, rate, connections)
+    start = time.perf_counter()
+    await asyncio.gather(*(_connection(host, port, load) for _ in range(connections)))
+    elapsed = time.perf_counter() - start
+    moves = len(load.latencies)
+    return {
+        'connections': connections,
+        'target_rate': rate,
+        'games': load.games_done,
+        'moves': moves,
+        'elapsed_s': round(elapsed, 3),
+        'moves_per_s': round(moves / elapsed, 1) if elapsed else 0.0,
+        **{
+            f'p{pct}_ms': round(percentile(load.latencies, pct) * 1000, 3)
+            for pct in (50, 95, 99, 100)
+        },
+        'errors': dict(load.errors),
+    }
+
+
+def load_games(paths: list[Path], count: int, seed: int) -> list[list[str]]:
+    """Return the lines of every game file under `paths`, or random games."""
+    if not paths:
+        return random_games(count, seed=seed)
+    games = []
+    for path in iter_game_files(paths):
+        lines = path.read_text(encoding='utf-8', errors='replace').splitlines()
+        games.append([line.strip() for line in lines if line.strip()])
+    # Cycle through the files until there are enough games.
+    return [games[i % len(games)] for i in range(count)] if games else []
+
+
+@contextmanager
+def _target(port: int, server_args: list[str]) -> Iterator[int]:
+    if port:
+        yield port
+        return
+    with spawn_server(*server_args) as (_, spawned):
+        yield spawned
+
+
+@app.command()
+def main(
+    *,
+    connections: Annotated[int, typer.Option(help='Concurrent connections.')] = 20,
+    games: Annotated[int, typer.Option(help='Games replayed in total.')] = 200,
+    rate: Annotated[float, typer.Option(help='Target moves/sec in total; 0 for no pacing.')] = 0.0,
+    game_file: Annotated[
+        list[Path] | None,
+        typer.Option(help='Game files or directories to replay; random games if none.'),
+    ] = None,
+    seed: Annotated[int, typer.Option(help='Seed of the random games.')] = 0,
+    host: Annotated[str, typer.Option(help='Server address.')] = '127.0.0.1',
+    port: Annotated[int, typer.Option(help='Port of a running server; 0 starts one.')] = 0,
+    server_arg: Annotated[
+        list[str] | None,
+        typer.Option(help='Option passed to the started server, repeatable.'),
+    ] = None,
+    output: Annotated[
+        Path | None, typer.Option('--output', '-o', help='Write the results as JSON here.')
+    ] = None,
+) -> None:
+    """Print throughput, latency percentiles and errors of one load run."""
+    raise_fd_limit()
+    replayed = load_games(game_file or [], games, seed)
+    with _target(port, server_arg or []) as target:
+        result = asyncio.run(run_load(host, target, replayed, connections, rate))
+
+    typer.echo(' '.join(f'{key}={value}' for key, value in result.items()))
+    if output is not None:
+        output.write_text(json.dumps(result, indent=2) + '\n', encoding='utf-8')
+
+
+if __name__ == '__main__':
+    app()
@@ -0,0 +1,89 @@
+"""
+Load-test the game registry and the lobby commands.
+
+First fills an in-process registry with `--games` games to measure memory
+per game and lookup speed, then opens `--pairs` pairs of connections against
+a real server where one side runs `start_game` and the other `join_game`,
+recording the join round-trip latency.
+
+    python -m benchmarks.lobby --games 100000 --pairs 500
+"""
+
+import asyncio
+import time
+import tracemalloc
+from typing import Annotated
+
+import typer
+
+from benchmarks._support import percentile, raise_fd_limit, spawn_server
+from src.server.games import GameRegistry, Seat
+
+app = typer.Typer(add_completion=False)
+
+
+def _registry_load(games: int) -> None:
+    tracemalloc.start()
+    registry = GameRegistry(max_games=games)
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    ids = []
+    for _ in range(games):
+        game = registry.create()
+        game.seat(object(), Seat.SOLO)
+        ids.append(game.game_id)
+    create_time = time.perf_counter() - start
+    per_game = (tracemalloc.get_traced_memory()[0] - before) / games
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for game_id in ids:
+        registry.get(game_id)
+    lookup_time = time.perf_counter() - start
+
+    typer.echo(
+        f'registry games={games} bytes_per_game={per_game:.0f} '
+        f'create_us={create_time / games * 1e6:.2f} lookup_us={lookup_time / games * 1e6:.3f}'
+    )
+
+
+async def _join_pair(port: int, latencies: list[float]) -> None:
+    host_reader, host_writer = await asyncio.open_connection('127.0.0.1', port)
+    guest_reader, guest_writer = await asyncio.open_connection('127.0.0.1', port)
+    host_writer.write(b'start_game\n')
+    game_id = (await host_reader.readuntil(b'\n\n')).split()[1].decode()
+
+    start = time.perf_counter()
+    guest_writer.write(f'join_game {game_id}\n'.encode())
+    await guest_reader.readuntil(b'\n\n')
+    latencies.append(time.perf_counter() - start)
+
+    host_writer.close()
+    guest_writer.close()
+
+
+async def _lobby_load(port: int, pairs: int) -> list[float]:
+    latencies: list[float] = []
+    await asyncio.gather(*(_join_pair(port, latencies) for _ in range(pairs)))
+    return latencies
+
+
+@app.command()
+def main(
+    games: Annotated[int, typer.Option(help='Games created in the registry test.')] = 100_000,
+    pairs: Annotated[int, typer.Option(help='Player pairs joining over sockets.')] = 500,
+) -> None:
+    """Print registry memory/latency figures and lobby join latency."""
+    _registry_load(games)
+
+    raise_fd_limit()
+    with spawn_server('--engine', 'asyncio') as (_, port):
+        latencies = asyncio.run(_lobby_load(port, pairs))
+    typer.echo(
+        f'lobby    pairs={pairs} join_p50_ms={percentile(latencies, 50) * 1000:.2f} '
+        f'join_p99_ms={percentile(latencies, 99) * 1000:.2f}'
+    )
+
+
+if __name__ == '__main__':
+    app()
@@ -0,0 +1,73 @@
+"""
+Measure moves/sec of a real server under each logging setup.
+
+Starts one server per setup and pipelines the same knight shuffle over
+several concurrent connections to each in turn:
+
+    off       INFO level, so no per-request records
+    sync      -v with a log file, written and flushed by each handler thread
+    async     -v with a log file, batched by the writer thread
+    sampled   async, tracing one connection in `--sample`
+
+    python -m benchmarks.logs --connections 8 --moves 2000 --rounds 5
+"""
+
+import socket
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Annotated
+
+import typer
+
+from benchmarks._support import SHUFFLE, spawn_server
+
+app = typer.Typer(add_completion=False)
+
+
+def _pipelined(port: int, game: bytes, moves: int) -> None:
+    with socket.create_connection(('127.0.0.1', port)) as sock:
+        sock.sendall(game)
+        received = b''
+        while received.count(b'\n\n') < moves:
+            received += sock.recv(65536)
+
+
+def _round(port: int, game: bytes, moves: int, connections: int) -> float:
+    with ThreadPoolExecutor(connections) as pool:
+        start = time.perf_counter()
+        for future in [pool.submit(_pipelined, port, game, moves) for _ in range(connections)]:
+            future.result()
+        return time.perf_counter() - start
+
+
+@app.command()
+def main(
+    connections: Annotated[int, typer.Option(help='Concurrent connections.')] = 8,
+    moves: Annotated[int, typer.Option(help='Moves pipelined per connection.')] = 2000,
+    rounds: Annotated[int, typer.Option(help='Rounds per setup; the best counts.')] = 5,
+    sample: Annotated[int, typer.Option(help='Trace one connection in this many.')] = 8,
+) -> None:
+    """Print moves/sec for each logging setup."""
+    game = ''.join(f'{SHUFFLE[i % len(SHUFFLE)]}\n' for i in range(moves)).encode()
+    with tempfile.TemporaryDirectory() as tmp:
+        log = str(Path(tmp) / 'server.log')
+        setups = {
+            'off': ('--log-file', log),
+            'sync': ('-v', '--log-file', log),
+            'async': ('-v', '--log-file', log, '--log-mode', 'async'),
+            'sampled': (
+                *('-v', '--log-file', log, '--log-mode', 'async'),
+                *('--trace-sample', str(sample)),
+            ),
+        }
+        for name, args in setups.items():
+            with spawn_server(*args) as (_, port):
+                elapsed = min(_round(port, game, moves, connections) for _ in range(rounds))
+            total = moves * connections
+            typer.echo(f'logs {name:<8} moves={total} moves_per_s={total / elapsed:10.1f}')
+
+
+if __name__ == '__main__':
+    app()
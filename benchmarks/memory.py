@@ -0,0 +1,71 @@
+"""
+Measure the resident memory of a game as a board and as a compact game.
+
+Random games are played to `--plies` half-moves (games ending earlier are
+skipped) and kept alive as `GameBoard`s, as the server kept them, then as
+`CompactGame`s, as it keeps them now. The bytes `tracemalloc` sees
+allocated while building each set, divided by the number of games, is the
+per-game footprint; the move lists themselves are built beforehand and not
+counted.
+
+    python -m benchmarks.memory --games 2000 --plies 80
+"""
+
+import gc
+import tracemalloc
+from collections.abc import Callable
+from typing import Annotated
+
+import chess
+import typer
+
+from benchmarks._support import random_games
+from src.protocol import CompactGame, GameBoard
+
+app = typer.Typer(add_completion=False)
+
+
+def footprint(build: Callable[[], list[object]]) -> float:
+    """Return the bytes per item still allocated by the list `build` returns."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        items = build()
+        gc.collect()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return size / len(items)
+
+
+def _boards(games: list[list[chess.Move]]) -> list[GameBoard]:
+    boards = []
+    for moves in games:
+        board = GameBoard()
+        for move in moves:
+            board.push(move)
+        boards.append(board)
+    return boards
+
+
+@app.command()
+def main(
+    games: Annotated[int, typer.Option(min=1, help='Games kept resident.')] = 2000,
+    plies: Annotated[int, typer.Option(min=1, help='Half-moves played in each game.')] = 80,
+) -> None:
+    """Print the bytes each resident game takes in both representations."""
+    moves = [
+        [chess.Move.from_uci(move.replace('-', '')) for move in game]
+        for game in random_games(games * 2, seed=5, max_plies=plies)
+        if len(game) == plies
+    ][:games]
+    board_bytes = footprint(lambda: _boards(moves))
+    compact_bytes = footprint(lambda: [CompactGame(board) for board in _boards(moves)])
+    typer.echo(
+        f'memory games={len(moves)} plies={plies} board_bytes={board_bytes:.0f} '
+        f'compact_bytes={compact_bytes:.0f} ratio={board_bytes / compact_bytes:.1f}x'
+    )
+
+
+if __name__ == '__main__':
+    app()
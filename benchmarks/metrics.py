@@ -0,0 +1,87 @@
+"""
+Measure the move throughput cost of recording metrics.
+
+`sessions` feeds the same random games, each as one pipelined batch, to
+in-process sessions with and without metrics. Sessions do all the per-line
+work of the server except the socket calls, so the relative overhead there
+is an upper bound. `server` pipelines a game over a connection to a real
+server started with and without `--metrics`. Both alternate rounds between
+the two settings so that background noise hits them alike.
+
+    python -m benchmarks.metrics --games 200 --rounds 30
+"""
+
+import socket
+import statistics
+import time
+from typing import Annotated
+
+import typer
+from loguru import logger
+
+from benchmarks._support import SHUFFLE, random_games, spawn_server
+from src.server.games import GameRegistry
+from src.server.metrics import Metrics
+from src.server.session import Session
+
+app = typer.Typer(add_completion=False)
+
+
+def _round(batches: list[bytes], registry: GameRegistry, metrics: Metrics | None) -> float:
+    start = time.perf_counter()
+    for batch in batches:
+        session = Session(registry, metrics)
+        session.feed(batch)
+        session.close()
+    return time.perf_counter() - start
+
+
+def _pipelined(port: int, game: bytes, moves: int) -> float:
+    with socket.create_connection(('127.0.0.1', port)) as sock:
+        start = time.perf_counter()
+        sock.sendall(game)
+        received = b''
+        while received.count(b'\n\n') < moves:
+            received += sock.recv(65536)
+        return time.perf_counter() - start
+
+
+def _echo(setting: str, moves: int, plain: list[float], measured: list[float]) -> None:
+    plain_us = statistics.median(plain) / moves * 1e6
+    measured_us = statistics.median(measured) / moves * 1e6
+    typer.echo(
+        f'metrics {setting} moves={moves} plain_us_per_move={plain_us:.2f} '
+        f'metrics_us_per_move={measured_us:.2f} '
+        f'overhead_pct={(measured_us / plain_us - 1) * 100:.1f}'
+    )
+
+
+@app.command()
+def main(
+    games: Annotated[int, typer.Option(help='Random games fed per session round.')] = 200,
+    moves: Annotated[int, typer.Option(help='Moves pipelined per server round.')] = 5000,
+    rounds: Annotated[int, typer.Option(help='Rounds with and without metrics.')] = 30,
+) -> None:
+    """Print the median time per move with and without metrics."""
+    logger.remove()
+    corpus = random_games(games, seed=11)
+    batches = [''.join(f'{move}\n' for move in game).encode() for game in corpus]
+    registry = GameRegistry()
+    metrics = Metrics(registry.__len__)
+    plain, measured = [], []
+    for _ in range(rounds):
+        plain.append(_round(batches, registry, None))
+        measured.append(_round(batches, registry, metrics))
+    _echo('sessions', sum(map(len, corpus)), plain, measured)
+
+    game = ''.join(f'{SHUFFLE[i % len(SHUFFLE)]}\n' for i in range(moves)).encode()
+    with spawn_server() as (_, plain_port), spawn_server('--metrics') as (_, measured_port):
+        plain, measured = [], []
+        for _ in range(rounds):
+            plain.append(_pipelined(plain_port, game, moves))
+            measured.append(_pipelined(measured_port, game, moves))
+    _echo('server', moves, plain, measured)
+
+
+if __name__ == '__main__':
+    app()
@@ -0,0 +1,122 @@
+"""
+Time the hot protocol and validation functions one at a time.
+
+Each case is called in a loop long enough to take at least 0.2 seconds
+(found with `timeit`'s autorange), and the loop is repeated `--repeat`
+times. The table gives nanoseconds per call (min, median, mean, stddev)
+and calls/sec from the median, like pytest-benchmark would, without
+needing it installed. `--filter` keeps the cases whose name contains the
+given text, and `--output` writes the table as JSON so runs before and
+after a change can be compared.
+
+    python -m benchmarks.micro
+    python -m benchmarks.micro --filter validate --repeat 10 -o micro.json
+"""
+
+import json
+import statistics
+import timeit
+from collections.abc import Callable
+from pathlib import Path
+from typing import Annotated
+
+import chess
+import typer
+from loguru import logger
+
+from benchmarks._support import SHUFFLE
+from src.protocol import GameBoard, process_line
+from src.protocol.core import _display_board, describe_move, format_move, move_event
+from src.protocol.render import render_board
+from src.protocol.scanner import scan
+from src.validation import (
+    parse_command,
+    validate_interface,
+    validate_port,
+    validate_positive,
+)
+
+app = typer.Typer(add_completion=False)
+
+# A middlegame position with captures and checks available.
+MIDDLEGAME = 'r1bqk2r/pppp1ppp/2n2n2/2b1p3/2B1P3/3P1N2/PPP2PPP/RNBQK2R w KQkq - 1 5'
+
+
+def _shuffle() -> Callable[[], object]:
+    """Play the four knight moves, which bring the board back to the start."""
+    board = GameBoard()
+
+    def play() -> None:
+        for line in SHUFFLE:
+            process_line(board, line)
+        board.clear_stack()
+
+    return play
+
+
+def _cases() -> dict[str, tuple[Callable[[], object], int]]:
+    """Return each case with the number of operations one call performs."""
+    board = GameBoard(MIDDLEGAME)
+    capture = chess.Move.from_uci('c4f7')
+    event = move_event(board, capture)
+    start = chess.Board()
+    return {
+        'process_line[move]': (_shuffle(), len(SHUFFLE)),
+        'process_line[display_board]': (lambda: process_line(board, 'display_board'), 1),
+        'process_line[comment]': (lambda: process_line(board, '# a comment'), 1),
+        'process_line[garbage]': (lambda: process_line(board, 'e2e4?'), 1),
+        'format_move': (lambda: format_move(board, capture), 1),
+        'describe_move': (lambda: describe_move(event), 1),
+        '_display_board': (lambda: _display_board(start), 1),
+        'render_board': (lambda: render_board(start), 1),
+        'scan[move]': (lambda: scan('e2-e4'), 1),
+        'scan[command]': (lambda: scan('display_board'), 1),
+        'parse_command': (lambda: parse_command('display_board'), 1),
+        'validate_port': (lambda: validate_port(2000), 1),
+        'validate_interface': (lambda: validate_interface('127.0.0.1'), 1),
+        'validate_positive': (lambda: validate_positive(30.0), 1),
+    }
+
+
+def measure(func: Callable[[], object], ops: int, repeat: int) -> dict[str, float]:
+    """Return per-operation timings of `func` in nanoseconds."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    samples = [t / (number * ops) * 1e9 for t in timer.repeat(repeat, number)]
+    median = statistics.median(samples)
+    return {
+        'min_ns': round(min(samples), 1),
+        'median_ns': round(median, 1),
+        'mean_ns': round(statistics.fmean(samples), 1),
+        'stddev_ns': round(statistics.stdev(samples), 1) if repeat > 1 else 0.0,
+        'ops_per_s': round(1e9 / median),
+    }
+
+
+@app.command()
+def main(
+    repeat: Annotated[int, typer.Option(min=1, help='Timed loops per case.')] = 5,
+    filter_: Annotated[
+        str, typer.Option('--filter', help='Only run cases whose name contains this.')
+    ] = '',
+    output: Annotated[
+        Path | None, typer.Option('--output', '-o', help='Write the results as JSON here.')
+    ] = None,
+) -> None:
+    """Print per-call timings of each case."""
+    logger.remove()
+    results = {}
+    for name, (func, ops) in _cases().items():
+        if filter_ not in name:
+            continue
+        results[name] = result = measure(func, ops, repeat)
+        typer.echo(
+            f'{name:<28} min={result["min_ns"]:>9.1f}ns median={result["median_ns"]:>9.1f}ns '
+            f'stddev={result["stddev_ns"]:>7.1f}ns ops/s={result["ops_per_s"]:>10,}'
+        )
+    if output is not None:
+        output.write_text(json.dumps(results, indent=2) + '\n', encoding='utf-8')
+
+
+if __name__ == '__main__':
+    app()
@@ -0,0 +1,63 @@
+"""
+Measure moves/sec on a single connection, lock-step versus pipelined.
+
+Lock-step sends one move and waits for its reply, which is how the server
+was driven before it batched replies. Pipelined writes a whole game file at
+once and lets the server drain the buffer and coalesce its replies.
+
+    python -m benchmarks.pipelining --moves 200
+"""
+
+import socket
+import time
+from typing import Annotated
+
+import typer
+
+from benchmarks._support import SHUFFLE, spawn_server
+from src.validation import Engine
+
+app = typer.Typer(add_completion=False)
+
+
+def _lock_step(port: int, moves: list[bytes]) -> float:
+    with socket.create_connection(('127.0.0.1', port)) as sock:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        start = time.perf_counter()
+        for move in moves:
+            sock.sendall(move)
+            _read_replies(sock, 1)
+        return time.perf_counter() - start
+
+
+def _pipelined(port: int, moves: list[bytes]) -> float:
+    with socket.create_connection(('127.0.0.1', port)) as sock:
+        start = time.perf_counter()
+        sock.sendall(b''.join(moves))
+        _read_replies(sock, len(moves))
+        return time.perf_counter() - start
+
+
+def _read_replies(sock: socket.socket, count: int) -> None:
+    received = b''
+    while received.count(b'\n\n') < count:
+        received += sock.recv(65536)
+
+
+@app.command()
+def main(
+    moves: Annotated[int, typer.Option(help='Moves in the replayed game.')] = 200,
+    repeat: Annotated[int, typer.Option(help='Games replayed per mode.')] = 20,
+) -> None:
+    """Print per-connection moves/sec for each engine and mode."""
+    game = [f'{SHUFFLE[i % len(SHUFFLE)]}\n'.encode() for i in range(moves)]
+    for engine in Engine:
+        with spawn_server('--engine', engine) as (_, port):
+            for mode in (_lock_step, _pipelined):
+                elapsed = min(mode(port, game) for _ in range(repeat))
+                name = mode.__name__.strip('_')
+                typer.echo(f'{engine:<9} {name:<10} moves_per_s={moves / elapsed:10.1f}')
+
+
+if __name__ == '__main__':
+    app()
@@ -0,0 +1,104 @@
+"""
+Measure the shared position cache on games that open like real ones.
+
+Each game starts with one of a dozen popular opening lines, picked with
+Zipf-like weights and followed for a random number of its moves, then goes
+on with random legal moves. The games are replayed through `play_move` on
+`GameBoard` with the cache disabled and enabled, each round starting from
+an empty cache, and the hit rate of the last round is reported with the CPU
+time per move.
+
+    python -m benchmarks.positions --games 2000 --rounds 3
+"""
+
+import random
+import time
+from typing import Annotated
+
+import chess
+import typer
+
+from src.protocol import GameBoard, play_move
+
+app = typer.Typer(add_completion=False)
+
+# Most played first, from any large database of online games.
+OPENINGS = (
+    'e2e4 e7e5 g1f3 b8c6 f1b5 a7a6 b5a4 g8f6 e1g1 f8e7',
+    'e2e4 c7c5 g1f3 d7d6 d2d4 c5d4 f3d4 g8f6 b1c3 a7a6',
+    'd2d4 g8f6 c2c4 e7e6 g1f3 d7d5 b1c3 f8e7 c1g5 e8g8',
+    'e2e4 e7e5 g1f3 b8c6 f1c4 f8c5 c2c3 g8f6 d2d4 e5d4',
+    'e2e4 e7e6 d2d4 d7d5 b1c3 g8f6 c1g5 f8e7 e4e5 f6d7',
+    'd2d4 d7d5 c2c4 c7c6 g1f3 g8f6 b1c3 d5c4 a2a4 c8f5',
+    'e2e4 c7c6 d2d4 d7d5 b1c3 d5e4 c3e4 c8f5 e4g3 f5g6',
+    'c2c4 e7e5 b1c3 g8f6 g1f3 b8c6 g2g3 d7d5 c4d5 f6d5',
+    'd2d4 g8f6 c2c4 g7g6 b1c3 f8g7 e2e4 d7d6 g1f3 e8g8',
+    'g1f3 d7d5 g2g3 g8f6 f1g2 e7e6 e1g1 f8e7 d2d3 e8g8',
+    'e2e4 d7d5 e4d5 d8d5 b1c3 d5a5 d2d4 g8f6 g1f3 c8f5',
+    'e2e4 c7c5 b1c3 b8c6 g2g3 g7g6 f1g2 f8g7 d2d3 d7d6',
+)
+
+
+def opening_games(count: int, seed: int, plies: int) -> list[list[chess.Move]]:
+    """Return games that follow a weighted opening line, then play randomly."""
+    rng = random.Random(seed)  # noqa: S311
+    lines = [[chess.Move.from_uci(uci) for uci in line.split()] for line in OPENINGS]
+    weights = [1 / rank for rank in range(1, len(lines) + 1)]
+    games = []
+    for line in rng.choices(lines, weights, k=count):
+        board = chess.Board()
+        moves = line[: rng.randint(len(line) // 2, len(line))]
+        for move in moves:
+            board.push(move)
+        while len(moves) < plies:
+            legal = [move for move in board.legal_moves if move.promotion is None]
+            if not legal:
+                break
+            moves.append(rng.choice(legal))
+            board.push(moves[-1])
+        games.append(moves)
+    return games
+
+
+def _replay(games: list[list[chess.Move]], rounds: int) -> float:
+    best = float('inf')
+    for _ in range(rounds):
+        # Every round starts cold, like a freshly started server.
+        if GameBoard.positions is not None:
+            GameBoard.positions.clear()
+        start = time.process_time()
+        for moves in games:
+            board = GameBoard()
+            for move in moves:
+                play_move(board, move)
+        best = min(best, time.process_time() - start)
+    return best / sum(map(len, games)) * 1e6
+
+
+@app.command()
+def main(
+    games: Annotated[int, typer.Option(help='Games replayed.')] = 2000,
+    plies: Annotated[int, typer.Option(help='Half-moves per game.')] = 40,
+    rounds: Annotated[int, typer.Option(help='Replays per setting; the best counts.')] = 3,
+    size: Annotated[int, typer.Option(help='Positions cached.')] = 4096,
+    max_ply: Annotated[int, typer.Option(help='Half-moves up to which positions are cached.')] = 8,
+) -> None:
+    """Print the hit rate and CPU microseconds per move, uncached and cached."""
+    moves = opening_games(games, seed=5, plies=plies)
+
+    GameBoard.share_positions(0, max_ply)
+    uncached = _replay(moves, rounds)
+
+    GameBoard.share_positions(size, max_ply)
+    cached = _replay(moves, rounds)
+    info = GameBoard.positions.info()
+    hits, misses = info.hits, info.misses
+    typer.echo(
+        f'positions moves={sum(map(len, moves))} hit_rate={hits / (hits + misses):.3f} '
+        f'cached_positions={info.currsize} uncached_us={uncached:.2f} cached_us={cached:.2f} '
+        f'speedup={uncached / cached:.2f}x'
+    )
+
+
+if __name__ == '__main__':
+    app()
@@ -0,0 +1,89 @@
+"""
+Measure the move throughput cost of each profiling mode.
+
+`sessions` feeds the same random games, each as one pipelined batch, to
+in-process sessions with profiling off and in each mode; the sampler thread
+runs alongside, as it would in the server. `server` pipelines a game over a
+connection to real servers started with `--profile off` and `sampling`.
+Both alternate rounds between the settings so that background noise hits
+them alike.
+
+    python -m benchmarks.profiling --games 200 --rounds 30
+"""
+
+import statistics
+import time
+from typing import Annotated
+
+import typer
+from loguru import logger
+
+from benchmarks._support import SHUFFLE, random_games, spawn_server
+from benchmarks.metrics import _pipelined
+from src.server.games import GameRegistry
+from src.server.profiling import ProfileMode, Profiler
+from src.server.session import Session
+
+app = typer.Typer(add_completion=False)
+
+
+def _round(batches: list[bytes], registry: GameRegistry, profiler: Profiler) -> float:
+    start = time.perf_counter()
+    for batch in batches:
+        session = Session(registry, None, profiler)
+        session.feed(batch)
+        if session.profiling:
+            session.done()
+        session.close()
+    return time.perf_counter() - start
+
+
+def _echo(setting: str, moves: int, plain: list[float], measured: list[float]) -> None:
+    plain_us = statistics.median(plain) / moves * 1e6
+    measured_us = statistics.median(measured) / moves * 1e6
+    typer.echo(
+        f'profiling {setting} moves={moves} plain_us_per_move={plain_us:.2f} '
+        f'profiled_us_per_move={measured_us:.2f} '
+        f'overhead_pct={(measured_us / plain_us - 1) * 100:.1f}'
+    )
+
+
+@app.command()
+def main(
+    games: Annotated[int, typer.Option(help='Random games fed per session round.')] = 200,
+    moves: Annotated[int, typer.Option(help='Moves pipelined per server round.')] = 5000,
+    rounds: Annotated[int, typer.Option(help='Rounds in each setting.')] = 30,
+) -> None:
+    """Print the median time per move with profiling off and on."""
+    logger.remove()
+    corpus = random_games(games, seed=11)
+    batches = [''.join(f'{move}\n' for move in game).encode() for game in corpus]
+    total = sum(map(len, corpus))
+    registry = GameRegistry()
+    modes = (ProfileMode.SAMPLING, ProfileMode.DETERMINISTIC, ProfileMode.BOTH)
+    profilers = {mode: Profiler(mode) for mode in (ProfileMode.OFF, *modes)}
+    timings: dict[ProfileMode, list[float]] = {mode: [] for mode in profilers}
+    try:
+        for _ in range(rounds):
+            for mode, profiler in profilers.items():
+                timings[mode].append(_round(batches, registry, profiler))
+    finally:
+        for profiler in profilers.values():
+            profiler.close()
+    for mode in modes:
+        _echo(f'sessions_{mode}', total, timings[ProfileMode.OFF], timings[mode])
+
+    game = ''.join(f'{SHUFFLE[i % len(SHUFFLE)]}\n' for i in range(moves)).encode()
+    with (
+        spawn_server() as (_, plain_port),
+        spawn_server('--profile', 'sampling') as (_, measured_port),
+    ):
+        plain, measured = [], []
+        for _ in range(rounds):
+            plain.append(_pipelined(plain_port, game, moves))
+            measured.append(_pipelined(measured_port, game, moves))
+    _echo('server_sampling', moves, plain, measured)
+
+
+if __name__ == '__main__':
+    app()
@@ -0,0 +1,58 @@
+"""
+Measure `display_board` polling throughput before and after caching.
+
+`polling` renders the same position repeatedly, as spectators and bots do
+between moves. `replay` renders once after every move of random games,
+which exercises the incremental patching on cache misses.
+
+    python -m benchmarks.render --polls 200000
+"""
+
+import time
+from collections.abc import Callable
+from typing import Annotated
+
+import chess
+import typer
+
+from benchmarks._support import random_games
+from src.protocol.core import _display_board
+from src.protocol.render import render_board
+
+app = typer.Typer(add_completion=False)
+
+
+def _positions(games: int) -> list[chess.Board]:
+    boards = []
+    for game in random_games(games, seed=1):
+        board = chess.Board()
+        for move in game:
+            board.push_uci(move.replace('-', ''))
+            boards.append(board.copy(stack=False))
+    return boards
+
+
+def _rate(func: Callable[[chess.Board], str], boards: list[chess.Board]) -> float:
+    start = time.perf_counter()
+    for board in boards:
+        func(board)
+    return len(boards) / (time.perf_counter() - start)
+
+
+@app.command()
+def main(
+    polls: Annotated[int, typer.Option(help='Polls of a single position.')] = 200_000,
+    games: Annotated[int, typer.Option(help='Random games rendered move by move.')] = 200,
+) -> None:
+    """Print renders/sec for each scenario and renderer."""
+    scenarios = {
+        'polling': [chess.Board()] * polls,
+        'replay': _positions(games),
+    }
+    for scenario, boards in scenarios.items():
+        for name, func in (('rebuild', _display_board), ('cached', render_board)):
+            typer.echo(f'{scenario:<8} {name:<8} renders_per_s={_rate(func, boards):12.0f}')
+
+
+if __name__ == '__main__':
+    app()
@@ -0,0 +1,45 @@
+"""
+Time `chess_client --filename` replays for several in-flight windows.
+
+A window of 1 reproduces the old lock-step client, where every move costs a
+full round trip.
+
+    python -m benchmarks.replay --moves 20000 --window 1 --window 64
+"""
+
+import os
+import tempfile
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Annotated
+
+import typer
+
+from benchmarks._support import SHUFFLE, spawn_server
+from src.cli.chess_client import run_client
+
+app = typer.Typer(add_completion=False)
+
+
+@app.command()
+def main(
+    moves: Annotated[int, typer.Option(help='Moves in the replayed game file.')] = 20_000,
+    window: Annotated[list[int] | None, typer.Option(help='Windows to compare.')] = None,
+) -> None:
+    """Print replay moves/sec for each window size."""
+    with tempfile.TemporaryDirectory() as tmp, spawn_server() as (_, port):
+        game = Path(tmp) / 'game.txt'
+        game.write_text(
+            ''.join(f'{SHUFFLE[i % len(SHUFFLE)]}\n' for i in range(moves)), encoding='utf-8'
+        )
+        for size in window or [1, 8, 64, 256]:
+            with Path(os.devnull).open('w') as devnull, redirect_stdout(devnull):
+                start = time.perf_counter()
+                run_client(port=port, filename=game, window=size)
+                elapsed = time.perf_counter() - start
+            typer.echo(f'window={size:<5} moves_per_s={moves / elapsed:10.1f}')
+
+
+if __name__ == '__main__':
+    app()
@@ -0,0 +1,139 @@
+"""
+Measure a storm of reconnecting clients resuming their games.
+
+`--clients` connections each take a resume token for their game and play
+`--plies` half-moves, then they are all reset at once. Every client then
+reconnects at the same moment, twice over: once resuming its seat with its
+token, and once the way clients had to before, replaying all its moves on
+a fresh connection. Connections that are refused or reset retry with
+jittered exponential backoff, as the REPL client does. Reported latencies
+run from the start of the storm until the client is back in its game.
+
+    python -m benchmarks.resume --clients 10000 --plies 40
+"""
+
+import asyncio
+import random
+import time
+from collections.abc import Awaitable, Callable
+from itertools import cycle, islice
+from typing import Annotated
+
+import typer
+
+from benchmarks._support import SHUFFLE, percentile, raise_fd_limit, spawn_server
+
+app = typer.Typer(add_completion=False)
+
+REPLY_END = b'\n\n'
+ATTEMPTS = 8
+RETRY_DELAY = 0.05
+SETUP_CONCURRENCY = 256
+
+type Streams = tuple[asyncio.StreamReader, asyncio.StreamWriter]
+
+
+class Storm:
+    """What the reconnecting clients observed, shared by all of them."""
+
+    def __init__(self) -> None:
+        """Start with nothing observed."""
+        self.latencies: list[float] = []
+        self.retries = 0
+        self.failed = 0
+        self.wall = 0.0
+
+
+async def _exchange(streams: Streams, data: bytes, replies: int) -> list[bytes]:
+    reader, writer = streams
+    writer.write(data)
+    return [await reader.readuntil(REPLY_END) for _ in range(replies)]
+
+
+async def _setup(port: int, moves: bytes, plies: int, slots: asyncio.Semaphore) -> str:
+    """Play a game and return its resume token, then reset the connection."""
+    async with slots:
+        streams = await asyncio.open_connection('127.0.0.1', port)
+        token, *_ = await _exchange(streams, b'resume\n' + moves, plies + 1)
+        streams[1].transport.abort()
+    return token.decode().removeprefix('Resume token ').strip()
+
+
+async def _reconnect(
+    port: int, storm: Storm, start: float, back: Callable[[Streams], Awaitable[bool]]
+) -> None:
+    """Connect until `back` gets the client into its game, with backoff."""
+    for attempt in range(ATTEMPTS):
+        writer = None
+        try:
+            streams = await asyncio.open_connection('127.0.0.1', port)
+            writer = streams[1]
+            if await back(streams):
+                storm.latencies.append(time.perf_counter() - start)
+                return
+        except OSError, asyncio.IncompleteReadError:
+            pass
+        finally:
+            if writer is not None:
+                writer.close()
+        storm.retries += 1
+        await asyncio.sleep(RETRY_DELAY * 2**attempt * random.uniform(0.5, 1.5))  # noqa: S311
+    storm.failed += 1
+
+
+async def _storm(port: int, back: list[Callable[[Streams], Awaitable[bool]]]) -> Storm:
+    storm = Storm()
+    start = time.perf_counter()
+    await asyncio.gather(*(_reconnect(port, storm, start, client) for client in back))
+    storm.wall = time.perf_counter() - start
+    return storm
+
+
+async def _run(port: int, clients: int, plies: int) -> tuple[Storm, Storm]:
+    line = list(islice(cycle(SHUFFLE), plies))
+    moves = ''.join(f'{move}\n' for move in line).encode()
+    slots = asyncio.Semaphore(SETUP_CONCURRENCY)
+    tokens = await asyncio.gather(*(_setup(port, moves, plies, slots) for _ in range(clients)))
+
+    def resume(token: str) -> Callable[[Streams], Awaitable[bool]]:
+        async def back(streams: Streams) -> bool:
+            (reply,) = await _exchange(streams, f'resume {token}\n'.encode(), 1)
+            return reply.startswith(b'Resumed')
+
+        return back
+
+    async def replay(streams: Streams) -> bool:
+        replies = await _exchange(streams, moves, plies)
+        return not any(reply.startswith(b'Invalid') for reply in replies)
+
+    resumed = await _storm(port, [resume(token) for token in tokens])
+    replayed = await _storm(port, [replay] * clients)
+    return resumed, replayed
+
+
+def _format(name: str, storm: Storm) -> str:
+    p50, p99 = (percentile(storm.latencies, pct) * 1000 for pct in (50, 99))
+    return (
+        f'{name}_p50_ms={p50:.1f} {name}_p99_ms={p99:.1f} {name}_wall_s={storm.wall:.2f} '
+        f'{name}_retries={storm.retries} {name}_failed={storm.failed}'
+    )
+
+
+@app.command()
+def main(
+    clients: Annotated[int, typer.Option(min=1, help='Clients reconnecting at once.')] = 10_000,
+    plies: Annotated[int, typer.Option(min=1, help='Half-moves each game has played.')] = 40,
+) -> None:
+    """Print how long a reconnect storm takes to resume and to replay."""
+    raise_fd_limit()
+    limit = str(2 * clients + 16)
+    with spawn_server('--engine', 'asyncio', '--max-connections', limit) as (_, port):
+        resumed, replayed = asyncio.run(_run(port, clients, plies))
+    typer.echo(
+        f'resume clients={clients} plies={plies} '
+        f'{_format("resume", resumed)} {_format("replay", replayed)}'
+    )
+
+
+if __name__ == '__main__':
+    app()
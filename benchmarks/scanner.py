@@ -0,0 +1,66 @@
+"""
+Compare the single-pass scanner with the former regex cascade.
+
+Each strategy classifies the same mix of moves, comments, commands and
+garbage and decodes the moves, which is everything `process_line` did before
+touching the board.
+
+    python -m benchmarks.scanner --lines 1000000
+"""
+
+import random
+import time
+from collections.abc import Callable
+from typing import Annotated
+
+import chess
+import typer
+
+from benchmarks._support import random_games
+from src.protocol.scanner import scan
+from src.validation import COMMENT, STRIKE, parse_command
+
+app = typer.Typer(add_completion=False)
+
+GARBAGE = ['a4-_h', 'a2a3', 'a1-e', 'hello there', 'display_boards', 'E9-E1', '']
+OTHERS = ['// a comment', '//', 'display_board', *GARBAGE]
+
+
+def _cascade(line: str) -> object:
+    line = line.strip()
+    if STRIKE.fullmatch(line):
+        return chess.Move.from_uci(line.replace('-', '').lower())
+    if COMMENT.fullmatch(line):
+        return 'OK'
+    return parse_command(line)
+
+
+def _scanner(line: str) -> object:
+    return scan(line.strip())
+
+
+def _time(func: Callable[[str], object], lines: list[str]) -> float:
+    start = time.perf_counter()
+    for line in lines:
+        func(line)
+    return time.perf_counter() - start
+
+
+@app.command()
+def main(
+    lines: Annotated[int, typer.Option(help='Lines to classify.')] = 1_000_000,
+    move_share: Annotated[float, typer.Option(help='Fraction of lines that are moves.')] = 0.7,
+) -> None:
+    """Print lines/sec for the cascade and the scanner."""
+    rng = random.Random(0)  # noqa: S311
+    moves = [move for game in random_games(50) for move in game]
+    corpus = [
+        rng.choice(moves) if rng.random() < move_share else rng.choice(OTHERS) for _ in range(lines)
+    ]
+    for name, func in (('cascade', _cascade), ('scanner', _scanner)):
+        elapsed = _time(func, corpus)
+        typer.echo(f'{name:<8} lines_per_s={lines / elapsed:12.0f} total_s={elapsed:.3f}')
+
+
+if __name__ == '__main__':
+    app()
@@ -0,0 +1,93 @@
+"""
+Compare the threaded, asyncio and batched server engines under many connections.
+
+Opens `--idle` connections that never send anything, then drives `--active`
+connections that each play `--rounds` moves in lock-step, and reports
+throughput, latency and the server's thread count and resident memory.
+
+    python -m benchmarks.server_engines --idle 10000 --active 1000
+"""
+
+import asyncio
+import time
+from typing import Annotated
+
+import typer
+
+from benchmarks._support import SHUFFLE, percentile, proc_status, raise_fd_limit, spawn_server
+from src.validation import Engine
+
+app = typer.Typer(add_completion=False)
+
+CONNECT_BATCH = 500
+
+
+async def _open(port: int, count: int) -> list[tuple[asyncio.StreamReader, asyncio.StreamWriter]]:
+    streams = []
+    for start in range(0, count, CONNECT_BATCH):
+        batch = min(CONNECT_BATCH, count - start)
+        streams += await asyncio.gather(
+            *(asyncio.open_connection('127.0.0.1', port) for _ in range(batch))
+        )
+    return streams
+
+
+async def _play(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    rounds: int,
+    latencies: list[float],
+) -> None:
+    for i in range(rounds):
+        start = time.perf_counter()
+        writer.write(f'{SHUFFLE[i % len(SHUFFLE)]}\n'.encode())
+        await reader.readuntil(b'\n\n')
+        latencies.append(time.perf_counter() - start)
+
+
+async def _run(port: int, pid: int, idle: int, active: int, rounds: int) -> dict[str, float]:
+    start = time.perf_counter()
+    idle_streams = await _open(port, idle)
+    active_streams = await _open(port, active)
+    connect_time = time.perf_counter() - start
+
+    latencies: list[float] = []
+    start = time.perf_counter()
+    await asyncio.gather(*(_play(r, w, rounds, latencies) for r, w in active_streams))
+    elapsed = time.perf_counter() - start
+    status = proc_status(pid)
+
+    for _, writer in idle_streams + active_streams:
+        writer.close()
+
+    return {
+        'connect_s': connect_time,
+        'moves_per_s': len(latencies) / elapsed,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'threads': status['Threads'],
+        'rss_mib': status['VmRSS'] / 1024,
+    }
+
+
+@app.command()
+def main(
+    idle: Annotated[int, typer.Option(help='Idle connections to hold open.')] = 10_000,
+    active: Annotated[int, typer.Option(help='Connections playing moves.')] = 1_000,
+    rounds: Annotated[int, typer.Option(help='Moves played per active connection.')] = 50,
+) -> None:
+    """Benchmark each server engine and print one result row per engine."""
+    limit = raise_fd_limit()
+    needed = 2 * (idle + active) + 64
+    if limit < needed:
+        typer.echo(f'warning: open-files limit {limit} is below the {needed} needed')
+
+    for engine in Engine:
+        with spawn_server('--engine', engine) as (proc, port):
+            result = asyncio.run(_run(port, proc.pid, idle, active, rounds))
+        row = ' '.join(f'{key}={value:.1f}' for key, value in result.items())
+        typer.echo(f'{engine:<9} {row}')
+
+
+if __name__ == '__main__':
+    app()
@@ -0,0 +1,80 @@
+"""
+Measure how long the command line entry points take to import.
+
+Each entry module is imported `--rounds` times in a fresh interpreter run
+with `-X importtime`, and the cumulative time of everything imported after
+interpreter startup (`site`) is its import cost. The median is checked
+against `--budget` milliseconds for the fast replay entry point
+(`python -m src.client`), which bots start once per game, and the run
+exits with status 1 when it is over, so the benchmark can guard startup
+time in CI. `--top` lists the modules with the largest self time.
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --budget 15 --top 10
+"""
+
+import statistics
+import subprocess
+import sys
+from typing import Annotated
+
+import typer
+
+from benchmarks._support import ROOT
+
+app = typer.Typer(add_completion=False)
+
+FAST_ENTRY = 'src.client.__main__'
+ENTRIES = (FAST_ENTRY, 'src.cli.chess_client', 'src.cli.chess_server', 'src.cli.chess_validate')
+
+
+def import_times(module: str) -> list[tuple[int, int, str]]:
+    """Return (self µs, cumulative µs, name) of each import made by `module`."""
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, cumulative, name = line.removeprefix('import time:').split('|')
+        if name.strip() == 'site':
+            times.clear()  # everything so far was interpreter startup
+            continue
+        times.append((int(own), int(cumulative), name.rstrip()))
+    return times
+
+
+def import_ms(times: list[tuple[int, int, str]]) -> float:
+    """Return the total import time of the outermost imports in ms."""
+    return sum(cumulative for _, cumulative, name in times if not name.startswith('  ')) / 1000
+
+
+@app.command()
+def main(
+    rounds: Annotated[int, typer.Option(min=1, help='Fresh interpreters per entry point.')] = 7,
+    budget: Annotated[float, typer.Option(help='Import budget of the fast entry in ms.')] = 20.0,
+    top: Annotated[int, typer.Option(min=0, help='Heaviest modules listed per entry.')] = 0,
+) -> None:
+    """Print the median import time of each entry point."""
+    fast = 0.0
+    for module in ENTRIES:
+        runs = [import_times(module) for _ in range(rounds)]
+        median = statistics.median(map(import_ms, runs))
+        typer.echo(f'startup {module:<24} import_ms={median:7.1f} modules={len(runs[0])}')
+        for own, _, name in sorted(runs[-1], reverse=True)[:top]:
+            typer.echo(f'    {own / 1000:6.1f} ms  {name.strip()}')
+        if module == FAST_ENTRY:
+            fast = median
+
+    if fast > budget:
+        typer.echo(f'{FAST_ENTRY} imports in {fast:.1f} ms, over the {budget:.1f} ms budget')
+        raise typer.Exit(code=1)
+
+
+if __name__ == '__main__':
+    app()
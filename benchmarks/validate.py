@@ -0,0 +1,52 @@
+"""
+Time the offline validator over a generated corpus of game files.
+
+Writes `--games` random legal games to a temporary directory and replays
+them with `chess_validate` for each worker count and chunk size, reporting
+games per second.
+
+    python -m benchmarks.validate --games 5000 --workers 1 --workers 4
+"""
+
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Annotated
+
+import typer
+
+from benchmarks._support import random_games
+from src.cli.chess_validate import run_validate
+
+app = typer.Typer(add_completion=False)
+
+
+@app.command()
+def main(
+    games: Annotated[int, typer.Option(help='Game files in the corpus.')] = 5_000,
+    workers: Annotated[list[int] | None, typer.Option(help='Worker counts to compare.')] = None,
+    chunk_size: Annotated[list[int] | None, typer.Option(help='Chunk sizes to compare.')] = None,
+) -> None:
+    """Print validated games/sec for each worker count and chunk size."""
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = Path(tmp) / 'corpus'
+        corpus.mkdir()
+        for index, moves in enumerate(random_games(games)):
+            (corpus / f'{index:06}.txt').write_text(
+                '// generated\n' + ''.join(f'{move}\n' for move in moves), encoding='utf-8'
+            )
+
+        for count in workers or [1, os.process_cpu_count() or 1]:
+            for size in chunk_size or [1, 64]:
+                start = time.perf_counter()
+                run_validate([corpus], workers=count, chunk_size=size, output=Path(os.devnull))
+                elapsed = time.perf_counter() - start
+                typer.echo(
+                    f'validate workers={count} chunk={size} games={games} '
+                    f'games_s={games / elapsed:.0f}'
+                )
+
+
+if __name__ == '__main__':
+    app()
@@ -0,0 +1,66 @@
+"""
+Measure how move throughput scales with `chess_server --workers`.
+
+Client load comes from separate processes so that the load generator is not
+the bottleneck; every connection plays knight moves in lock-step.
+
+    python -m benchmarks.workers --workers 1 --workers 2 --workers 4
+"""
+
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Annotated
+
+import typer
+
+from benchmarks._support import SHUFFLE, raise_fd_limit, spawn_server
+
+app = typer.Typer(add_completion=False)
+
+
+async def _drive(port: int, connections: int, rounds: int) -> int:
+    async def play() -> int:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        for i in range(rounds):
+            writer.write(f'{SHUFFLE[i % len(SHUFFLE)]}\n'.encode())
+            await reader.readuntil(b'\n\n')
+        writer.close()
+        return rounds
+
+    return sum(await asyncio.gather(*(play() for _ in range(connections))))
+
+
+def _client_process(port: int, connections: int, rounds: int) -> int:
+    raise_fd_limit()
+    return asyncio.run(_drive(port, connections, rounds))
+
+
+@app.command()
+def main(
+    workers: Annotated[list[int] | None, typer.Option(help='Worker counts to compare.')] = None,
+    clients: Annotated[int, typer.Option(help='Load-generating processes.')] = os.cpu_count() or 1,
+    connections: Annotated[int, typer.Option(help='Connections per client process.')] = 50,
+    rounds: Annotated[int, typer.Option(help='Moves played per connection.')] = 200,
+) -> None:
+    """Print moves/sec for each worker count."""
+    raise_fd_limit()
+    baseline = None
+    for count in workers or [1, 2, 4]:
+        with (
+            spawn_server('--workers', str(count)) as (_, port),
+            ProcessPoolExecutor(clients) as pool,
+        ):
+            start = time.perf_counter()
+            futures = [
+                pool.submit(_client_process, port, connections, rounds) for _ in range(clients)
+            ]
+            moves = sum(f.result() for f in futures)
+            rate = moves / (time.perf_counter() - start)
+        baseline = baseline or rate
+        typer.echo(f'workers={count:<3} moves_per_s={rate:10.1f} speedup={rate / baseline:.2f}x')
+
+
+if __name__ == '__main__':
+    app()
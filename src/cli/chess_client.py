@@ -1,18 +1,29 @@
-import ipaddress
-import socket
+"""
+The full client command line, with the interactive REPL.
+
+Bots replaying game files should prefer `python -m src.client`, which
+starts several times faster; see `src.client.__main__`.
+"""
+
+import asyncio
 import sys
-from collections.abc import Callable
+from collections.abc import Callable, Iterator
 from pathlib import Path
-from typing import Annotated, TextIO
+from typing import Annotated
 
 import typer
 from loguru import logger
-from rich import print  # noqa: A004
-from rich.console import Console
 
-from src.validation import validate_filename, validate_interface, validate_port
-
-err_console = Console(stderr=True)
+from src.client import ClientError, connect, iter_moves, play, repl
+from src.client.aio import run_session
+from src.client.threaded import RECONNECT_ATTEMPTS
+from src.validation import (
+    ClientEngine,
+    validate_filename,
+    validate_interface,
+    validate_port,
+    validate_window,
+)
 
 app = typer.Typer(
     add_completion=False,
@@ -22,6 +33,7 @@ app = typer.Typer(
 
 @app.command()
 def main(
+    *,
     interface: Annotated[
         str,
         typer.Option(
@@ -51,11 +63,53 @@ def main(
             '-f',
             show_default=False,
             callback=validate_filename,
-            help='Path to a moves file to replay. (placeholder)',
+            help='Path to a moves file to replay.',
             rich_help_panel='Gameplay',
         ),
     ] = None,
-    verbose: Annotated[  # noqa: FBT002
+    window: Annotated[
+        int,
+        typer.Option(
+            '--window',
+            '-w',
+            show_default=True,
+            callback=validate_window,
+            help='Moves in flight while replaying --filename.',
+            rich_help_panel='Gameplay',
+        ),
+    ] = 32,
+    binary: Annotated[
+        bool,
+        typer.Option(
+            '--binary',
+            '-b',
+            help='Negotiate the compact binary protocol instead of text.',
+            show_default=False,
+            rich_help_panel='Networking',
+        ),
+    ] = False,
+    engine: Annotated[
+        ClientEngine,
+        typer.Option(
+            '--engine',
+            '-e',
+            show_default=True,
+            help='Client engine: lock-step on a thread, or full-duplex on asyncio.',
+            rich_help_panel='Networking',
+        ),
+    ] = ClientEngine.THREADED,
+    reconnect: Annotated[
+        int,
+        typer.Option(
+            '--reconnect',
+            '-r',
+            show_default=True,
+            min=0,
+            help='Times the REPL reconnects and resumes its game after a drop; 0 for never.',
+            rich_help_panel='Networking',
+        ),
+    ] = RECONNECT_ATTEMPTS,
+    verbose: Annotated[
         bool,
         typer.Option(
             '--verbose',
@@ -79,23 +133,30 @@ def main(
         interface=interface,
         port=port,
         filename=filename,
+        window=window,
+        binary=binary,
+        engine=engine,
+        reconnect=reconnect,
         verbose=verbose,
         log_file=log_file,
     )
 
 
 def run_client(
+    *,
     interface: str = '127.0.0.1',
     port: int = 2000,
     filename: Path | None = None,
-    verbose: bool = False,  # noqa: FBT001, FBT002
+    verbose: bool = False,
     log_file: Path | None = None,
     input_func: Callable[[], str] | None = None,
+    window: int = 32,
+    binary: bool = False,
+    engine: ClientEngine = ClientEngine.THREADED,
+    reconnect: int = RECONNECT_ATTEMPTS,
 ) -> None:
     """Connect and run the client REPL; parameterized for tests."""
     # TODO: add proper error handling for socket errors
-    # TODO: support streaming from --filename
-    # TODO: print server responses asynchronously
     logger.remove()
     level = 'DEBUG' if verbose else 'INFO'
     if log_file is not None:
@@ -106,53 +167,33 @@ def run_client(
     if verbose:
         logger.debug('🔊 Verbose mode enabled')
 
-    if input_func is None:
-        input_func = input
-
-    ip = ipaddress.ip_address(interface)
-    family = socket.AF_INET6 if ip.version == 6 else socket.AF_INET  # noqa: PLR2004
-    server_addr = (interface, port, 0, 0) if ip.version == 6 else (interface, port)  # noqa: PLR2004
-
-    with socket.socket(family, socket.SOCK_STREAM) as sock:
-        logger.info('🛰️ Connecting to {}:{} ({})', interface, port, family.name)
+    lines = iter_moves(filename) if filename is not None else None
+    try:
+        if engine == ClientEngine.ASYNCIO:
+            if lines is None and input_func is not None:
+                lines = _inputs(input_func)
+            asyncio.run(run_session(interface, port, lines, window=window, binary=binary))
+        elif lines is None:
+            repl(interface, port, binary, input_func or input, reconnect)
+        else:
+            with connect(interface, port) as sock:
+                play(sock, lines, window, binary)
+    except KeyboardInterrupt:
+        logger.info('👋 Disconnecting')
+    except ClientError as exc:
+        from rich.console import Console  # noqa: PLC0415
+
+        Console(stderr=True).print(str(exc))
+        raise typer.Exit(code=1) from exc
+
+
+def _inputs(input_func: Callable[[], str]) -> Iterator[str]:
+    """Yield the lines returned by `input_func` until it runs out."""
+    while True:
         try:
-            sock.connect(server_addr)
-        except OSError as exc:
-            err_msg = exc.strerror or str(exc)
-            err_console.print(f'Could not connect to {interface}:{port} {err_msg}')
-            raise typer.Exit(code=1) from exc
-        logger.info('✅ Connected')
-
-        with sock.makefile('r', encoding='utf-8') as fh:
-            while True:
-                try:
-                    line = input_func()
-                except (EOFError, KeyboardInterrupt, StopIteration):
-                    logger.info('👋 Disconnecting')
-                    break
-
-                msg = line.strip()
-                if not msg:
-                    continue
-                logger.debug('>> {}', msg)
-                sock.sendall(f'{msg}\n'.encode())
-
-                response = _read_message(fh)
-                if response == '':
-                    logger.info('⛔ Server closed the connection')
-                    break
-                logger.debug('<< {}', response)
-                print(response)
-
-
-def _read_message(fh: TextIO) -> str:
-    """Read until a blank line terminator and return the message text."""
-    lines: list[str] = []
-    for line in fh:
-        if line == '\n':
-            break
-        lines.append(line.rstrip('\n'))
-    return '\n'.join(lines)
+            yield input_func()
+        except EOFError, StopIteration:
+            return
 
 
 if __name__ == '__main__':
@@ -1,17 +1,34 @@
-import ipaddress
-import socket
-import sys
 from pathlib import Path
 from queue import Queue
-from threading import Event, Thread
+from threading import Event
 from typing import Annotated
 
-import chess
 import typer
 from loguru import logger
 
-from src.protocol import GameOver, process_line
-from src.validation import validate_interface, validate_port
+from src.protocol.positions import POSITION_CACHE_PLY, POSITION_CACHE_SIZE
+from src.server import ServerOptions, serve, serve_workers
+from src.server.admission import (
+    CONNECTION_TIMEOUT,
+    MAX_CONNECTIONS,
+    READ_TIMEOUT,
+    Overflow,
+)
+from src.server.batching import BATCH_TICK
+from src.server.fanout import QUEUE_LIMIT, Policy
+from src.server.games import IDLE_TIMEOUT, MAX_GAMES
+from src.server.journal import FSYNC_INTERVAL
+from src.server.listener import bind_listener, server_address
+from src.server.logs import LogMode, configure_logging
+from src.server.profiling import ProfileMode
+from src.validation import (
+    Engine,
+    validate_engine,
+    validate_interface,
+    validate_port,
+    validate_positive,
+    validate_workers,
+)
 
 app = typer.Typer(
     add_completion=False,
@@ -21,6 +38,7 @@ app = typer.Typer(
 
 @app.command()
 def main(
+    *,
     interface: Annotated[
         str,
         typer.Option(
@@ -43,7 +61,206 @@ def main(
             rich_help_panel='Networking',
         ),
     ] = 2000,
-    verbose: Annotated[  # noqa: FBT002
+    max_connections: Annotated[
+        int,
+        typer.Option(
+            '--max-connections',
+            show_default=True,
+            callback=validate_positive,
+            help='Clients served at once by each worker; the overflow policy applies beyond it.',
+            rich_help_panel='Networking',
+        ),
+    ] = MAX_CONNECTIONS,
+    overflow: Annotated[
+        Overflow,
+        typer.Option(
+            '--overflow',
+            show_default=True,
+            case_sensitive=False,
+            help='Tell clients beyond the limit the server is busy, or queue them.',
+            rich_help_panel='Networking',
+        ),
+    ] = Overflow.REJECT,
+    idle_timeout: Annotated[
+        float,
+        typer.Option(
+            '--idle-timeout',
+            show_default=True,
+            callback=validate_positive,
+            help='Seconds a client may send nothing before it is disconnected.',
+            rich_help_panel='Networking',
+        ),
+    ] = CONNECTION_TIMEOUT,
+    read_timeout: Annotated[
+        float,
+        typer.Option(
+            '--read-timeout',
+            show_default=True,
+            callback=validate_positive,
+            help='Seconds a client may take to finish a line it started sending.',
+            rich_help_panel='Networking',
+        ),
+    ] = READ_TIMEOUT,
+    engine: Annotated[
+        Engine,
+        typer.Option(
+            '--engine',
+            '-e',
+            show_default=True,
+            callback=validate_engine,
+            help='Connection engine: client threads, one asyncio loop, or batched threads.',
+            rich_help_panel='Performance',
+        ),
+    ] = Engine.THREADED,
+    batch_tick: Annotated[
+        float,
+        typer.Option(
+            '--batch-tick',
+            show_default=True,
+            callback=validate_positive,
+            help='With the batched engine, seconds a move waits for others to batch with.',
+            rich_help_panel='Performance',
+        ),
+    ] = BATCH_TICK,
+    workers: Annotated[
+        int,
+        typer.Option(
+            '--workers',
+            '-w',
+            show_default=True,
+            callback=validate_workers,
+            help='Worker processes sharing the port; games stay on their worker.',
+            rich_help_panel='Performance',
+        ),
+    ] = 1,
+    max_games: Annotated[
+        int,
+        typer.Option(
+            '--max-games',
+            show_default=True,
+            callback=validate_positive,
+            help='Games kept in memory at once; new games are refused beyond it.',
+            rich_help_panel='Games',
+        ),
+    ] = MAX_GAMES,
+    game_timeout: Annotated[
+        float,
+        typer.Option(
+            '--game-timeout',
+            show_default=True,
+            callback=validate_positive,
+            help='Seconds an unattended shared game is kept before eviction.',
+            rich_help_panel='Games',
+        ),
+    ] = IDLE_TIMEOUT,
+    fanout_queue: Annotated[
+        int,
+        typer.Option(
+            '--fanout-queue',
+            show_default=True,
+            callback=validate_positive,
+            help='Broadcasts queued per opponent or spectator before the policy applies.',
+            rich_help_panel='Games',
+        ),
+    ] = QUEUE_LIMIT,
+    fanout_policy: Annotated[
+        Policy,
+        typer.Option(
+            '--fanout-policy',
+            show_default=True,
+            case_sensitive=False,
+            help='Drop the oldest broadcast or disconnect a subscriber that falls behind.',
+            rich_help_panel='Games',
+        ),
+    ] = Policy.DROP,
+    journal: Annotated[
+        Path | None,
+        typer.Option(
+            '--journal',
+            show_default=False,
+            help='Journal shared games to this file and restore them on startup.',
+            rich_help_panel='Games',
+        ),
+    ] = None,
+    journal_interval: Annotated[
+        float,
+        typer.Option(
+            '--journal-interval',
+            show_default=True,
+            callback=validate_positive,
+            help='Seconds between journal fsyncs; moves in between are committed together.',
+            rich_help_panel='Games',
+        ),
+    ] = FSYNC_INTERVAL,
+    hibernate_after: Annotated[
+        float,
+        typer.Option(
+            '--hibernate-after',
+            show_default=True,
+            min=0,
+            help='Park games idle this many seconds on disk until used again; 0 for never.',
+            rich_help_panel='Games',
+        ),
+    ] = 0.0,
+    hibernate_dir: Annotated[
+        Path | None,
+        typer.Option(
+            '--hibernate-dir',
+            show_default=False,
+            help='Directory of the hibernated games file; the temporary directory by default.',
+            rich_help_panel='Games',
+        ),
+    ] = None,
+    position_cache: Annotated[
+        int,
+        typer.Option(
+            '--position-cache',
+            show_default=True,
+            min=0,
+            help='Opening positions whose legal moves are shared by all games; 0 disables.',
+            rich_help_panel='Performance',
+        ),
+    ] = POSITION_CACHE_SIZE,
+    position_cache_ply: Annotated[
+        int,
+        typer.Option(
+            '--position-cache-ply',
+            show_default=True,
+            min=0,
+            help='Half-moves into a game up to which positions are shared.',
+            rich_help_panel='Performance',
+        ),
+    ] = POSITION_CACHE_PLY,
+    metrics: Annotated[
+        bool,
+        typer.Option(
+            '--metrics',
+            show_default=False,
+            help='Record latency and traffic metrics, reported by the `stats` command.',
+            rich_help_panel='Performance',
+        ),
+    ] = False,
+    profile: Annotated[
+        ProfileMode,
+        typer.Option(
+            '--profile',
+            show_default=True,
+            case_sensitive=False,
+            help='Sample busy stacks, time every request stage, or both; local clients '
+            'switch it live with `profile`.',
+            rich_help_panel='Performance',
+        ),
+    ] = ProfileMode.OFF,
+    profile_output: Annotated[
+        Path | None,
+        typer.Option(
+            '--profile-output',
+            show_default=False,
+            help='Write collapsed stacks here when profiling stops or the server exits.',
+            rich_help_panel='Performance',
+        ),
+    ] = None,
+    verbose: Annotated[
         bool,
         typer.Option(
             '--verbose',
@@ -61,94 +278,94 @@ def main(
             show_default=False,
         ),
     ] = None,
+    log_mode: Annotated[
+        LogMode,
+        typer.Option(
+            '--log-mode',
+            show_default=True,
+            case_sensitive=False,
+            help='Write logs from the logging thread, or queue them for a writer thread.',
+        ),
+    ] = LogMode.SYNC,
+    trace_sample: Annotated[
+        int,
+        typer.Option(
+            '--trace-sample',
+            show_default=True,
+            min=0,
+            help='With -v, log the requests of one connection in this many; 0 for none.',
+        ),
+    ] = 1,
 ) -> None:
     """Start the chess server and process moves from multiple clients."""
-    run_server(interface=interface, port=port, verbose=verbose, log_file=log_file)
+    options = ServerOptions(
+        engine=engine,
+        batch_tick=batch_tick,
+        verbose=verbose,
+        log_file=log_file,
+        log_mode=log_mode,
+        trace_sample=trace_sample,
+        max_games=max_games,
+        game_timeout=game_timeout,
+        fanout_queue=fanout_queue,
+        fanout_policy=fanout_policy,
+        journal=journal,
+        journal_interval=journal_interval,
+        hibernate_after=hibernate_after,
+        hibernate_dir=hibernate_dir,
+        position_cache=position_cache,
+        position_cache_ply=position_cache_ply,
+        metrics=metrics,
+        max_connections=max_connections,
+        overflow=overflow,
+        idle_timeout=idle_timeout,
+        read_timeout=read_timeout,
+        profile=profile,
+        profile_output=profile_output,
+    )
+    run_server(interface, port, options, workers=workers)
 
 
 def run_server(
     interface: str = '127.0.0.1',
     port: int = 2000,
-    verbose: bool = False,  # noqa: FBT001, FBT002
-    log_file: Path | None = None,
+    options: ServerOptions | None = None,
+    *,
+    workers: int = 1,
     port_queue: Queue[int] | None = None,
     stop_event: Event | None = None,
 ) -> None:
     """Run the TCP listener with extra options for testing."""
-    logger.remove()
-    level = 'DEBUG' if verbose else 'INFO'
-    if log_file is not None:
-        logger.add(str(log_file), level=level)
-    else:
-        logger.add(sys.stderr, level=level)
-
-    if verbose:
-        logger.debug('🔊 Verbose mode enabled')
+    options = options if options is not None else ServerOptions()
+    configure_logging(options.verbose, options.log_file, options.log_mode, options.trace_sample)
 
-    ip = ipaddress.ip_address(interface)
-    family = socket.AF_INET6 if ip.version == 6 else socket.AF_INET  # noqa: PLR2004
-    bind_addr = (interface, port, 0, 0) if ip.version == 6 else (interface, port)  # noqa: PLR2004
+    if options.verbose:
+        logger.debug('🔊 Verbose mode enabled')
 
-    with socket.socket(family, socket.SOCK_STREAM) as listener:
-        listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        listener.settimeout(0.2)
+    family, bind_addr = server_address(interface, port)
 
-        logger.debug('🔌 Binding on {}:{} ({})', interface, port, family.name)
-        listener.bind(bind_addr)
+    logger.debug('🔌 Binding on {}:{} ({})', interface, port, family.name)
+    with bind_listener(family, bind_addr, reuse_port=workers > 1) as listener:
         actual_port = listener.getsockname()[1]
         logger.debug('✅ Bound on {}:{}', interface, port)
 
+        if workers > 1:
+            # The supervisor only reserves the port (resolving port 0); the
+            # workers each listen on it and the kernel balances between them.
+            if port_queue is not None:
+                port_queue.put(actual_port)
+            logger.info('🛰️ Listening on {}:{} with {} workers', interface, actual_port, workers)
+            _, worker_addr = server_address(interface, actual_port)
+            serve_workers(family, worker_addr, workers, options, stop_event)
+            return
+
         logger.info('🛰️ Listening on {}:{}', interface, actual_port)
         listener.listen()
 
         if port_queue is not None:
             port_queue.put(actual_port)
 
-        client_threads: list[Thread] = []
-        try:
-            while stop_event is None or not stop_event.is_set():
-                try:
-                    sock, addr = listener.accept()
-                except TimeoutError:
-                    continue
-
-                handler = Thread(
-                    target=_handle_client,
-                    args=(sock, addr),
-                    daemon=True,
-                )
-                handler.start()
-                client_threads.append(handler)
-        finally:
-            for thread in client_threads:
-                thread.join(timeout=1.0)
-
-
-def _handle_client(sock: socket.socket, addr: tuple[str, int]) -> None:
-    board = chess.Board()
-    with sock, sock.makefile('r', encoding='utf-8') as fh:
-        logger.info('🌐 Client connected: {}', addr)
-
-        for raw in fh:
-            line = raw.strip()
-            logger.debug('<< {}', line)
-            try:
-                response = process_line(board, line)
-            except GameOver as e:
-                response = str(e)
-                _reply(sock, response)
-                logger.debug('>> {}', response)
-                logger.info('🏁 Game over, closing connection')
-                break
-            _reply(sock, response)
-            # TODO: handle multiline responses properly
-            logger.debug('>> {}', response)
-
-        logger.info('👋 Client disconnected')
-
-
-def _reply(sock: socket.socket, text: str) -> None:
-    sock.sendall(f'{text}\n\n'.encode())
+        serve(listener, options, stop_event)
 
 
 if __name__ == '__main__':
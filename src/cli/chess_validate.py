@@ -0,0 +1,204 @@
+import multiprocessing as mp
+import os
+import sys
+import time
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import AbstractContextManager, nullcontext
+from itertools import batched, chain
+from pathlib import Path
+from typing import Annotated, TextIO
+
+import typer
+from loguru import logger
+
+from src.protocol.replay import FileSummary, Result, replay_file, replay_files
+from src.validation import validate_batch, validate_positive, validate_workers
+
+CHUNK_SIZE = 64
+
+app = typer.Typer(
+    add_completion=False,
+    context_settings={'help_option_names': ['-h', '--help']},
+)
+
+
+@app.command()
+def main(
+    paths: Annotated[
+        list[Path],
+        typer.Argument(
+            exists=True,
+            show_default=False,
+            help='Game files, or directories searched recursively for them.',
+        ),
+    ],
+    *,
+    workers: Annotated[
+        int,
+        typer.Option(
+            '--workers',
+            '-w',
+            show_default=True,
+            callback=validate_workers,
+            help='Processes replaying files in parallel.',
+            rich_help_panel='Performance',
+        ),
+    ] = os.process_cpu_count() or 1,
+    chunk_size: Annotated[
+        int,
+        typer.Option(
+            '--chunk-size',
+            show_default=True,
+            callback=validate_positive,
+            help='Files handed to a worker at a time.',
+            rich_help_panel='Performance',
+        ),
+    ] = CHUNK_SIZE,
+    batch: Annotated[
+        bool,
+        typer.Option(
+            '--batch',
+            callback=validate_batch,
+            help='Replay each chunk of files in lockstep on NumPy bitboards.',
+            show_default=False,
+            rich_help_panel='Performance',
+        ),
+    ] = False,
+    output: Annotated[
+        Path | None,
+        typer.Option(
+            '--output',
+            '-o',
+            show_default=False,
+            help='Write the per-file summary here instead of to stdout.',
+        ),
+    ] = None,
+    verbose: Annotated[
+        bool,
+        typer.Option(
+            '--verbose',
+            '-v',
+            help='Enable verbose logging.',
+            show_default=False,
+        ),
+    ] = False,
+    log_file: Annotated[
+        Path | None,
+        typer.Option(
+            '--log-file',
+            '-l',
+            help='Write logs to a file.',
+            show_default=False,
+        ),
+    ] = None,
+) -> None:
+    """Replay game files offline and report whether each one is valid."""
+    counts = run_validate(
+        paths,
+        workers=workers,
+        chunk_size=chunk_size,
+        batch=batch,
+        output=output,
+        verbose=verbose,
+        log_file=log_file,
+    )
+    if counts[Result.INVALID] or counts[Result.UNREADABLE]:
+        raise typer.Exit(code=1)
+
+
+def run_validate(
+    paths: Iterable[Path],
+    *,
+    workers: int = 1,
+    chunk_size: int = CHUNK_SIZE,
+    batch: bool = False,
+    output: Path | None = None,
+    verbose: bool = False,
+    log_file: Path | None = None,
+) -> Counter[Result]:
+    """
+    Replay every game file under `paths` and write one summary line each.
+
+    Lines are tab-separated: path, result, moves applied, first rejected
+    line number and its text. They follow the order the files were found.
+    With `batch`, each chunk of files is replayed by `replay_files`.
+
+    Returns:
+        How many files had each result.
+    """
+    logger.remove()
+    level = 'DEBUG' if verbose else 'INFO'
+    if log_file is not None:
+        logger.add(str(log_file), level=level)
+    else:
+        logger.add(sys.stderr, level=level)
+
+    counts: Counter[Result] = Counter()
+    start = time.perf_counter()
+    with _open_output(output) as out:
+        for summary in _replay_all(iter_game_files(paths), workers, chunk_size, batch=batch):
+            counts[summary.result] += 1
+            out.write(format_summary(summary))
+
+    elapsed = time.perf_counter() - start
+    total = counts.total()
+    logger.info(
+        '🏁 Replayed {} files in {:.2f}s ({:.0f} files/s): {}',
+        total,
+        elapsed,
+        total / elapsed if elapsed else 0,
+        ', '.join(f'{count} {result}' for result, count in counts.most_common()) or 'none',
+    )
+    return counts
+
+
+def iter_game_files(paths: Iterable[Path]) -> Iterator[Path]:
+    """Yield the given files, and the files under directories sorted."""
+    for path in paths:
+        if path.is_dir():
+            yield from sorted(child for child in path.rglob('*') if child.is_file())
+        else:
+            yield path
+
+
+def format_summary(summary: FileSummary) -> str:
+    """Return the tab-separated summary line of one file."""
+    first_invalid = '' if summary.first_invalid is None else summary.first_invalid
+    fields = (summary.path, summary.result, summary.moves, first_invalid, summary.detail)
+    return '\t'.join(map(str, fields)) + '\n'
+
+
+def _replay_all(
+    files: Iterable[Path], workers: int, chunk_size: int, *, batch: bool = False
+) -> Iterator[FileSummary]:
+    if batch:
+        # A chunk is replayed together, so it is handed out whole.
+        chunks = batched(files, chunk_size, strict=False)
+        if workers == 1:
+            yield from chain.from_iterable(map(replay_files, chunks))
+            return
+        logger.debug('🧵 Replaying batches with {} workers, {} files each', workers, chunk_size)
+        with ProcessPoolExecutor(workers, mp_context=mp.get_context('spawn')) as pool:
+            yield from chain.from_iterable(pool.map(replay_files, chunks))
+        return
+
+    if workers == 1:
+        yield from map(replay_file, files)
+        return
+
+    logger.debug('🧵 Replaying with {} workers, {} files per chunk', workers, chunk_size)
+    # Spawned like the server workers, so no parent threads or locks leak in.
+    with ProcessPoolExecutor(workers, mp_context=mp.get_context('spawn')) as pool:
+        yield from pool.map(replay_file, files, chunksize=chunk_size)
+
+
+def _open_output(output: Path | None) -> AbstractContextManager[TextIO]:
+    if output is None:
+        return nullcontext(sys.stdout)
+    return output.open('w', encoding='utf-8')
+
+
+if __name__ == '__main__':
+    app()
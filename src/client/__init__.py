@@ -0,0 +1,3 @@
+from .threaded import ClientError, connect, iter_moves, play, repl
+
+__all__ = ['ClientError', 'connect', 'iter_moves', 'play', 'repl']
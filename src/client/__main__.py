@@ -0,0 +1,98 @@
+"""
+Replay game files with as little startup work as possible.
+
+    python -m src.client game.txt --port 2000 --window 32
+    python -m src.client games/*.txt --concurrency 500
+
+This is the entry point for bots that start a client process per game. It
+parses its options with argparse instead of typer, prints the replies to
+stdout undecorated, and logs nothing unless `--verbose` is given, so a
+text-mode replay of one file imports only the standard library and the
+client itself. Several files are replayed concurrently on one asyncio loop,
+each reply line prefixed with its file name. Everything else, the REPL
+included, is in `chess_client`.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from src.client import ClientError, connect, iter_moves, play
+from src.client.log import silence
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='python -m src.client',
+        description='Replay moves files against the chess server and print the replies.',
+    )
+    parser.add_argument('filenames', type=Path, nargs='+', help='moves files to replay')
+    parser.add_argument('-i', '--interface', default='127.0.0.1', help='IP address to connect to')
+    parser.add_argument('-p', '--port', type=int, default=2000, help='TCP port to connect to')
+    parser.add_argument('-w', '--window', type=int, default=32, help='moves in flight')
+    parser.add_argument(
+        '-c', '--concurrency', type=int, default=1024, help='files replayed at once'
+    )
+    parser.add_argument('-b', '--binary', action='store_true', help='use the binary protocol')
+    parser.add_argument('-v', '--verbose', action='store_true', help='log to stderr')
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Replay the file given on the command line and return the exit code."""
+    parser = _parser()
+    args = parser.parse_args(argv)
+    if not 1 <= args.port <= 65535:  # noqa: PLR2004
+        parser.error('port must be between 1 and 65535')
+    if args.window < 1:
+        parser.error('window must be at least 1')
+    if args.concurrency < 1:
+        parser.error('concurrency must be at least 1')
+    for filename in args.filenames:
+        if not filename.is_file():
+            parser.error(f'{filename} is not a file')
+
+    if args.verbose:
+        from loguru import logger  # noqa: PLC0415
+
+        logger.remove()
+        logger.add(sys.stderr, level='DEBUG')
+    else:
+        silence()
+
+    if len(args.filenames) > 1:
+        return _replay_concurrently(args)
+    try:
+        with connect(args.interface, args.port) as sock:
+            play(sock, iter_moves(args.filenames[0]), args.window, args.binary)
+    except ClientError as exc:
+        sys.stderr.write(f'{exc}\n')
+        return 1
+    return 0
+
+
+def _replay_concurrently(args: argparse.Namespace) -> int:
+    """Replay every file on its own connection and report the failures."""
+    import asyncio  # noqa: PLC0415
+
+    from src.client.aio import run_sessions  # noqa: PLC0415
+
+    games = [(str(path), iter_moves(path)) for path in args.filenames]
+    failed = asyncio.run(
+        run_sessions(
+            args.interface,
+            args.port,
+            games,
+            window=args.window,
+            binary=args.binary,
+            concurrency=args.concurrency,
+        )
+    )
+    if failed:
+        sys.stderr.write(f'{failed} of {len(games)} games failed\n')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,239 @@
+"""
+The asyncio client: a reader and a writer task per connection.
+
+The threaded REPL sends a line and then blocks on its reply, so anything
+the server pushes in between, like the opponent's move in a shared game,
+only shows up after the next input. Here the writer sends lines as they
+come, from a file or from stdin without blocking the loop, while the reader
+prints every message as soon as it is complete. Messages are printed whole
+and in the order they arrive, so a broadcast never splits a reply.
+
+`run_sessions` runs many connections on the same loop, which lets a single
+bot process drive thousands of games.
+"""
+
+import asyncio
+import socket
+import sys
+from collections.abc import AsyncIterable, AsyncIterator, Callable, Iterable
+from contextlib import suppress
+
+from src.client.codec import encode_binary, encode_text, render_frame
+from src.client.log import logger
+from src.client.threaded import ClientError
+from src.protocol.frames import FrameDecoder, FrameError
+
+REPLY_END = b'\n\n'
+READ_SIZE = 64 * 1024
+MAX_SESSIONS = 1024
+MAX_UNANSWERED = 64
+
+type Lines = Iterable[str] | AsyncIterable[str]
+
+
+def _print(message: str) -> None:
+    sys.stdout.write(f'{message}\n')
+
+
+async def run_session(
+    interface: str,
+    port: int,
+    lines: Lines | None = None,
+    *,
+    window: int = 32,
+    binary: bool = False,
+    out: Callable[[str], None] = _print,
+) -> None:
+    """
+    Send `lines`, or stdin if None, and pass every message received to `out`.
+
+    Up to `window` lines may wait for a reply. A broadcast frees a slot as
+    well, so the window is a soft limit. Once the lines run out the socket
+    is half-closed, and the session ends when the server closes it.
+
+    Raises:
+        ClientError: If the server cannot be reached or refuses the binary
+            protocol.
+    """
+    reader, writer = await _connect(interface, port)
+    try:
+        if binary:
+            await _negotiate_binary(reader, writer)
+        slots = asyncio.Semaphore(window)
+        encode, receive = (encode_binary, _receive_frames) if binary else (encode_text, _receive)
+        source = lines if lines is not None else stdin_lines()
+        sender = asyncio.create_task(_send(writer, source, encode, slots))
+        try:
+            await receive(reader, out, slots)
+        finally:
+            sender.cancel()
+            await asyncio.gather(sender, return_exceptions=True)
+        logger.info('⛔ Server closed the connection')
+    finally:
+        writer.close()
+        with suppress(ConnectionError):
+            await writer.wait_closed()
+
+
+async def run_sessions(
+    interface: str,
+    port: int,
+    games: Iterable[tuple[str, Lines]],
+    *,
+    window: int = 32,
+    binary: bool = False,
+    concurrency: int = MAX_SESSIONS,
+    out: Callable[[str], None] = _print,
+) -> int:
+    """
+    Replay each `(label, lines)` game on its own connection.
+
+    At most `concurrency` connections are open at once, and at most
+    `MAX_UNANSWERED` of them are waiting for their first message, since
+    those may still sit in the server's accept queue and a full queue
+    resets new connections. Every line passed to `out` starts with its
+    game's label. Games that fail are logged and do not stop the others.
+
+    Returns:
+        The number of games that failed.
+    """
+    slots = asyncio.Semaphore(concurrency)
+    unanswered = asyncio.Semaphore(MAX_UNANSWERED)
+
+    async def replay(label: str, lines: Lines) -> bool:
+        answered = False
+
+        def receive(message: str) -> None:
+            nonlocal answered
+            if not answered:
+                answered = True
+                unanswered.release()
+            _label(out, label, message)
+
+        async with slots:
+            await unanswered.acquire()
+            try:
+                await run_session(interface, port, lines, window=window, binary=binary, out=receive)
+            except (ClientError, ConnectionError, FrameError) as exc:
+                logger.warning('⚠️ {}: {}', label, exc)
+                return False
+            finally:
+                if not answered:
+                    unanswered.release()
+        return True
+
+    results = await asyncio.gather(*(replay(label, lines) for label, lines in games))
+    return results.count(False)
+
+
+async def stdin_lines() -> AsyncIterator[str]:
+    """Yield the lines typed on stdin without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    try:
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    except OSError, ValueError:
+        # stdin is a regular file, which is not selectable but never blocks.
+        reader.feed_data(sys.stdin.buffer.read())
+        reader.feed_eof()
+    while line := await reader.readline():
+        yield line.decode()
+    logger.info('👋 Disconnecting')
+
+
+async def _connect(interface: str, port: int) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    logger.info('🛰️ Connecting to {}:{}', interface, port)
+    try:
+        streams = await asyncio.open_connection(interface, port, flags=socket.AI_NUMERICHOST)
+    except socket.gaierror as exc:
+        msg = f'Invalid interface {interface}: {exc.strerror}'
+        raise ClientError(msg) from exc
+    except OSError as exc:
+        msg = f'Could not connect to {interface}:{port} {exc.strerror or exc}'
+        raise ClientError(msg) from exc
+    logger.info('✅ Connected')
+    return streams
+
+
+async def _negotiate_binary(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """
+    Ask the server to switch the connection to binary framing.
+
+    Raises:
+        ClientError: If the server does not acknowledge the switch.
+    """
+    writer.write(b'binary\n')
+    try:
+        reply = await reader.readuntil(REPLY_END)
+    except asyncio.IncompleteReadError:
+        reply = b''
+    if reply != b'OK\n\n':
+        msg = 'Server refused the binary protocol'
+        raise ClientError(msg)
+    logger.debug('🔢 Binary protocol negotiated')
+
+
+async def _send(
+    writer: asyncio.StreamWriter,
+    lines: Lines,
+    encode: Callable[[str], bytes],
+    slots: asyncio.Semaphore,
+) -> None:
+    """Send each non-blank line once a window slot is free, then half-close."""
+    try:
+        async for raw in _iterate(lines):
+            line = raw.strip()
+            if not line:
+                continue
+            await slots.acquire()
+            logger.debug('>> {}', line)
+            writer.write(encode(line))
+            await writer.drain()
+        writer.write_eof()
+    except OSError as exc:
+        logger.debug('⚠️ Stopped sending: {}', exc)
+
+
+async def _receive(
+    reader: asyncio.StreamReader, out: Callable[[str], None], slots: asyncio.Semaphore
+) -> None:
+    """Pass each blank-line terminated message to `out` until EOF."""
+    try:
+        while True:
+            message = (await reader.readuntil(REPLY_END))[: -len(REPLY_END)].decode()
+            logger.debug('<< {}', message)
+            out(message)
+            slots.release()
+    except asyncio.IncompleteReadError:
+        return
+
+
+async def _receive_frames(
+    reader: asyncio.StreamReader, out: Callable[[str], None], slots: asyncio.Semaphore
+) -> None:
+    """
+    Pass the text rendering of each frame to `out` until EOF.
+
+    Raises:
+        FrameError: If the server sends a malformed frame.
+    """
+    decoder = FrameDecoder()
+    while data := await reader.read(READ_SIZE):
+        for opcode, payload in decoder.feed(data):
+            message = render_frame(opcode, payload)
+            logger.debug('<< {}', message)
+            out(message)
+            slots.release()
+
+
+async def _iterate(lines: Lines) -> AsyncIterator[str]:
+    if isinstance(lines, AsyncIterable):
+        async for line in lines:
+            yield line
+    else:
+        for line in lines:
+            yield line
+
+
+def _label(out: Callable[[str], None], label: str, message: str) -> None:
+    out('\n'.join(f'{label}: {line}' for line in message.split('\n')))
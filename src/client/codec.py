@@ -0,0 +1,82 @@
+"""
+The client side of the wire formats, shared by both clients.
+
+Requests are encoded as text lines or binary frames, and replies are read
+back as the text the server would have sent. Like the clients, this module
+loads python-chess only when the first move record is rendered.
+"""
+
+from typing import BinaryIO, TextIO
+
+from src.protocol.frames import FrameError, Opcode, encode_frame, encode_squares
+from src.validation import STRIKE
+
+
+def encode_text(line: str) -> bytes:
+    """Encode a request line for the text protocol."""
+    return f'{line}\n'.encode()
+
+
+def encode_binary(line: str) -> bytes:
+    """Encode a request line as a binary frame, packing well-formed moves."""
+    if STRIKE.fullmatch(line):
+        move = line.lower()
+        from_square = ord(move[0]) - ord('a') + 8 * (int(move[1]) - 1)
+        to_square = ord(move[3]) - ord('a') + 8 * (int(move[4]) - 1)
+        return encode_frame(Opcode.MOVE, encode_squares(from_square, to_square))
+    return encode_frame(Opcode.LINE, line.encode())
+
+
+def read_message(fh: TextIO) -> str:
+    """Read until a blank line terminator and return the message text."""
+    lines: list[str] = []
+    for line in fh:
+        if line == '\n':
+            break
+        lines.append(line.rstrip('\n'))
+    return '\n'.join(lines)
+
+
+def read_frame(fh: BinaryIO) -> str:
+    """
+    Read one binary frame and return its text rendering, or '' at EOF.
+
+    Raises:
+        FrameError: If the server sends a malformed frame.
+    """
+    header = fh.read(1)
+    if not header:
+        return ''
+    length = shift = 0
+    while (byte := fh.read(1)) and byte[0] & 0x80:
+        length |= (byte[0] & 0x7F) << shift
+        shift += 7
+    if not byte:
+        return ''
+    length |= byte[0] << shift
+    return render_frame(header[0], fh.read(length))
+
+
+def render_frame(opcode: int, payload: bytes) -> str:
+    """
+    Return the text rendering of a frame from the server.
+
+    Raises:
+        FrameError: If the opcode is not one the server replies with.
+    """
+    if opcode == Opcode.EVENT:
+        return _describe_record(payload)
+    if opcode == Opcode.TEXT:
+        return payload.decode()
+    if opcode == Opcode.INVALID:
+        return 'Invalid move'
+    msg = f'unexpected opcode {opcode:#04x} from server'
+    raise FrameError(msg)
+
+
+def _describe_record(payload: bytes) -> str:
+    """Render a move record like the text protocol; loads python-chess."""
+    from src.protocol.binary import decode_event  # noqa: PLC0415
+    from src.protocol.core import describe_move  # noqa: PLC0415
+
+    return describe_move(decode_event(payload))
@@ -0,0 +1,36 @@
+"""
+Client logging that only imports loguru once something is logged.
+
+Importing loguru also imports asyncio, which takes longer than everything
+else the client imports together. The client modules log through `logger`
+below, which forwards to loguru's logger on first use, or drops every call
+once `silence` has been called so that a quiet replay never loads it.
+"""
+
+from collections.abc import Callable
+
+
+class _LazyLogger:
+    """Stand-in for loguru's logger that imports it on first use."""
+
+    def __init__(self) -> None:
+        self.silenced = False
+
+    def __getattr__(self, name: str) -> Callable[..., object]:
+        if self.silenced:
+            return _ignore
+        from loguru import logger as loguru_logger  # noqa: PLC0415
+
+        return getattr(loguru_logger, name)
+
+
+def _ignore(*_args: object, **_kwargs: object) -> None:
+    """Drop a log call."""
+
+
+logger = _LazyLogger()
+
+
+def silence() -> None:
+    """Drop every later log call without importing loguru."""
+    logger.silenced = True
@@ -0,0 +1,323 @@
+"""
+The blocking client: an interactive REPL and a pipelined file replay.
+
+Nothing here imports typer, rich, loguru or python-chess when the module
+is loaded. Rich is imported by the REPL, which prints with it, python-chess
+by the first move record read in binary mode, and loguru by the first log
+call (see `src.client.log`), so replaying a text game file needs only the
+standard library.
+"""
+
+import random
+import re
+import socket
+import sys
+import time
+from collections.abc import Callable, Iterable, Iterator
+from functools import partial
+from pathlib import Path
+from threading import Event, Semaphore, Thread
+from typing import BinaryIO
+
+from src.client.codec import encode_binary, encode_text, read_frame, read_message
+from src.client.log import logger
+from src.validation import COMMENT
+
+WRITER_POLL_INTERVAL = 0.2
+RECONNECT_ATTEMPTS = 5
+RECONNECT_DELAY = 0.2  # seconds before the first retry, doubled after each
+
+_RESUME_TOKEN = re.compile(r'^Resume token (\S+)$', re.MULTILINE)
+
+
+class ClientError(Exception):
+    """Raised when the client cannot connect or talk to the server."""
+
+
+def connect(interface: str, port: int) -> socket.socket:
+    """
+    Return a TCP socket connected to the server at an IP address and port.
+
+    Raises:
+        ClientError: If the address is not an IP address or the server
+            cannot be reached.
+    """
+    try:
+        family, kind, proto, _, address = socket.getaddrinfo(
+            interface, port, type=socket.SOCK_STREAM, flags=socket.AI_NUMERICHOST
+        )[0]
+    except socket.gaierror as exc:
+        msg = f'Invalid interface {interface}: {exc.strerror}'
+        raise ClientError(msg) from exc
+
+    sock = socket.socket(family, kind, proto)
+    logger.info('🛰️ Connecting to {}:{} ({})', interface, port, family.name)
+    try:
+        sock.connect(address)
+    except OSError as exc:
+        sock.close()
+        msg = f'Could not connect to {interface}:{port} {exc.strerror or exc}'
+        raise ClientError(msg) from exc
+    logger.info('✅ Connected')
+    return sock
+
+
+def play(
+    sock: socket.socket,
+    lines: Iterable[str] | None = None,
+    window: int = 32,
+    binary: bool = False,  # noqa: FBT001, FBT002
+    input_func: Callable[[], str] = input,
+) -> None:
+    """
+    Replay `lines` with up to `window` in flight, or else run the REPL.
+
+    Raises:
+        ClientError: If the server refuses the binary protocol.
+    """
+    with sock.makefile('rb' if binary else 'r', encoding=None if binary else 'utf-8') as fh:
+        if binary:
+            _negotiate_binary(sock, fh)
+            read, encode = partial(read_frame, fh), encode_binary
+        else:
+            read, encode = partial(read_message, fh), encode_text
+
+        if lines is not None:
+            _replay(sock, read, encode, lines, window)
+        else:
+            _repl(partial(_exchange, sock, read, encode), input_func)
+
+
+def repl(
+    interface: str,
+    port: int,
+    binary: bool = False,  # noqa: FBT001, FBT002
+    input_func: Callable[[], str] = input,
+    attempts: int = RECONNECT_ATTEMPTS,
+) -> None:
+    """
+    Run the REPL on a connection that resumes its game after a drop.
+
+    A resume token is asked for up front, for the connection's own game,
+    and taken from the replies to `start_game` and `join_game`; the server
+    releases a solo game's token once the REPL exits and closes the
+    connection, so only a dropped connection keeps its game. When the
+    connection fails, the client reconnects up to `attempts` times, resumes
+    its seat and sends the unanswered line again; a move the server had
+    already played is then refused, so nothing is played twice. With no
+    attempts this is the plain REPL of `play`.
+
+    Raises:
+        ClientError: If the server cannot be reached or refuses the binary
+            protocol.
+    """
+    if attempts == 0:
+        with connect(interface, port) as sock:
+            play(sock, None, binary=binary, input_func=input_func)
+        return
+
+    link = _Link(interface, port, binary, attempts)
+    try:
+        link.request('resume')
+        _repl(link.request, input_func)
+    finally:
+        link.close()
+
+
+def _repl(request: Callable[[str], str], input_func: Callable[[], str]) -> None:
+    """Send each input line and print the reply before reading the next."""
+    from rich import print  # noqa: A004, PLC0415
+
+    while True:
+        try:
+            line = input_func()
+        except EOFError, KeyboardInterrupt, StopIteration:
+            logger.info('👋 Disconnecting')
+            break
+
+        msg = line.strip()
+        if not msg:
+            continue
+        logger.debug('>> {}', msg)
+        response = request(msg)
+        if response == '':
+            logger.info('⛔ Server closed the connection')
+            break
+        logger.debug('<< {}', response)
+        print(response)
+
+
+def _exchange(
+    sock: socket.socket, read: Callable[[], str], encode: Callable[[str], bytes], line: str
+) -> str:
+    """Send one line and return its reply, or '' at EOF."""
+    sock.sendall(encode(line))
+    return read()
+
+
+class _Link:
+    """
+    A connection that is reopened, and its game resumed, when it drops.
+
+    Retries wait twice as long each time, from `RECONNECT_DELAY`, and the
+    wait is jittered so that clients dropped together, by a server restart
+    or a network failure, do not all reconnect at the same moment.
+    """
+
+    def __init__(
+        self,
+        interface: str,
+        port: int,
+        binary: bool,  # noqa: FBT001
+        attempts: int,
+    ) -> None:
+        """
+        Connect and negotiate the protocol.
+
+        Raises:
+            ClientError: If the server cannot be reached or refuses the
+                binary protocol.
+        """
+        self.interface, self.port, self.binary, self.attempts = interface, port, binary, attempts
+        self.token: str | None = None
+        self._open()
+
+    def request(self, line: str) -> str:
+        """Return the reply to a line, or '' once the game cannot be resumed."""
+        try:
+            reply = self._roundtrip(line)
+        except OSError as exc:
+            logger.debug('⚠️ Connection failed: {}', exc)
+            reply = ''
+        if not reply and self.token is not None:
+            reply = self._resume(line)
+        if match := _RESUME_TOKEN.search(reply):
+            self.token = match[1]
+        return reply
+
+    def close(self) -> None:
+        """Close the current connection."""
+        self._fh.close()
+        self._sock.close()
+
+    def _open(self) -> None:
+        self._sock = connect(self.interface, self.port)
+        self._fh = self._sock.makefile(
+            'rb' if self.binary else 'r', encoding=None if self.binary else 'utf-8'
+        )
+        if self.binary:
+            _negotiate_binary(self._sock, self._fh)
+            read, encode = partial(read_frame, self._fh), encode_binary
+        else:
+            read, encode = partial(read_message, self._fh), encode_text
+        self._roundtrip = partial(_exchange, self._sock, read, encode)
+
+    def _resume(self, line: str) -> str:
+        for attempt in range(self.attempts):
+            delay = RECONNECT_DELAY * 2**attempt * random.uniform(0.5, 1.5)  # noqa: S311
+            logger.warning('🔌 Connection lost, resuming in {:.1f}s', delay)
+            time.sleep(delay)
+            self.close()
+            try:
+                self._open()
+                reply = self._roundtrip(f'resume {self.token}')
+            except (ClientError, OSError) as exc:
+                logger.debug('⚠️ Resume failed: {}', exc)
+                continue
+            if not reply:
+                continue
+            if not reply.startswith('Resumed'):
+                logger.warning('⛔ Could not resume the game: {}', reply)
+                return ''
+            logger.info('🔁 {}', reply)
+            return self._roundtrip(line)
+        return ''
+
+
+def iter_moves(path: Path) -> Iterator[str]:
+    """Lazily yield the lines of a game file, skipping comments and blanks."""
+    with path.open(encoding='utf-8') as fh:
+        for raw in fh:
+            line = raw.strip()
+            if line and not COMMENT.fullmatch(line):
+                yield line
+
+
+def _replay(
+    sock: socket.socket,
+    read: Callable[[], str],
+    encode: Callable[[str], bytes],
+    lines: Iterable[str],
+    window: int,
+) -> None:
+    """
+    Stream lines to the server while printing replies as they arrive.
+
+    A writer thread keeps up to `window` lines awaiting a reply; this thread
+    reads and prints the replies in order, freeing a slot for each one.
+    """
+    slots = Semaphore(window)
+    stop = Event()
+    writer = Thread(target=_stream_lines, args=(sock, encode, lines, slots, stop), daemon=True)
+    writer.start()
+    write = sys.stdout.write
+    try:
+        while response := read():
+            logger.debug('<< {}', response)
+            write(f'{response}\n')
+            slots.release()
+    finally:
+        stop.set()
+        writer.join()
+    logger.info('⛔ Server closed the connection')
+
+
+def _stream_lines(
+    sock: socket.socket,
+    encode: Callable[[str], bytes],
+    lines: Iterable[str],
+    slots: Semaphore,
+    stop: Event,
+) -> None:
+    """
+    Send lines while window slots are free, batching them into one write.
+
+    Once the lines run out the socket is half-closed, so the server answers
+    what is left and then closes the connection.
+    """
+    batch: list[str] = []
+    try:
+        for line in lines:
+            if not slots.acquire(blocking=False):
+                _send_batch(sock, encode, batch)
+                while not slots.acquire(timeout=WRITER_POLL_INTERVAL):
+                    if stop.is_set():
+                        return
+            if stop.is_set():
+                return
+            batch.append(line)
+        _send_batch(sock, encode, batch)
+        sock.shutdown(socket.SHUT_WR)
+    except OSError as exc:
+        logger.debug('⚠️ Stopped sending: {}', exc)
+
+
+def _send_batch(sock: socket.socket, encode: Callable[[str], bytes], batch: list[str]) -> None:
+    if batch:
+        logger.debug('>> {}', ' | '.join(batch))
+        sock.sendall(b''.join(map(encode, batch)))
+        batch.clear()
+
+
+def _negotiate_binary(sock: socket.socket, fh: BinaryIO) -> None:
+    """
+    Ask the server to switch the connection to binary framing.
+
+    Raises:
+        ClientError: If the server does not acknowledge the switch.
+    """
+    sock.sendall(b'binary\n')
+    if fh.readline() != b'OK\n' or fh.readline() != b'\n':
+        msg = 'Server refused the binary protocol'
+        raise ClientError(msg)
+    logger.debug('🔢 Binary protocol negotiated')
@@ -1,3 +1,46 @@
-from .core import GameOver, process_line
+"""
+The chess protocol: boards, move handling and wire formats.
 
-__all__ = ['GameOver', 'process_line']
+The names below are imported on first access, so that importing a
+standard-library-only submodule such as `src.protocol.frames` does not
+load python-chess. `BatchBoards` and `process_batch` also need NumPy.
+"""
+
+from importlib import import_module
+
+_EXPORTS = {
+    'BatchBoards': '.batch',
+    'CompactGame': '.compact',
+    'GameBoard': '.board',
+    'GameOver': '.core',
+    'MoveEvent': '.core',
+    'answer_move': '.core',
+    'describe_move': '.core',
+    'play_move': '.core',
+    'process_batch': '.batch',
+    'process_line': '.core',
+}
+
+__all__ = [
+    'BatchBoards',
+    'CompactGame',
+    'GameBoard',
+    'GameOver',
+    'MoveEvent',
+    'answer_move',
+    'describe_move',
+    'play_move',
+    'process_batch',
+    'process_line',
+]
+
+
+def __getattr__(name: str) -> object:
+    """Import an exported name from its submodule on first use."""
+    module = _EXPORTS.get(name)
+    if module is None:
+        msg = f'module {__name__!r} has no attribute {name!r}'
+        raise AttributeError(msg)
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,425 @@
+"""
+Move legality for many games at once, on NumPy bitboard arrays.
+
+`BatchBoards` keeps the positions of many games as arrays holding one
+element per game: a uint64 bitboard per piece type and one of the white
+pieces, then the side to move, castling rights, en passant square and move
+counters. `play` plays one move in each of any number of its games with
+array operations over the whole batch. A move's shape is checked against
+attack and between-squares tables, the move is made on the bitboards, and
+the mover's king is tested for attackers in the new position, which covers
+pins, checks and evasions alike. The same test on the other king gives
+check, and a checked king with a safe square to step to is not mated.
+Sliding attacks are Kogge-Stone fills over the occupancy.
+
+The rest is left to python-chess, one game at a time, on a `chess.Board`
+built from the arrays: castling, en passant captures, and the mate test of
+a checked king with no square to step to. The results are those of
+`play_move`, and `process_batch` answers lines like `process_line` does.
+
+NumPy is an optional dependency; only this module imports it.
+"""
+
+import functools
+import operator
+from collections.abc import Sequence
+
+import chess
+import numpy as np
+
+from src.protocol.core import MoveEvent, describe_move, play_move, process_line
+from src.protocol.scanner import TokenKind, scan
+
+_U64 = np.uint64
+_ONE = _U64(1)
+_FULL = _U64(chess.BB_ALL)
+_NOT_A = _U64(chess.BB_ALL & ~chess.BB_FILE_A)
+_NOT_H = _U64(chess.BB_ALL & ~chess.BB_FILE_H)
+_BACKRANKS = _U64(chess.BB_BACKRANKS)
+_FIRST_RANKS = np.array([chess.BB_RANK_8, chess.BB_RANK_1], dtype=_U64)  # by mover
+
+_KNIGHT_ATTACKS = np.array(chess.BB_KNIGHT_ATTACKS, dtype=_U64)
+_KING_ATTACKS = np.array(chess.BB_KING_ATTACKS, dtype=_U64)
+_PAWN_ATTACKS = np.array(chess.BB_PAWN_ATTACKS, dtype=_U64)  # by color, then square
+
+# Indexed by from << 6 | to: the squares strictly between two aligned
+# squares, and whether they share a rank or file, or a diagonal.
+_BETWEEN = np.array(
+    [chess.between(src, dst) for src in chess.SQUARES for dst in chess.SQUARES], dtype=_U64
+)
+_ORTHOGONAL = np.array(
+    [
+        src != dst and (src >> 3 == dst >> 3 or src & 7 == dst & 7)
+        for src in chess.SQUARES
+        for dst in chess.SQUARES
+    ]
+)
+_DIAGONAL = np.array(
+    [
+        src != dst and abs((src >> 3) - (dst >> 3)) == abs((src & 7) - (dst & 7))
+        for src in chess.SQUARES
+        for dst in chess.SQUARES
+    ]
+)
+
+# Steps between neighbouring squares, with the squares a step can land on
+# without wrapping around the board.
+_ROOK_STEPS = ((8, _FULL), (-8, _FULL), (1, _NOT_A), (-1, _NOT_H))
+_BISHOP_STEPS = ((9, _NOT_A), (7, _NOT_H), (-7, _NOT_A), (-9, _NOT_H))
+
+_PAWN, _KNIGHT, _BISHOP, _ROOK, _QUEEN, _KING = chess.PIECE_TYPES
+
+
+def _shift(bitboards: np.ndarray, step: int) -> np.ndarray:
+    if step > 0:
+        return bitboards << _U64(step)
+    return bitboards >> _U64(-step)
+
+
+def _slides(origins: np.ndarray, empty: np.ndarray, steps: tuple) -> np.ndarray:
+    """Return the squares sliders on `origins` attack, up to a blocker."""
+    attacks = np.zeros_like(origins)
+    for step, landing in steps:
+        reach, free = origins, empty & landing
+        reach = reach | free & _shift(reach, step)
+        free = free & _shift(free, step)
+        reach = reach | free & _shift(reach, 2 * step)
+        free = free & _shift(free, 2 * step)
+        reach = reach | free & _shift(reach, 4 * step)
+        attacks |= _shift(reach, step) & landing
+    return attacks
+
+
+def _squares(bitboards: np.ndarray) -> np.ndarray:
+    """Return the square of the lowest set bit of each nonzero bitboard."""
+    return np.bitwise_count((bitboards & (~bitboards + _ONE)) - _ONE).astype(np.intp)
+
+
+def _attackers(
+    squares: np.ndarray,
+    white: np.ndarray,
+    pieces: np.ndarray,
+    attacking: np.ndarray,
+    occupied: np.ndarray,
+) -> np.ndarray:
+    """
+    Return the pieces of the `attacking` side that attack each square.
+
+    `white` tells whether the attacking side is white, for its pawns.
+    """
+    pawns, knights, bishops, rooks, queens, kings = pieces
+    origins = _ONE << squares.astype(_U64)
+    empty = ~occupied
+    attackers = (
+        _KNIGHT_ATTACKS[squares] & knights
+        | _KING_ATTACKS[squares] & kings
+        | _PAWN_ATTACKS[(~white).astype(np.intp), squares] & pawns
+        | _slides(origins, empty, _ROOK_STEPS) & (rooks | queens)
+        | _slides(origins, empty, _BISHOP_STEPS) & (bishops | queens)
+    )
+    return attackers & attacking
+
+
+class BatchBoards:
+    """The positions of `size` games, all starting from the initial one."""
+
+    def __init__(self, size: int) -> None:
+        """Set up `size` games in the starting position."""
+        start = chess.Board()
+        kinds = [start.pawns, start.knights, start.bishops, start.rooks, start.queens, start.kings]
+        self.pieces = np.repeat(np.array(kinds, dtype=_U64)[:, None], size, axis=1)
+        self.white = np.full(size, start.occupied_co[chess.WHITE], dtype=_U64)
+        self.turn = np.ones(size, dtype=bool)
+        self.castling = np.full(size, start.castling_rights, dtype=_U64)
+        self.ep_square = np.full(size, -1, dtype=np.intp)
+        self.halfmove = np.zeros(size, dtype=np.intp)
+        self.fullmove = np.ones(size, dtype=np.intp)
+        self.plies = np.zeros(size, dtype=np.intp)
+
+    def __len__(self) -> int:
+        """Return the number of games."""
+        return len(self.turn)
+
+    def board(self, game: int) -> chess.Board:
+        """Return a `chess.Board` in the position of a game, with no stack."""
+        board = chess.Board(None)
+        pieces = [int(bitboard) for bitboard in self.pieces[:, game]]
+        board.pawns, board.knights, board.bishops, board.rooks, board.queens, board.kings = pieces
+        board.occupied = occupied = functools.reduce(operator.or_, pieces)
+        white = int(self.white[game])
+        board.occupied_co = [occupied & ~white, white]
+        board.turn = bool(self.turn[game])
+        board.castling_rights = int(self.castling[game])
+        ep_square = int(self.ep_square[game])
+        board.ep_square = None if ep_square < 0 else ep_square
+        board.halfmove_clock = int(self.halfmove[game])
+        board.fullmove_number = int(self.fullmove[game])
+        return board
+
+    def store(self, game: int, board: chess.Board) -> None:
+        """Set the position of a game to that of `board`."""
+        self.pieces[:, game] = (
+            board.pawns,
+            board.knights,
+            board.bishops,
+            board.rooks,
+            board.queens,
+            board.kings,
+        )
+        self.white[game] = board.occupied_co[chess.WHITE]
+        self.turn[game] = board.turn
+        self.castling[game] = board.castling_rights
+        self.ep_square[game] = -1 if board.ep_square is None else board.ep_square
+        self.halfmove[game] = board.halfmove_clock
+        self.fullmove[game] = board.fullmove_number
+
+    def play(self, games: Sequence[int], moves: Sequence[chess.Move]) -> list[MoveEvent | None]:
+        """
+        Play `moves[i]` in game `games[i]` if legal, like `play_move`.
+
+        Each game may appear once. Moves must not be promotions, which the
+        text protocol cannot express.
+
+        Returns:
+            Each move's event, or None if it was illegal and not played.
+        """
+        events: list[MoveEvent | None] = [None] * len(moves)
+        if not moves:
+            return events
+        index = np.asarray(games, dtype=np.intp)
+        src = np.fromiter((move.from_square for move in moves), np.intp, len(moves))
+        dst = np.fromiter((move.to_square for move in moves), np.intp, len(moves))
+
+        turn = self.turn[index]
+        pieces = self.pieces[:, index]
+        white = self.white[index]
+        occupied = np.bitwise_or.reduce(pieces, axis=0)
+        own = np.where(turn, white, occupied & ~white)
+        src_bb = _ONE << src.astype(_U64)
+        dst_bb = _ONE << dst.astype(_U64)
+        mover = _piece_types(pieces, src_bb & own)
+        victim = _piece_types(pieces, dst_bb & (occupied ^ own))
+        colors = turn.astype(np.intp)
+        pawn_attacks = _PAWN_ATTACKS[colors, src] & dst_bb
+
+        pair = src << 6 | dst
+        clear = (_BETWEEN[pair] & occupied) == 0
+        forward = np.where(turn, 8, -8)
+        pushes = (dst - src == forward) & ((occupied & dst_bb) == 0)
+        double = (
+            (dst - src == 2 * forward)
+            & (src >> 3 == np.where(turn, 1, 6))
+            & ((occupied & (dst_bb | _ONE << np.clip(src + forward, 0, 63).astype(_U64))) == 0)
+        )
+        captures = (pawn_attacks & occupied & ~own) != 0
+        shaped = np.select(
+            [
+                mover == _PAWN,
+                mover == _KNIGHT,
+                mover == _BISHOP,
+                mover == _ROOK,
+                mover == _QUEEN,
+                mover == _KING,
+            ],
+            [
+                (pushes | double | captures) & ((dst_bb & _BACKRANKS) == 0),
+                (_KNIGHT_ATTACKS[src] & dst_bb) != 0,
+                _DIAGONAL[pair] & clear,
+                _ORTHOGONAL[pair] & clear,
+                (_DIAGONAL[pair] | _ORTHOGONAL[pair]) & clear,
+                (_KING_ATTACKS[src] & dst_bb) != 0,
+            ],
+            default=False,
+        ) & ((own & dst_bb) == 0)
+
+        # Castling and en passant are left to python-chess.
+        en_passant = (mover == _PAWN) & (dst == self.ep_square[index]) & (pawn_attacks != 0)
+        castling = (mover == _KING) & (np.abs((src & 7) - (dst & 7)) > 1)
+        for i in np.flatnonzero(en_passant | castling).tolist():
+            board = self.board(games[i])
+            events[i] = play_move(board, moves[i])
+            if events[i] is not None:
+                self.store(games[i], board)
+                self.plies[games[i]] += 1
+
+        made = np.flatnonzero(shaped & ~en_passant & ~castling)
+        if made.size:
+            self._make(
+                index[made],
+                src[made],
+                dst[made],
+                mover[made],
+                victim[made],
+                events=events,
+                slots=made,
+            )
+        return events
+
+    def _make(
+        self,
+        index: np.ndarray,
+        src: np.ndarray,
+        dst: np.ndarray,
+        mover: np.ndarray,
+        victim: np.ndarray,
+        *,
+        events: list[MoveEvent | None],
+        slots: np.ndarray,
+    ) -> None:
+        """Make well-shaped moves on copies, and keep those that are legal."""
+        turn = self.turn[index]
+        src_bb = _ONE << src.astype(_U64)
+        dst_bb = _ONE << dst.astype(_U64)
+        pieces = self.pieces[:, index]
+        for piece_type in chess.PIECE_TYPES:
+            row = pieces[piece_type - 1]
+            row &= np.where(victim == piece_type, ~dst_bb, _FULL)
+            row ^= np.where(mover == piece_type, src_bb | dst_bb, _U64(0))
+        white = self.white[index]
+        white = np.where(turn, white & ~src_bb | dst_bb, white & ~dst_bb)
+        occupied = np.bitwise_or.reduce(pieces, axis=0)
+        own = np.where(turn, white, occupied & ~white)
+        theirs = occupied ^ own
+
+        exposed = _attackers(_squares(pieces[5] & own), ~turn, pieces, theirs, occupied)
+        legal = np.flatnonzero(exposed == 0)
+        if not legal.size:
+            return
+        index, turn, src, dst, mover, victim, slots = (
+            array[legal] for array in (index, turn, src, dst, mover, victim, slots)
+        )
+        pieces, white, occupied, own, theirs = (
+            array[..., legal] for array in (pieces, white, occupied, own, theirs)
+        )
+        src_bb, dst_bb = src_bb[legal], dst_bb[legal]
+
+        king_bb = pieces[5] & theirs
+        king = _squares(king_bb)
+        checkers = _attackers(king, turn, pieces, own, occupied)
+        checkmate = self._mated(
+            king, king_bb, checkers, turn, pieces=pieces, own=own, theirs=theirs, occupied=occupied
+        )
+
+        move_no = self.fullmove[index]
+        castling = self.castling[index] & ~(src_bb | dst_bb)
+        castling &= np.where(mover == _KING, ~_FIRST_RANKS[turn.astype(np.intp)], _FULL)
+        pawn = mover == _PAWN
+        self.pieces[:, index] = pieces
+        self.white[index] = white
+        self.castling[index] = castling
+        double = pawn & (np.abs(dst - src) == 16)  # noqa: PLR2004
+        self.ep_square[index] = np.where(double, (src + dst) >> 1, -1)
+        self.halfmove[index] = np.where(pawn | (victim != 0), 0, self.halfmove[index] + 1)
+        self.fullmove[index] = move_no + ~turn
+        self.turn[index] = ~turn
+        self.plies[index] += 1
+
+        # Mates python-chess has to decide are tested in the new positions.
+        undecided = np.flatnonzero(checkmate < 0).tolist()
+        for i in undecided:
+            checkmate[i] = self.board(index[i]).is_checkmate()
+
+        for slot, no, color, piece_type, from_square, to_square, captured, check, mate in zip(
+            slots.tolist(),
+            move_no.tolist(),
+            turn.tolist(),
+            mover.tolist(),
+            src.tolist(),
+            dst.tolist(),
+            victim.tolist(),
+            (checkers != 0).tolist(),
+            (checkmate > 0).tolist(),
+            strict=True,
+        ):
+            events[slot] = MoveEvent(
+                no,
+                color,
+                piece_type,
+                from_square,
+                to_square,
+                captured or None,
+                castling=False,
+                check=check,
+                checkmate=mate,
+            )
+
+    @staticmethod
+    def _mated(
+        king: np.ndarray,
+        king_bb: np.ndarray,
+        checkers: np.ndarray,
+        turn: np.ndarray,
+        *,
+        pieces: np.ndarray,
+        own: np.ndarray,
+        theirs: np.ndarray,
+        occupied: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Return 1 for each checked king that is mated, 0 if not, -1 if unknown.
+
+        A king with a safe square to step to is not mated. One with none is
+        mated by a double check, and otherwise undecided: a capture or a
+        block might still parry the check.
+        """
+        mated = np.zeros(len(king), dtype=np.int8)
+        checked = np.flatnonzero(checkers)
+        if not checked.size:
+            return mated
+        king, turn, own, checkers = king[checked], turn[checked], own[checked], checkers[checked]
+        pieces = pieces[:, checked]
+        # The king does not block the attacks on the squares behind it.
+        occupied = occupied[checked] & ~king_bb[checked]
+        steps = _KING_ATTACKS[king] & ~theirs[checked]
+        escapes = np.zeros(len(king), dtype=bool)
+        while (remaining := np.flatnonzero(steps & ~np.where(escapes, _FULL, _U64(0)))).size:
+            step = steps[remaining] & (~steps[remaining] + _ONE)
+            steps[remaining] ^= step
+            safe = _attackers(
+                _squares(step),
+                turn[remaining],
+                pieces[:, remaining],
+                own[remaining],
+                occupied[remaining],
+            )
+            escapes[remaining] |= safe == 0
+        double = (checkers & (checkers - _ONE)) != 0
+        mated[checked] = np.where(escapes, 0, np.where(double, 1, -1))
+        return mated
+
+
+def _piece_types(pieces: np.ndarray, squares: np.ndarray) -> np.ndarray:
+    """Return the type of the piece on each square, or 0 where it is empty."""
+    found = (pieces & squares) != 0
+    return np.where(found.any(axis=0), found.argmax(axis=0) + 1, 0)
+
+
+def process_batch(
+    boards: BatchBoards, games: Sequence[int], lines: Sequence[str]
+) -> list[tuple[str, bool]]:
+    """
+    Answer one line for each of several games, like `process_line`.
+
+    Moves are played together by `BatchBoards.play`; other lines are
+    answered by `process_line` on a board of the game's position.
+
+    Returns:
+        Each line's response and whether it ended the game by checkmate.
+    """
+    replies: list[tuple[str, bool]] = [('', False)] * len(lines)
+    played, moves = [], []
+    for i, line in enumerate(lines):
+        token = scan(line.strip())
+        if token.kind == TokenKind.MOVE:
+            played.append(i)
+            moves.append(token.move)
+        else:
+            replies[i] = process_line(boards.board(games[i]), line), False
+
+    events = boards.play([games[i] for i in played], moves)
+    for i, event in zip(played, events, strict=True):
+        if event is None:
+            replies[i] = 'Invalid move', False
+        else:
+            replies[i] = describe_move(event), event.checkmate
+    return replies
@@ -0,0 +1,103 @@
+"""
+Binary protocol records, negotiated with the `binary` command.
+
+Moves travel as 2 bytes (from, to and promotion packed into 16 bits) and
+move replies as compact records that the client renders with the same
+`describe_move` the text protocol uses, so both modes read identically.
+The frames carrying them are built and split by `src.protocol.frames`,
+whose names are re-exported here.
+"""
+
+import chess
+
+from src.protocol.core import MoveEvent
+from src.protocol.frames import (
+    FrameDecoder,
+    FrameError,
+    Opcode,
+    decode_varint,
+    encode_frame,
+    encode_squares,
+    encode_varint,
+)
+
+__all__ = [
+    'FrameDecoder',
+    'FrameError',
+    'Opcode',
+    'decode_event',
+    'decode_move',
+    'decode_varint',
+    'encode_event',
+    'encode_frame',
+    'encode_move',
+    'encode_squares',
+    'encode_varint',
+]
+
+_CASTLING = 0x01
+_CHECK = 0x02
+_CHECKMATE = 0x04
+
+
+def encode_move(move: chess.Move) -> bytes:
+    """Pack a move with `encode_squares`."""
+    return encode_squares(move.from_square, move.to_square, move.promotion or 0)
+
+
+def decode_move(payload: bytes) -> chess.Move:
+    """
+    Unpack a move encoded by `encode_move`.
+
+    Raises:
+        FrameError: If the payload is not a packed move.
+    """
+    if len(payload) != 2:  # noqa: PLR2004
+        msg = 'move payload must be 2 bytes'
+        raise FrameError(msg)
+    packed = int.from_bytes(payload, 'big')
+    promotion = packed >> 12 & 0x7
+    return chess.Move(packed & 0x3F, packed >> 6 & 0x3F, promotion or None)
+
+
+def encode_event(event: MoveEvent) -> bytes:
+    """
+    Pack a move event as a record.
+
+    The record is the move number (varint) followed by from square, to
+    square, a piece byte (piece type, mover color, captured piece type) and
+    a flags byte.
+    """
+    piece = event.piece_type | event.color << 3 | (event.captured or 0) << 4
+    flags = (
+        (_CASTLING if event.castling else 0)
+        | (_CHECK if event.check else 0)
+        | (_CHECKMATE if event.checkmate else 0)
+    )
+    return encode_varint(event.move_no) + bytes((event.from_square, event.to_square, piece, flags))
+
+
+def decode_event(payload: bytes) -> MoveEvent:
+    """
+    Unpack a record produced by `encode_event`.
+
+    Raises:
+        FrameError: If the payload is truncated.
+    """
+    header = decode_varint(payload)
+    if header is None or len(payload) != header[1] + 4:
+        msg = 'truncated move record'
+        raise FrameError(msg)
+    move_no, offset = header
+    from_square, to_square, piece, flags = payload[offset:]
+    return MoveEvent(
+        move_no=move_no,
+        color=bool(piece >> 3 & 1),
+        piece_type=piece & 0x7,
+        from_square=from_square,
+        to_square=to_square,
+        captured=(piece >> 4 & 0x7) or None,
+        castling=bool(flags & _CASTLING),
+        check=bool(flags & _CHECK),
+        checkmate=bool(flags & _CHECKMATE),
+    )
@@ -0,0 +1,178 @@
+"""A `chess.Board` that answers the questions of a move once per position."""
+
+import struct
+from typing import ClassVar, Self
+
+import chess
+
+from src.protocol.positions import Position, PositionCache
+
+# The fields of `GameBoard.pack`: pawns, knights, bishops, rooks, queens,
+# kings, white pieces, castling rights, checkers, side to move, en passant
+# square (64 for none), halfmove clock and fullmove number.
+PACKED = struct.Struct('<9QBBII')
+_NO_EP_SQUARE = 64
+
+
+class GameBoard(chess.Board):
+    """
+    A board caching check and legality information until the next push.
+
+    Playing a move asks the same position several questions: whether the
+    move is legal, then after the push whether the mover gives check and
+    mate, and the next move's legality test needs the checkers again. Each
+    of these recomputes attacks from scratch on a plain board. Here the
+    checkers and pinned pieces of a position are computed once, and so are
+    its legal moves when the side to move is in check (the only case where
+    mate detection needs them). The cache is dropped by `push`, `pop` and
+    the methods that set up a new position; mutating the board any other
+    way requires calling `invalidate`.
+
+    Opening positions are also looked up in `positions`, a cache shared by
+    all boards of the process; set it to None to disable sharing.
+    """
+
+    positions: ClassVar[PositionCache | None] = PositionCache()
+
+    _checkers: chess.Bitboard | None = None
+    _blockers: chess.Bitboard | None = None
+    _evasions: frozenset[chess.Move] | None = None
+    _position: Position | None = None
+    _looked_up = False
+
+    @classmethod
+    def share_positions(cls, max_entries: int, max_ply: int) -> None:
+        """Replace the shared position cache; zero entries disables it."""
+        cls.positions = PositionCache(max_entries, max_ply) if max_entries else None
+
+    @classmethod
+    def unpack(cls, data: bytes) -> Self:
+        """Return a board in a position from `pack`, with no move stack."""
+        (
+            pawns,
+            knights,
+            bishops,
+            rooks,
+            queens,
+            kings,
+            white,
+            castling,
+            checkers,
+            turn,
+            ep_square,
+            halfmove,
+            fullmove,
+        ) = PACKED.unpack(data)
+        # Every field is set below, so the position `__init__` would set up
+        # first is skipped.
+        board = cls.__new__(cls)
+        board.pawns, board.knights, board.bishops = pawns, knights, bishops
+        board.rooks, board.queens, board.kings = rooks, queens, kings
+        board.occupied = occupied = pawns | knights | bishops | rooks | queens | kings
+        board.occupied_co = [occupied & ~white, white]
+        board.promoted = chess.BB_EMPTY
+        board.chess960 = False
+        board.castling_rights = castling
+        board.turn = bool(turn)
+        board.ep_square = None if ep_square == _NO_EP_SQUARE else ep_square
+        board.halfmove_clock, board.fullmove_number = halfmove, fullmove
+        board.move_stack = []
+        board._stack = []  # noqa: SLF001
+        board._checkers = checkers  # noqa: SLF001
+        return board
+
+    def pack(self) -> bytes:
+        """Return the position and its checkers as `PACKED` bytes."""
+        ep_square = self.ep_square
+        return PACKED.pack(
+            self.pawns,
+            self.knights,
+            self.bishops,
+            self.rooks,
+            self.queens,
+            self.kings,
+            self.occupied_co[chess.WHITE],
+            self.castling_rights,
+            self.checkers_mask(),
+            self.turn,
+            _NO_EP_SQUARE if ep_square is None else ep_square,
+            self.halfmove_clock,
+            self.fullmove_number,
+        )
+
+    def invalidate(self) -> None:
+        """Forget everything computed for the current position."""
+        self._checkers = self._blockers = self._evasions = self._position = None
+        self._looked_up = False
+
+    def push(self, move: chess.Move) -> None:
+        """Play a move, see `chess.Board.push`."""
+        super().push(move)
+        self.invalidate()
+
+    def pop(self) -> chess.Move:
+        """Take back the last move, see `chess.Board.pop`."""
+        move = super().pop()
+        self.invalidate()
+        return move
+
+    def reset(self) -> None:
+        """Restore the starting position, see `chess.Board.reset`."""
+        super().reset()
+        self.invalidate()
+
+    def clear(self) -> None:
+        """Remove every piece, see `chess.Board.clear`."""
+        super().clear()
+        self.invalidate()
+
+    def set_fen(self, fen: str) -> None:
+        """Set up a position, see `chess.Board.set_fen`."""
+        super().set_fen(fen)
+        self.invalidate()
+
+    def checkers_mask(self) -> chess.Bitboard:
+        """Return the pieces giving check, computed once per position."""
+        if self._checkers is None:
+            position = self._shared()
+            self._checkers = super().checkers_mask() if position is None else position.checkers
+        return self._checkers
+
+    def is_checkmate(self) -> bool:
+        """Return whether the side to move is mated."""
+        position = self._shared()
+        if position is not None:
+            return position.checkmate
+        return bool(self.checkers_mask()) and not self._legal_evasions()
+
+    def is_legal(self, move: chess.Move) -> bool:
+        """Return whether a move is legal, same as `chess.Board.is_legal`."""
+        position = self._shared()
+        if position is not None:
+            # The cached moves castle as king-two-squares, like python-chess
+            # generates them, while `is_legal` also takes the king-to-rook form.
+            move = self._from_chess960(
+                self.chess960, move.from_square, move.to_square, move.promotion, move.drop
+            )
+            return move in position.legal
+        if self.checkers_mask():
+            return move in self._legal_evasions()
+        if not self.is_pseudo_legal(move):
+            return False
+        king = self.king(self.turn)
+        if king is None:
+            return True
+        if self._blockers is None:
+            self._blockers = self._slider_blockers(king)
+        return self._is_safe(king, self._blockers, move)
+
+    def _legal_evasions(self) -> frozenset[chess.Move]:
+        if self._evasions is None:
+            self._evasions = frozenset(self.generate_legal_moves())
+        return self._evasions
+
+    def _shared(self) -> Position | None:
+        if not self._looked_up and self.positions is not None:
+            self._position = self.positions.get(self)
+            self._looked_up = True
+        return self._position
@@ -0,0 +1,84 @@
+"""
+A game stored as a packed position and a 16-bit move history.
+
+A `chess.Board` keeps a `Move` object and a full board state for every ply
+it has played, so a resident game grows by a few hundred bytes per move
+even when nobody is looking at it. `CompactGame` keeps what it takes to
+carry on playing, the current position packed into one bytes object (see
+`GameBoard.pack`) and the moves as an `array('H')`, and builds a board only
+while a request for the game is being handled.
+"""
+
+from array import array
+from typing import Self
+
+import chess
+
+from src.protocol.board import PACKED, GameBoard
+
+_TURN = PACKED.size - 10  # offset of the side to move
+
+
+class CompactGame:
+    """
+    The position and move history of a game, materialized on demand.
+
+    `position` holds the bytes of `GameBoard.pack` and `moves` the codes
+    of `encode_move`.
+    """
+
+    __slots__ = ('moves', 'position')
+
+    def __init__(self, board: GameBoard | None = None) -> None:
+        """Start from `board`'s position and move history, or the start."""
+        board = board if board is not None else GameBoard()
+        self.position = board.pack()
+        self.moves = array('H', map(encode_move, board.move_stack))
+
+    @classmethod
+    def frombytes(cls, data: bytes) -> Self:
+        """Return the game serialized by `bytes(game)`."""
+        game = cls.__new__(cls)
+        game.position = data[: PACKED.size]
+        game.moves = array('H')
+        game.moves.frombytes(data[PACKED.size :])
+        return game
+
+    def __bytes__(self) -> bytes:
+        """Return the position followed by the move codes."""
+        return self.position + self.moves.tobytes()
+
+    @property
+    def turn(self) -> chess.Color:
+        """Return the side to move, without materializing the board."""
+        return bool(self.position[_TURN])
+
+    def ply(self) -> int:
+        """Return the number of half-moves played, see `chess.Board.ply`."""
+        *_, turn, _, _, fullmove = PACKED.unpack(self.position)
+        return 2 * (fullmove - 1) + (turn == chess.BLACK)
+
+    def board(self) -> GameBoard:
+        """
+        Build a board in the current position, with an empty move stack.
+
+        Moves pushed on it are kept by passing it back to `update`; other
+        changes are discarded with it.
+        """
+        return GameBoard.unpack(self.position)
+
+    def update(self, board: GameBoard) -> None:
+        """Record the moves played on a board from `board` and its position."""
+        if board.move_stack:
+            self.moves.extend(map(encode_move, board.move_stack))
+            self.position = board.pack()
+
+
+def encode_move(move: chess.Move) -> int:
+    """Pack a move as from (6 bits), to (6 bits) and promotion (3 bits)."""
+    return move.from_square | move.to_square << 6 | (move.promotion or 0) << 12
+
+
+def decode_move(code: int) -> chess.Move:
+    """Unpack a move encoded by `encode_move`."""
+    return chess.Move(code & 0x3F, code >> 6 & 0x3F, code >> 12 or None)
@@ -1,7 +1,24 @@
+from collections.abc import Callable
+from functools import cache
+from typing import NamedTuple
+
 import chess
 
 from src.constants import LETTERS, PIECE_NAME, SEPARATOR
-from src.validation import COMMENT, STRIKE, Command, parse_command
+from src.protocol.render import render_board
+from src.protocol.scanner import TokenKind, scan
+from src.validation import Command
+
+# Message fragments for `describe_move`, which then only indexes and joins.
+# Pieces are indexed by color << 3 | piece type, paths by from << 6 | to.
+_COLORS = ('black', 'white')
+_SQUARES = chess.SQUARE_NAMES
+_PATHS = [f'{src} to {dst}' for src in chess.SQUARE_NAMES for dst in chess.SQUARE_NAMES]
+_VICTIMS = [f'{_COLORS[index >> 3]} {PIECE_NAME.get(index & 7)}' for index in range(16)]
+_MOVERS = [victim.capitalize() for victim in _VICTIMS]
+_QUIET = [f'{mover} moves from ' for mover in _MOVERS]
+_NUMBERS = [f'{move_no}. ' for move_no in range(512)]
+_CHECKMATE = [f'. Checkmate, {color} wins' for color in _COLORS]
 
 
 class GameOver(Exception):  # noqa: N818
@@ -10,71 +27,130 @@ class GameOver(Exception):  # noqa: N818
 
 def process_line(board: chess.Board, line: str) -> str:
     """Return the response for an input line and update board if needed."""
-    line = line.strip()
+    token = scan(line.strip())
 
-    if STRIKE.fullmatch(line):
-        return handle_move(board, line)
+    if token.kind == TokenKind.MOVE:
+        return handle_move(board, token.move)
 
-    if COMMENT.fullmatch(line):
+    if token.kind == TokenKind.COMMENT:
         return 'OK'
 
-    cmd = parse_command(line)
-    if cmd == Command.DISPLAY_BOARD:
-        return _display_board(board)
+    if token.command == Command.DISPLAY_BOARD:
+        return render_board(board)
 
     return 'scan error'
 
 
-def handle_move(board: chess.Board, text: str) -> str:
-    """Apply a UCI move string if legal and return formatted message."""
-    move = chess.Move.from_uci(text.replace('-', ''))
-    if not board.is_legal(move):
-        return 'Invalid move'
+class MoveEvent(NamedTuple):
+    """A legal move described independently of how it is sent to clients."""
+
+    move_no: int
+    color: chess.Color
+    piece_type: chess.PieceType
+    from_square: chess.Square
+    to_square: chess.Square
+    captured: chess.PieceType | None = None
+    castling: bool = False
+    check: bool = False
+    checkmate: bool = False
+
+
+def handle_move(board: chess.Board, move: chess.Move) -> str:
+    """Apply a move if legal and return formatted message."""
+    return answer_move(play_move(board, move))
 
-    message = format_move(board, move)
-    mover_color = 'white' if board.turn == chess.WHITE else 'black'
 
+def play_move(board: chess.Board, move: chess.Move) -> MoveEvent | None:
+    """Push a move if legal and return its event, else None."""
+    if not board.is_legal(move):
+        return None
+
+    event = move_event(board, move)
     board.push(move)
 
     if board.is_checkmate():
-        msg = f'{message}. Checkmate, {mover_color} wins'
-        raise GameOver(msg)
+        return event._replace(check=True, checkmate=True)
     if board.is_check():
-        message += '. Check'
+        return event._replace(check=True)
+    return event
 
-    return message
+
+def move_event(board: chess.Board, move: chess.Move) -> MoveEvent:
+    """Describe a legal move without mutating the board."""
+    piece = board.piece_at(move.from_square)
+    captured = None
+    if board.is_capture(move):
+        captured = captured_piece(board, move)[0].piece_type
+    return MoveEvent(
+        move_no=board.fullmove_number,
+        color=piece.color,
+        piece_type=piece.piece_type,
+        from_square=move.from_square,
+        to_square=move.to_square,
+        captured=captured,
+        castling=board.is_castling(move),
+    )
 
 
 def format_move(board: chess.Board, move: chess.Move) -> str:
     """Format a legal move (capture or normal) without mutating the board."""
-    move_no = board.fullmove_number
-    piece = board.piece_at(move.from_square)
-    color = piece_color(piece)
-    name = PIECE_NAME[piece.piece_type]
-    src = chess.square_name(move.from_square)
-    dst = chess.square_name(move.to_square)
+    return describe_move(move_event(board, move))
+
+
+def describe_move(event: MoveEvent) -> str:
+    """Return the protocol message for a move event, with any check suffix."""
+    move_no, color, piece_type, from_square, to_square, captured, castling, check, mate = event
+    number = _NUMBERS[move_no] if move_no < len(_NUMBERS) else f'{move_no}. '
+    if castling:
+        message = number + _castling(color, from_square << 6 | to_square)
+    elif captured is not None:
+        message = (
+            f'{number}{_MOVERS[color << 3 | piece_type]} on {_SQUARES[from_square]} takes '
+            f'{_VICTIMS[(not color) << 3 | captured]} on {_SQUARES[to_square]}'
+        )
+    else:
+        message = f'{number}{_QUIET[color << 3 | piece_type]}{_PATHS[from_square << 6 | to_square]}'
 
-    if board.is_castling(move):
-        side = 'little' if dst[0] == 'g' else 'big'
+    if mate:
+        return message + _CHECKMATE[color]
+    if check:
+        return message + '. Check'
+    return message
 
-        return f'{move_no}. {color.title()} king does a {side} castling from {src} to {dst}'
 
-    if board.is_capture(move):
-        captured, _ = captured_piece(board, move)
-        captured_color = piece_color(captured)
-        captured_name = PIECE_NAME[captured.piece_type]
+def answer_move(
+    event: MoveEvent | None, describe: Callable[[MoveEvent], str] = describe_move
+) -> str:
+    """
+    Return the response to a move played with `event`, None if illegal.
+
+    Raises:
+        GameOver: If the move checkmates, with the response as its message.
+    """
+    if event is None:
+        return 'Invalid move'
+
+    message = describe(event)
+    if event.checkmate:
+        raise GameOver(message)
+    return message
+
+
+@cache
+def _castling(color: chess.Color, path: int) -> str:
+    src, dst = _SQUARES[path >> 6], _SQUARES[path & 0x3F]
+    side = 'little' if dst[0] == 'g' else 'big'
+    return f'{_COLORS[color].title()} king does a {side} castling from {src} to {dst}'
 
-        return (
-            f'{move_no}. {color.title()} {name} on {src} takes {captured_color} {captured_name} '
-            f'on {dst}'
-        )
 
-    return f'{move_no}. {color.title()} {name} moves from {src} to {dst}'
+def color_name(color: chess.Color) -> str:
+    """Return a color as a string."""
+    return 'white' if color == chess.WHITE else 'black'
 
 
 def piece_color(piece: chess.Piece) -> str:
     """Return piece color as a string."""
-    return 'white' if piece.color == chess.WHITE else 'black'
+    return color_name(piece.color)
 
 
 def captured_piece(board: chess.Board, move: chess.Move) -> tuple[chess.Piece, chess.Square]:
@@ -0,0 +1,113 @@
+"""
+Length-prefixed frames of the binary protocol, without the move records.
+
+Every frame is a 1-byte opcode, a varint payload length and the payload.
+This module needs nothing beyond the standard library, so the client can
+frame its lines and moves without importing python-chess; the records
+carried inside the frames are in `src.protocol.binary`.
+"""
+
+from enum import IntEnum
+
+_MAX_VARINT_BYTES = 5
+
+_SMALL_VARINTS = [bytes((value,)) for value in range(0x80)]
+
+
+class Opcode(IntEnum):
+    """Frame types of the binary protocol."""
+
+    LINE = 0x01  # client -> server: a text line (command or comment)
+    MOVE = 0x02  # client -> server: a packed move
+    TEXT = 0x10  # server -> client: a text reply
+    EVENT = 0x11  # server -> client: a move record
+    INVALID = 0x12  # server -> client: the move was rejected
+
+
+class FrameError(ValueError):
+    """Raised when a peer sends a malformed frame."""
+
+
+def encode_varint(value: int) -> bytes:
+    """Return the LEB128 encoding of a non-negative integer."""
+    if value < 0x80:  # noqa: PLR2004
+        return _SMALL_VARINTS[value]
+    out = bytearray()
+    while value > 0x7F:  # noqa: PLR2004
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def decode_varint(data: bytes | bytearray, offset: int = 0) -> tuple[int, int] | None:
+    """
+    Decode a varint at `offset`.
+
+    Returns:
+        The value and the offset just past it, or None if `data` ends first.
+
+    Raises:
+        FrameError: If the varint is longer than any valid frame length.
+    """
+    value = shift = 0
+    for index in range(offset, min(len(data), offset + _MAX_VARINT_BYTES)):
+        byte = data[index]
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, index + 1
+        shift += 7
+    if len(data) - offset >= _MAX_VARINT_BYTES:
+        msg = 'varint too long'
+        raise FrameError(msg)
+    return None
+
+
+def encode_frame(opcode: Opcode, payload: bytes = b'') -> bytes:
+    """Return a complete frame."""
+    return _SMALL_VARINTS[opcode] + encode_varint(len(payload)) + payload
+
+
+class FrameDecoder:
+    """Incrementally split a byte stream into frames."""
+
+    def __init__(self) -> None:
+        """Start with an empty buffer."""
+        self._buffer = bytearray()
+
+    def feed(self, data: bytes) -> list[tuple[Opcode, bytes]]:
+        """
+        Buffer `data` and return every frame it completes.
+
+        Raises:
+            FrameError: If an opcode is unknown or a length is malformed.
+        """
+        self._buffer += data
+        frames: list[tuple[Opcode, bytes]] = []
+        offset = 0
+        while offset < len(self._buffer):
+            header = decode_varint(self._buffer, offset + 1)
+            if header is None:
+                break
+            length, start = header
+            if start + length > len(self._buffer):
+                break
+            try:
+                opcode = Opcode(self._buffer[offset])
+            except ValueError as exc:
+                msg = f'unknown opcode {self._buffer[offset]:#04x}'
+                raise FrameError(msg) from exc
+            frames.append((opcode, bytes(self._buffer[start : start + length])))
+            offset = start + length
+        del self._buffer[:offset]
+        return frames
+
+    @property
+    def pending(self) -> int:
+        """Return the number of buffered bytes not yet forming a frame."""
+        return len(self._buffer)
+
+
+def encode_squares(from_square: int, to_square: int, promotion: int = 0) -> bytes:
+    """Pack a move from (6 bits), to (6 bits) and promotion (3 bits)."""
+    return (from_square | to_square << 6 | promotion << 12).to_bytes(2, 'big')
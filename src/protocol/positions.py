@@ -0,0 +1,133 @@
+"""
+Process-wide cache of what every game asks about the same opening positions.
+
+Thousands of games pass through the same first few positions, and each of
+them would otherwise compute the legal moves and checkers from scratch.
+Positions are keyed by everything legality depends on (the piece bitboards,
+side to move, castling rights and en passant square) and kept in a bounded
+LRU, so a position is evaluated about once per process however many games
+reach it. Only positions up to `max_ply` half-moves are cached: past the opening
+games rarely meet, and every miss costs a full legal move generation.
+"""
+
+from collections import OrderedDict
+from threading import Lock
+from typing import NamedTuple
+
+import chess
+
+POSITION_CACHE_SIZE = 4096
+POSITION_CACHE_PLY = 8
+
+type PositionKey = tuple[int, int, int, int, int, int, int, bool, int, int | None]
+
+
+class Position(NamedTuple):
+    """What the protocol asks about a position, computed once."""
+
+    legal: frozenset[chess.Move]
+    checkers: chess.Bitboard
+    checkmate: bool
+
+
+def position_key(board: chess.Board) -> PositionKey:
+    """Return the fields of `board` that decide its legal moves."""
+    return (
+        board.pawns,
+        board.knights,
+        board.bishops,
+        board.rooks,
+        board.queens,
+        board.kings,
+        board.occupied_co[chess.WHITE],
+        board.turn,
+        board.castling_rights,
+        board.ep_square,
+    )
+
+
+def evaluate(key: PositionKey) -> Position:
+    """Compute the legal moves, checkers and mate status of a position."""
+    board = chess.Board(None)
+    board.pawns, board.knights, board.bishops, board.rooks, board.queens, board.kings = key[:6]
+    occupied = 0
+    for bitboard in key[:6]:
+        occupied |= bitboard
+    board.occupied = occupied
+    board.occupied_co[chess.WHITE] = key[6]
+    board.occupied_co[chess.BLACK] = occupied & ~key[6]
+    board.turn, board.castling_rights, board.ep_square = key[7:]
+    legal = frozenset(board.generate_legal_moves())
+    checkers = board.checkers_mask()
+    return Position(legal, checkers, bool(checkers) and not legal)
+
+
+class PositionCacheInfo(NamedTuple):
+    """Counters of a `PositionCache`, named like `functools` cache info."""
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class PositionCache:
+    """
+    A bounded LRU of evaluated positions, shared by every board using it.
+
+    Evaluating a position generates all its legal moves, several times the
+    cost of the checks a board does for one move, so only positions seen
+    twice are admitted: the first miss on a key just remembers it in a
+    doorkeeper set, which is emptied whenever it holds `max_entries` keys.
+    Random middlegame positions thus never pay for an evaluation while
+    every common opening position is admitted on its second visit.
+    Evaluation runs outside the lock; two threads missing on the same key
+    at once may both evaluate it, which is harmless.
+    """
+
+    def __init__(self, max_entries: int = POSITION_CACHE_SIZE, max_ply: int = POSITION_CACHE_PLY):
+        """Cache up to `max_entries` positions reached within `max_ply`."""
+        self.max_entries = max_entries
+        self.max_ply = max_ply
+        self.hits = self.misses = 0
+        self._entries: OrderedDict[PositionKey, Position] = OrderedDict()
+        self._seen: set[PositionKey] = set()
+        self._lock = Lock()
+
+    def get(self, board: chess.Board) -> Position | None:
+        """Return the evaluation of `board`, or None if it is not cached yet."""
+        if board.ply() > self.max_ply:
+            return None
+        key = position_key(board)
+        with self._lock:
+            position = self._entries.get(key)
+            if position is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return position
+            self.misses += 1
+            if key not in self._seen:
+                if len(self._seen) >= self.max_entries:
+                    self._seen.clear()
+                self._seen.add(key)
+                return None
+            self._seen.discard(key)
+
+        position = evaluate(key)
+        with self._lock:
+            self._entries[key] = position
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return position
+
+    def info(self) -> PositionCacheInfo:
+        """Return the hits, misses, size bound and current size."""
+        with self._lock:
+            return PositionCacheInfo(self.hits, self.misses, self.max_entries, len(self._entries))
+
+    def clear(self) -> None:
+        """Forget every position and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._seen.clear()
+            self.hits = self.misses = 0
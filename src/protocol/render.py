@@ -0,0 +1,93 @@
+"""
+Cached `display_board` rendering.
+
+Snapshots are keyed by piece placement, the only thing the ASCII board
+shows, and kept in a bounded LRU. On a miss the previous rendering is
+patched: only the squares whose occupant changed (two to four after a move)
+are looked up again before the cells are poured into a fixed template.
+"""
+
+from functools import lru_cache
+from threading import Lock
+
+import chess
+
+from src.constants import LETTERS, SEPARATOR
+
+RENDER_CACHE_SIZE = 4096
+
+type Placement = tuple[int, int, int, int, int, int, int]
+
+_PIECE_TYPES = (chess.PAWN, chess.KNIGHT, chess.BISHOP, chess.ROOK, chess.QUEEN, chess.KING)
+
+_TEMPLATE = '\n'.join(
+    [
+        LETTERS,
+        SEPARATOR,
+        *(f'{rank} | ' + ' | '.join(['{}'] * 8) + f' |\n{SEPARATOR}' for rank in range(8, 0, -1)),
+        LETTERS,
+    ]
+)
+
+_EMPTY: Placement = (0, 0, 0, 0, 0, 0, 0)
+
+
+def placement(board: chess.BaseBoard) -> Placement:
+    """Return the bitboards that determine what `display_board` shows."""
+    return (
+        board.pawns,
+        board.knights,
+        board.bishops,
+        board.rooks,
+        board.queens,
+        board.kings,
+        board.occupied_co[chess.WHITE],
+    )
+
+
+def render_board(board: chess.BaseBoard) -> str:
+    """Return the ASCII snapshot of a board, identical to `_display_board`."""
+    return _render(placement(board))
+
+
+class _Canvas:
+    """The last rendered placement and its 64 cells, patched on each miss."""
+
+    def __init__(self) -> None:
+        """Start from an empty board."""
+        self.lock = Lock()
+        self.key = _EMPTY
+        self.cells = [' '] * 64
+
+    def paint(self, key: Placement) -> str:
+        """Patch the cells that differ from `key` and format the template."""
+        with self.lock:
+            changed = 0
+            for old, new in zip(self.key, key, strict=True):
+                changed |= old ^ new
+            white = key[6]
+            cells = self.cells
+            for square in chess.scan_forward(changed):
+                mask = 1 << square
+                symbol = ' '
+                for piece_type, bitboard in zip(_PIECE_TYPES, key, strict=False):
+                    if bitboard & mask:
+                        symbol = chess.piece_symbol(piece_type)
+                        if white & mask:
+                            symbol = symbol.upper()
+                        break
+                # Cells run from a8 to h1 while squares run from a1 to h8.
+                cells[square ^ 56] = symbol
+            self.key = key
+            return _TEMPLATE.format(*cells)
+
+
+_canvas = _Canvas()
+
+
+@lru_cache(maxsize=RENDER_CACHE_SIZE)
+def _render(key: Placement) -> str:
+    return _canvas.paint(key)
+
+
+render_cache_info = _render.cache_info
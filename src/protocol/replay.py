@@ -0,0 +1,129 @@
+"""
+Offline replay of game files straight through `process_line`, no server.
+
+`replay_file` replays one file on a `GameBoard`. `replay_files` replays many
+in lockstep on the NumPy bitboard arrays of `src.protocol.batch`, one line
+of every file per step, with the same summaries.
+"""
+
+import mmap
+import os
+from collections.abc import Iterable, Sequence
+from enum import StrEnum
+from pathlib import Path
+from typing import NamedTuple
+
+from src.protocol.board import GameBoard
+from src.protocol.core import GameOver, process_line
+
+REJECTIONS = frozenset({'Invalid move', 'scan error'})
+
+
+class Result(StrEnum):
+    """Outcome of replaying one game file."""
+
+    OK = 'ok'  # every line was accepted
+    INVALID = 'invalid'  # at least one line was rejected
+    CHECKMATE = 'checkmate'  # the game ended; later lines were not read
+    UNREADABLE = 'unreadable'  # the file could not be opened
+
+
+class FileSummary(NamedTuple):
+    """What replaying a game file did."""
+
+    path: Path
+    result: Result
+    moves: int = 0
+    first_invalid: int | None = None  # 1-based line number
+    detail: str = ''  # the first rejected line, or why the file is unreadable
+
+
+def replay_file(path: Path) -> FileSummary:
+    """
+    Replay a game file on a fresh board, as a server connection would.
+
+    The file is memory-mapped and read line by line. Rejected lines are
+    answered and skipped exactly like the server does, so replay goes on
+    after them; the first one is reported. Checkmate ends the replay.
+    """
+    try:
+        with path.open('rb') as fh:
+            if os.fstat(fh.fileno()).st_size == 0:
+                return FileSummary(path, Result.OK)
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return _replay(path, iter(data.readline, b''))
+    except OSError as exc:
+        return FileSummary(path, Result.UNREADABLE, detail=exc.strerror or str(exc))
+
+
+def _replay(path: Path, lines: Iterable[bytes]) -> FileSummary:
+    board = GameBoard()
+    first_invalid, detail = None, ''
+    for number, raw in enumerate(lines, 1):
+        line = raw.decode('utf-8', 'replace').strip()
+        if not line:
+            continue
+        try:
+            response = process_line(board, line)
+        except GameOver:
+            return FileSummary(path, Result.CHECKMATE, len(board.move_stack), first_invalid, detail)
+        if response in REJECTIONS and first_invalid is None:
+            first_invalid, detail = number, line
+
+    result = Result.OK if first_invalid is None else Result.INVALID
+    return FileSummary(path, result, len(board.move_stack), first_invalid, detail)
+
+
+def replay_files(paths: Sequence[Path]) -> list[FileSummary]:
+    """
+    Replay game files together, each as `replay_file` would.
+
+    Every step answers the next non-empty line of each file still being
+    replayed with one `process_batch` call, so the moves of all the games
+    are checked together. Requires NumPy.
+    """
+    from src.protocol.batch import BatchBoards, process_batch  # noqa: PLC0415
+
+    summaries: list[FileSummary | None] = [None] * len(paths)
+    files: dict[int, list[bytes]] = {}
+    for game, path in enumerate(paths):
+        try:
+            files[game] = path.read_bytes().split(b'\n')
+        except OSError as exc:
+            detail = exc.strerror or str(exc)
+            summaries[game] = FileSummary(path, Result.UNREADABLE, detail=detail)
+
+    boards = BatchBoards(len(paths))
+    positions = dict.fromkeys(files, 0)  # lines read so far
+    rejected: dict[int, tuple[int, str]] = {}  # first rejected line number and text
+    while positions:
+        games, lines = [], []
+        for game, position in list(positions.items()):
+            content, read = files[game], position
+            line = ''
+            while read < len(content) and not line:
+                line = content[read].decode('utf-8', 'replace').strip()
+                read += 1
+            positions[game] = read
+            if line:
+                games.append(game)
+                lines.append(line)
+            else:
+                del positions[game]
+                first_invalid, detail = rejected.get(game, (None, ''))
+                result = Result.OK if first_invalid is None else Result.INVALID
+                moves = int(boards.plies[game])
+                summaries[game] = FileSummary(paths[game], result, moves, first_invalid, detail)
+
+        replies = process_batch(boards, games, lines)
+        for game, line, (response, checkmate) in zip(games, lines, replies, strict=True):
+            if checkmate:
+                del positions[game]
+                first_invalid, detail = rejected.get(game, (None, ''))
+                moves = int(boards.plies[game])
+                summaries[game] = FileSummary(
+                    paths[game], Result.CHECKMATE, moves, first_invalid, detail
+                )
+            elif response in REJECTIONS and game not in rejected:
+                rejected[game] = positions[game], line
+    return summaries
@@ -0,0 +1,71 @@
+"""
+Single-pass line scanner for the text protocol.
+
+Every well-formed move (`a2-a4`, in any letter case) and every command maps
+to a token prebuilt at import time, so classifying a line is one or two dict
+lookups with no regex and no exception on a miss, and the move comes out
+already decoded. Commands that take an argument (`join_game <id>`,
+`resume <token>`, `profile <action>`) are the only lines that cost a split.
+"""
+
+from enum import IntEnum
+from typing import NamedTuple
+
+import chess
+
+from src.validation import Command
+
+
+class TokenKind(IntEnum):
+    """Kinds of protocol lines."""
+
+    MOVE = 1
+    COMMENT = 2
+    COMMAND = 3
+    ERROR = 4
+
+
+class Token(NamedTuple):
+    """A classified line: a decoded move, a command, or neither."""
+
+    kind: TokenKind
+    move: chess.Move | None = None
+    command: Command | None = None
+    argument: str = ''
+
+
+COMMENT_TOKEN = Token(TokenKind.COMMENT)
+ERROR_TOKEN = Token(TokenKind.ERROR)
+
+_MOVE_LENGTH = 5
+
+ARGUMENT_COMMANDS = frozenset({Command.JOIN_GAME, Command.RESUME, Command.PROFILE})
+
+_MOVES: dict[str, Token] = {
+    f'{chess.SQUARE_NAMES[src]}-{chess.SQUARE_NAMES[dst]}': Token(
+        TokenKind.MOVE, move=chess.Move(src, dst)
+    )
+    for src in chess.SQUARES
+    for dst in chess.SQUARES
+}
+
+_TOKENS: dict[str, Token] = {
+    **_MOVES,
+    **{command.value: Token(TokenKind.COMMAND, command=command) for command in Command},
+}
+
+
+def scan(line: str) -> Token:
+    """Classify a stripped line and return its prebuilt token."""
+    token = _TOKENS.get(line)
+    if token is not None:
+        return token
+    if line.startswith('//') and '\n' not in line:
+        return COMMENT_TOKEN
+    if len(line) == _MOVE_LENGTH:
+        return _MOVES.get(line.lower(), ERROR_TOKEN)
+    head, _, argument = line.partition(' ')
+    token = _TOKENS.get(head)
+    if token is not None and token.command in ARGUMENT_COMMANDS and argument.strip():
+        return token._replace(argument=argument.strip())
+    return ERROR_TOKEN
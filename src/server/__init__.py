@@ -0,0 +1,7 @@
+from .aio import serve_asyncio
+from .options import ServerOptions, serve
+from .session import Session
+from .threaded import serve_threaded
+from .workers import serve_workers
+
+__all__ = ['ServerOptions', 'Session', 'serve', 'serve_asyncio', 'serve_threaded', 'serve_workers']
@@ -0,0 +1,207 @@
+"""
+Connection limits, timeouts and the handler threads shared by the engines.
+
+At most `max_connections` clients are served at once. Past that the
+overflow policy applies: `reject` answers a new connection with
+`BUSY_REPLY` and closes it, while `queue` leaves it waiting for a free
+slot, in the kernel's accept backlog for the threaded engine and on the
+event loop for asyncio. Served connections are registered with
+`Connections`, which the accept loop sweeps every `REAP_INTERVAL`
+seconds: a connection silent for `idle_timeout` seconds, or stuck for
+`read_timeout` seconds in the middle of a line or frame, is shut down from
+outside, so its handler sees the end of the stream and finishes normally.
+Handlers only store a timestamp per read; no timer is armed per request.
+"""
+
+import time
+from collections.abc import Callable
+from enum import StrEnum
+from queue import Empty, SimpleQueue
+from threading import BoundedSemaphore, Lock, Thread, current_thread
+
+from loguru import logger
+
+MAX_CONNECTIONS = 1024
+CONNECTION_TIMEOUT = 300.0
+READ_TIMEOUT = 30.0
+REAP_INTERVAL = 1.0
+# Seconds a handler thread waits for another connection before exiting.
+THREAD_LINGER = 60.0
+# Seconds the connections still open at shutdown get to finish.
+DRAIN_TIMEOUT = 5.0
+
+type _Job = tuple[Callable[..., object], tuple[object, ...]]
+
+
+class Overflow(StrEnum):
+    """What happens to a connection arriving when all slots are taken."""
+
+    REJECT = 'reject'  # reply that the server is busy and close it
+    QUEUE = 'queue'  # leave it waiting until a connection ends
+
+
+class Connection:
+    """Activity of one served connection, as seen by the reaper."""
+
+    __slots__ = ('close', 'last_read', 'partial_since', 'reaped')
+
+    def __init__(self, close: Callable[[], None]) -> None:
+        """Track a connection that `close` shuts down from another thread."""
+        self.close = close
+        self.last_read = time.monotonic()
+        self.partial_since: float | None = None
+        self.reaped = False  # closed by the reaper rather than by its client
+
+    def touch(self, partial: bool) -> None:  # noqa: FBT001
+        """Record a read, and whether it left an incomplete line behind."""
+        now = self.last_read = time.monotonic()
+        if not partial:
+            self.partial_since = None
+        elif self.partial_since is None:
+            self.partial_since = now
+
+
+class Connections:
+    """The limits on served connections, closed by `reap` once they time out."""
+
+    def __init__(
+        self,
+        limit: int = MAX_CONNECTIONS,
+        overflow: Overflow = Overflow.REJECT,
+        idle_timeout: float = CONNECTION_TIMEOUT,
+        read_timeout: float = READ_TIMEOUT,
+    ) -> None:
+        """Serve `limit` connections and time out idle or stuck ones."""
+        self.limit = limit
+        self.overflow = overflow
+        self.idle_timeout = idle_timeout
+        self.read_timeout = read_timeout
+        self._open: set[Connection] = set()
+        self._lock = Lock()
+        self._next_reap = time.monotonic() + REAP_INTERVAL
+
+    def __len__(self) -> int:
+        """Return the number of connections being served."""
+        return len(self._open)
+
+    def open(self, close: Callable[[], None]) -> Connection:
+        """Register a connection that `close` shuts down."""
+        connection = Connection(close)
+        with self._lock:
+            self._open.add(connection)
+        return connection
+
+    def closed(self, connection: Connection) -> None:
+        """Forget a connection whose handler finished."""
+        with self._lock:
+            self._open.discard(connection)
+
+    def reap(self, now: float | None = None) -> int:
+        """Close every timed-out connection and return how many there were."""
+        now = time.monotonic() if now is None else now
+        idle_before = now - self.idle_timeout
+        read_before = now - self.read_timeout
+        with self._lock:
+            expired = [
+                connection
+                for connection in self._open
+                if connection.last_read < idle_before
+                or (connection.partial_since is not None and connection.partial_since < read_before)
+            ]
+            self._open.difference_update(expired)
+        for connection in expired:
+            connection.reaped = True
+            connection.close()
+        if expired:
+            logger.info('⏰ Closed {} timed-out connections', len(expired))
+        return len(expired)
+
+    def maybe_reap(self) -> None:
+        """Run `reap` at most once every `REAP_INTERVAL` seconds."""
+        now = time.monotonic()
+        if now >= self._next_reap:
+            self._next_reap = now + REAP_INTERVAL
+            self.reap(now)
+
+
+class HandlerPool:
+    """
+    At most `size` daemon threads running connection handlers.
+
+    A slot is taken with `acquire` before a handler is submitted with `run`
+    and given back when the handler returns. Threads are started only when
+    no idle one is waiting, reused for later connections, and exit after
+    `linger` seconds without work, so the thread count follows the load
+    and never exceeds `size`.
+    """
+
+    def __init__(self, size: int = MAX_CONNECTIONS, linger: float = THREAD_LINGER) -> None:
+        """Allow `size` handlers at once."""
+        self.size = size
+        self.linger = linger
+        self._slots = BoundedSemaphore(size)
+        self._jobs: SimpleQueue[_Job | None] = SimpleQueue()
+        self._lock = Lock()
+        self._threads: set[Thread] = set()
+        self._idle = 0
+
+    @property
+    def threads(self) -> int:
+        """Return the number of handler threads alive."""
+        return len(self._threads)
+
+    def acquire(self, timeout: float | None = None) -> bool:
+        """Take a slot, waiting up to `timeout` seconds; 0 never waits."""
+        if timeout == 0:
+            return self._slots.acquire(blocking=False)
+        return self._slots.acquire(timeout=timeout)
+
+    def run(self, handler: Callable[..., object], *args: object) -> None:
+        """Run `handler(*args)` on a handler thread, using an acquired slot."""
+        with self._lock:
+            self._jobs.put((handler, args))
+            if self._idle:
+                self._idle -= 1
+                return
+            thread = Thread(target=self._work, name='chess-handler', daemon=True)
+            self._threads.add(thread)
+        thread.start()
+
+    def join(self, timeout: float = DRAIN_TIMEOUT) -> None:
+        """Stop idle threads and give the busy ones `timeout` seconds in all."""
+        with self._lock:
+            for _ in range(self._idle):
+                self._jobs.put(None)
+            self._idle = 0
+            threads = list(self._threads)
+        deadline = time.monotonic() + timeout
+        for thread in threads:
+            thread.join(timeout=max(deadline - time.monotonic(), 0))
+
+    def _work(self) -> None:
+        while (job := self._next_job()) is not None:
+            handler, args = job
+            try:
+                handler(*args)
+            except Exception:  # noqa: BLE001
+                logger.opt(exception=True).error('💥 Connection handler failed')
+            finally:
+                self._slots.release()
+                with self._lock:
+                    self._idle += 1
+        with self._lock:
+            self._threads.discard(current_thread())
+
+    def _next_job(self) -> _Job | None:
+        """Return the next job, or None once the thread should exit."""
+        try:
+            return self._jobs.get(timeout=self.linger)
+        except Empty:
+            pass
+        with self._lock:
+            # A job queued after the timeout may already count on this thread.
+            try:
+                return self._jobs.get_nowait()
+            except Empty:
+                self._idle -= 1
+                return None
@@ -0,0 +1,205 @@
+import asyncio
+import socket
+from contextlib import suppress
+from threading import Event
+from time import perf_counter_ns
+
+from loguru import logger
+
+from src.server.admission import DRAIN_TIMEOUT, Connections, Overflow
+from src.server.fanout import Fanout, Subscriber
+from src.server.games import GameRegistry, RegistryFull
+from src.server.listener import is_loopback
+from src.server.metrics import Metrics
+from src.server.profiling import Profiler
+from src.server.session import BUSY_REPLY, FULL_REPLY, READ_SIZE, Session
+
+STOP_POLL_INTERVAL = 0.2
+
+
+def serve_asyncio(
+    listener: socket.socket,
+    stop_event: Event | None = None,
+    *,
+    registry: GameRegistry | None = None,
+    fanout: Fanout | None = None,
+    metrics: Metrics | None = None,
+    connections: Connections | None = None,
+    profiler: Profiler | None = None,
+    drain_timeout: float = DRAIN_TIMEOUT,
+) -> None:
+    """
+    Serve every connection from a single asyncio event loop.
+
+    Connections beyond the limit are accepted either way; with the `queue`
+    overflow policy they wait on the loop for a slot, and with `reject`
+    they are told the server is busy and closed. Once stopped, open
+    connections get `drain_timeout` seconds to finish before they are
+    cancelled.
+    """
+    registry = registry if registry is not None else GameRegistry()
+    fanout = fanout if fanout is not None else Fanout()
+    connections = connections if connections is not None else Connections()
+    asyncio.run(
+        _serve(
+            listener,
+            stop_event,
+            registry=registry,
+            fanout=fanout,
+            metrics=metrics,
+            connections=connections,
+            profiler=profiler,
+            drain_timeout=drain_timeout,
+        )
+    )
+
+
+async def _serve(
+    listener: socket.socket,
+    stop_event: Event | None,
+    *,
+    registry: GameRegistry,
+    fanout: Fanout,
+    metrics: Metrics | None,
+    connections: Connections,
+    profiler: Profiler | None,
+    drain_timeout: float,
+) -> None:
+    handlers: set[asyncio.Task[None]] = set()
+    slots = asyncio.Semaphore(connections.limit)
+    reject = connections.overflow == Overflow.REJECT
+
+    async def on_connect(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        if reject and slots.locked():
+            await _refuse(writer, metrics)
+            return
+        task = asyncio.current_task()
+        handlers.add(task)
+        try:
+            async with slots:
+                await _handle_client(
+                    reader,
+                    writer,
+                    registry=registry,
+                    fanout=fanout,
+                    metrics=metrics,
+                    connections=connections,
+                    profiler=profiler,
+                )
+        finally:
+            handlers.discard(task)
+
+    server = await asyncio.start_server(on_connect, sock=listener)
+    try:
+        while stop_event is None or not stop_event.is_set():
+            await asyncio.sleep(STOP_POLL_INTERVAL)
+            registry.maybe_evict()
+            connections.maybe_reap()
+    finally:
+        server.close()
+        if handlers:
+            _, pending = await asyncio.wait(handlers, timeout=drain_timeout)
+            for task in pending:
+                task.cancel()
+        server.close_clients()
+        await server.wait_closed()
+
+
+async def _handle_client(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    *,
+    registry: GameRegistry,
+    fanout: Fanout,
+    metrics: Metrics | None,
+    connections: Connections,
+    profiler: Profiler | None,
+) -> None:
+    addr = writer.get_extra_info('peername')
+    logger.info('🌐 Client connected: {}', addr)
+    try:
+        session = Session(registry, metrics, profiler, admin=is_loopback(addr))
+    except RegistryFull:
+        logger.warning('🚫 Game registry is full, refusing {}', addr)
+        writer.write(FULL_REPLY)
+        session = None
+    else:
+        # Publishers run on this loop too, so waking is a plain Event.set.
+        ready = asyncio.Event()
+        session.subscriber = fanout.subscribe(ready.set)
+        pusher = asyncio.create_task(_push(writer, session.subscriber, ready))
+        connection = connections.open(writer.transport.abort)
+        if metrics is not None:
+            metrics.connected()
+    clean = False
+    try:
+        while session is not None:
+            data = await reader.read(READ_SIZE)
+            replies, game_over = session.feed(data)
+            connection.touch(session.partial)
+            if replies:
+                await _send(writer, replies, session)
+            if game_over or not data:
+                # The client ending the stream itself has left for good.
+                clean = not connection.reaped
+                break
+    except (ConnectionError, ValueError) as exc:
+        logger.debug('⚠️ Connection error from {}: {}', addr, exc)
+    finally:
+        if session is not None:
+            connections.closed(connection)
+            session.close(clean=clean)
+            pusher.cancel()
+            if metrics is not None:
+                metrics.disconnected()
+        writer.close()
+        with suppress(ConnectionError):
+            await writer.wait_closed()
+    logger.info('👋 Client disconnected')
+
+
+async def _refuse(writer: asyncio.StreamWriter, metrics: Metrics | None) -> None:
+    logger.debug('🚧 All connection slots taken, refusing {}', writer.get_extra_info('peername'))
+    if metrics is not None:
+        metrics.errors['Server is busy'] += 1
+    writer.write(BUSY_REPLY)
+    writer.close()
+    with suppress(ConnectionError):
+        await writer.wait_closed()
+
+
+async def _send(writer: asyncio.StreamWriter, data: bytes, session: Session) -> None:
+    """
+    Write and drain, timing it if the session's last request was sampled.
+
+    The profiler is told of the write before draining, since other
+    connections run on this thread while the drain waits.
+    """
+    if not session.timed and not session.profiling:
+        writer.write(data)
+        await writer.drain()
+        return
+    start = perf_counter_ns()
+    writer.write(data)
+    if session.profiling:
+        session.done()
+    await writer.drain()
+    if session.timed:
+        session.metrics.latency['send'].observe(perf_counter_ns() - start)
+
+
+async def _push(writer: asyncio.StreamWriter, subscriber: Subscriber, ready: asyncio.Event) -> None:
+    """Write queued broadcasts to the connection as they arrive."""
+    while True:
+        await ready.wait()
+        ready.clear()
+        if subscriber.closed:
+            logger.info('🐢 Subscriber fell too far behind, disconnecting')
+            writer.transport.abort()
+            return
+        for payload in subscriber.drain():
+            writer.write(payload)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            return
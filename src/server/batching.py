@@ -0,0 +1,127 @@
+"""
+Play the moves of many games together, once per tick.
+
+With the batched engine every connection still has its own thread, but a
+move is not played by that thread: it waits while `MoveBatcher` collects
+the moves submitted by all connections for up to `BATCH_TICK` seconds,
+then plays them in one `BatchBoards.play` call and pushes the legal ones
+on their boards. The thread submitting a move holds its game's lock until
+the move is played, so a game has at most one move in a batch and nothing
+else touches its board meanwhile.
+
+Promotions, which only binary frames can send, are played on the spot.
+
+NumPy is an optional dependency, imported by the first batch.
+"""
+
+import time
+from threading import Condition, Event, Thread
+
+import chess
+from loguru import logger
+
+from src.protocol import GameBoard, MoveEvent, play_move
+
+BATCH_TICK = 0.002
+MAX_BATCH = 4096
+
+
+class _Pending:
+    """A move waiting for the next batch, and its event once played."""
+
+    __slots__ = ('board', 'done', 'error', 'event', 'move')
+
+    def __init__(self, board: GameBoard, move: chess.Move) -> None:
+        self.board = board
+        self.move = move
+        self.event: MoveEvent | None = None
+        self.error: Exception | None = None
+        self.done = Event()
+
+
+class MoveBatcher:
+    """
+    Collect moves from connection threads and play them in batches.
+
+    A batch is played `tick` seconds after its first move was submitted,
+    or as soon as it holds `max_batch` moves.
+    """
+
+    def __init__(self, tick: float = BATCH_TICK, max_batch: int = MAX_BATCH) -> None:
+        """Start the thread playing the batches."""
+        self.tick = tick
+        self.max_batch = max_batch
+        self.batches = 0
+        self.moves = 0
+        self._pending: list[_Pending] = []
+        self._ready = Condition()
+        self._closed = False
+        self._thread = Thread(target=self._run, name='chess-batcher', daemon=True)
+        self._thread.start()
+
+    def play(self, board: GameBoard, move: chess.Move) -> MoveEvent | None:
+        """
+        Push a move if legal and return its event, else None, like `play_move`.
+
+        Blocks until the batch holding the move is played. The caller holds
+        the lock of the board's game.
+        """
+        if move.promotion:
+            return play_move(board, move)
+        pending = _Pending(board, move)
+        with self._ready:
+            if self._closed:
+                return play_move(board, move)
+            self._pending.append(pending)
+            if len(self._pending) in {1, self.max_batch}:
+                self._ready.notify()
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.event
+
+    def close(self) -> None:
+        """Play the moves still pending and stop the batching thread."""
+        with self._ready:
+            self._closed = True
+            self._ready.notify()
+        self._thread.join()
+        if self.batches:
+            logger.debug('📦 Played {} moves in {} batches', self.moves, self.batches)
+
+    def _run(self) -> None:
+        while True:
+            with self._ready:
+                self._ready.wait_for(lambda: self._pending or self._closed)
+                if not self._pending:
+                    return
+                deadline = time.monotonic() + self.tick
+                while not self._closed and len(self._pending) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._ready.wait(remaining)
+                batch, self._pending = self._pending, []
+            self._play(batch)
+
+    def _play(self, batch: list[_Pending]) -> None:
+        from src.protocol.batch import BatchBoards  # noqa: PLC0415
+
+        try:
+            boards = BatchBoards(len(batch))
+            for game, pending in enumerate(batch):
+                boards.store(game, pending.board)
+            events = boards.play(range(len(batch)), [pending.move for pending in batch])
+            for pending, event in zip(batch, events, strict=True):
+                if event is not None:
+                    pending.board.push(pending.move)
+                pending.event = event
+        except Exception as exc:  # noqa: BLE001
+            logger.exception('💥 Batch of {} moves failed', len(batch))
+            for pending in batch:
+                pending.error = exc
+        finally:
+            for pending in batch:
+                pending.done.set()
+        self.batches += 1
+        self.moves += len(batch)
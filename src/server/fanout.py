@@ -0,0 +1,116 @@
+"""
+Move broadcasts to the other players and spectators of a shared game.
+
+Publishing never touches a socket: each message is encoded once per
+protocol and the same bytes object is appended to every subscriber's
+bounded queue. The engine that owns the subscriber's connection drains the
+queue on its own time, so a slow reader only ever delays itself. When a
+queue is full the subscriber either loses its oldest message or is
+disconnected, depending on the policy.
+"""
+
+from collections import deque
+from collections.abc import Callable
+from enum import StrEnum
+from threading import Lock
+
+from src.protocol.binary import Opcode, encode_frame
+
+QUEUE_LIMIT = 256
+
+
+class Policy(StrEnum):
+    """What happens to a subscriber whose queue is full."""
+
+    DROP = 'drop'  # discard the oldest queued message
+    DISCONNECT = 'disconnect'  # close the subscriber's connection
+
+
+class Broadcast:
+    """A message published once and shared by every subscriber."""
+
+    __slots__ = ('_frame', '_line', 'text')
+
+    def __init__(self, text: str) -> None:
+        """Wrap a reply text; its wire forms are encoded on first use."""
+        self.text = text
+        self._line: bytes | None = None
+        self._frame: bytes | None = None
+
+    def wire(self, binary: bool) -> bytes:  # noqa: FBT001
+        """Return the encoded message for a text or binary connection."""
+        if binary:
+            if self._frame is None:
+                self._frame = encode_frame(Opcode.TEXT, self.text.encode())
+            return self._frame
+        if self._line is None:
+            self._line = f'{self.text}\n\n'.encode()
+        return self._line
+
+
+class Subscriber:
+    """A bounded outbound queue that never blocks the publisher."""
+
+    __slots__ = ('_lock', '_queue', '_wake', 'closed', 'dropped', 'limit', 'policy')
+
+    def __init__(
+        self,
+        wake: Callable[[], None],
+        limit: int = QUEUE_LIMIT,
+        policy: Policy = Policy.DROP,
+    ) -> None:
+        """Create an empty queue; `wake` tells the owner there is work."""
+        self._wake = wake
+        self._queue: deque[bytes] = deque()
+        self._lock = Lock()
+        self.limit = limit
+        self.policy = policy
+        self.dropped = 0
+        self.closed = False
+
+    def offer(self, payload: bytes) -> bool:
+        """Queue a payload, applying the overflow policy; return if queued."""
+        with self._lock:
+            if self.closed:
+                return False
+            if len(self._queue) >= self.limit:
+                if self.policy == Policy.DISCONNECT:
+                    self.closed = True
+                    self._queue.clear()
+                    queued = False
+                else:
+                    self._queue.popleft()
+                    self.dropped += 1
+                    queued = True
+            else:
+                queued = True
+            if queued:
+                self._queue.append(payload)
+        self._wake()
+        return queued
+
+    def drain(self) -> list[bytes]:
+        """Take every queued payload, oldest first."""
+        with self._lock:
+            payloads = list(self._queue)
+            self._queue.clear()
+        return payloads
+
+    def close(self) -> None:
+        """Stop accepting messages."""
+        with self._lock:
+            self.closed = True
+            self._queue.clear()
+
+
+class Fanout:
+    """Settings shared by every subscriber of a server."""
+
+    def __init__(self, limit: int = QUEUE_LIMIT, policy: Policy = Policy.DROP) -> None:
+        """Store the queue bound and overflow policy."""
+        self.limit = limit
+        self.policy = policy
+
+    def subscribe(self, wake: Callable[[], None]) -> Subscriber:
+        """Return a new subscriber using these settings."""
+        return Subscriber(wake, self.limit, self.policy)
@@ -0,0 +1,440 @@
+import secrets
+import time
+from collections.abc import Iterator
+from contextlib import ExitStack, contextmanager
+from enum import StrEnum
+from pathlib import Path
+from threading import Lock
+from typing import Protocol
+
+import chess
+from loguru import logger
+
+from src.protocol import CompactGame, GameBoard
+from src.protocol.compact import encode_move
+from src.server.fanout import Broadcast
+from src.server.hibernation import HibernationStore
+from src.server.journal import FSYNC_INTERVAL, Journal
+
+MAX_GAMES = 100_000
+IDLE_TIMEOUT = 3600.0
+HIBERNATE_AFTER = 300.0
+PACK_AFTER = 60.0
+TOKEN_BYTES = 16
+EVICT_INTERVAL = 30.0
+
+
+class Seat(StrEnum):
+    """How a connection takes part in a game."""
+
+    SOLO = 'solo'  # plays both sides, the default game of a new connection
+    WHITE = 'white'
+    BLACK = 'black'
+    SPECTATOR = 'spectator'
+
+
+class Participant(Protocol):
+    """Anything seated at a game that can receive its broadcasts."""
+
+    def deliver(self, message: Broadcast) -> None:
+        """Queue a broadcast without blocking."""
+
+
+class RegistryFull(Exception):  # noqa: N818
+    """Signal that no more games can be created."""
+
+
+class Game:
+    """
+    A game that connections share by ID, guarded by its own lock.
+
+    Its position and moves are kept in a `CompactGame`. While the game is
+    being played its board stays materialized, returned by `play`, and the
+    moves played on it are folded back into the `CompactGame` when the game
+    goes idle, see `pack`, or whenever `state` is read. An idle game can
+    hibernate: its `CompactGame` goes to the hibernation `store` and is
+    read back by the next access to `state`. `tokens` holds the resume
+    token issued for each seat, if any.
+    """
+
+    __slots__ = (
+        '_board',
+        '_state',
+        'black',
+        'dirty',
+        'ended',
+        'game_id',
+        'last_active',
+        'lock',
+        'logged',
+        'shared',
+        'spectators',
+        'store',
+        'tokens',
+        'white',
+    )
+
+    def __init__(
+        self,
+        game_id: str,
+        shared: bool = False,  # noqa: FBT001, FBT002
+        store: HibernationStore | None = None,
+    ) -> None:
+        """Create an empty game; `shared` games can be joined by ID."""
+        self.game_id = game_id
+        self.shared = shared
+        self.store = store
+        self._state: CompactGame | None = CompactGame()
+        self._board: GameBoard | None = None
+        self.lock = Lock()
+        self.white: Participant | None = None
+        self.black: Participant | None = None
+        self.spectators: set[Participant] = set()
+        self.tokens: dict[Seat, str] = {}
+        self.ended = False
+        self.dirty = False
+        self.logged = 0
+        self.last_active = time.monotonic()
+
+    @property
+    def state(self) -> CompactGame:
+        """Return the position and moves, waking the game; hold the lock."""
+        self.pack()
+        state = self._state
+        if state is None:
+            state = self._state = self.store.take(self.game_id)
+        return state
+
+    @state.setter
+    def state(self, state: CompactGame) -> None:
+        self._state = state
+        self._board = None
+
+    @property
+    def packed(self) -> bool:
+        """Return whether the game has no materialized board."""
+        return self._board is None
+
+    @property
+    def turn(self) -> chess.Color:
+        """Return the side to move without packing the board; hold the lock."""
+        board = self._board
+        return self.state.turn if board is None else board.turn
+
+    def play(self) -> GameBoard:
+        """
+        Return the board to play the game's moves on. Caller holds the lock.
+
+        The board stays materialized until the game is packed, so moves are
+        pushed on it directly and nothing else may change it.
+        """
+        board = self._board
+        if board is None:
+            board = self._board = self.state.board()
+        return board
+
+    def pack(self) -> None:
+        """Fold the moves played on the board into the state and drop it."""
+        board = self._board
+        if board is not None:
+            self._board = None
+            self._state.update(board)
+
+    @property
+    def hibernated(self) -> bool:
+        """Return whether the game's state is in the hibernation store."""
+        return self._state is None
+
+    def hibernate(self) -> None:
+        """Move the state to the hibernation store. Caller holds the lock."""
+        self.pack()
+        self.store.put(self.game_id, self._state)
+        self._state = None
+
+    def board(self) -> GameBoard:
+        """Build a board in the game's position without waking it."""
+        if self._board is not None:
+            return self._board.copy(stack=False)
+        state = self._state
+        if state is None:
+            state = self.store.peek(self.game_id)
+        return state.board()
+
+    def moves_since(self, logged: int) -> tuple[list[int], int]:
+        """
+        Return the codes of the moves after the first `logged`, and its ply.
+
+        The ply is that of the first returned move. Neither packs the board
+        nor wakes the game; the caller holds the lock.
+        """
+        state = self._state
+        if state is None:
+            state = self.store.peek(self.game_id)
+        codes = state.moves[logged:].tolist()
+        board, ply = self._board, state.ply()
+        if board is not None:
+            stack = board.move_stack
+            codes += map(encode_move, stack[max(logged - len(state.moves), 0) :])
+            ply += len(stack)
+        return codes, ply - len(codes) + 1
+
+    def seat(self, owner: Participant, seat: Seat) -> None:
+        """Seat `owner`; SOLO takes both colors. Caller holds the lock."""
+        if seat in {Seat.SOLO, Seat.WHITE}:
+            self.white = owner
+        if seat in {Seat.SOLO, Seat.BLACK}:
+            self.black = owner
+        if seat == Seat.SPECTATOR:
+            self.spectators.add(owner)
+        self.touch()
+
+    def leave(self, owner: Participant) -> None:
+        """Release every seat held by `owner`. Caller holds the lock."""
+        if self.white is owner:
+            self.white = None
+        if self.black is owner:
+            self.black = None
+        self.spectators.discard(owner)
+
+    def broadcast(self, message: Broadcast, sender: Participant) -> None:
+        """Deliver a message to all attached but the sender, under the lock."""
+        for owner in (self.white, self.black):
+            if owner is not None and owner is not sender:
+                owner.deliver(message)
+        for owner in self.spectators:
+            owner.deliver(message)
+
+    def holder(self, seat: Seat) -> Participant | None:
+        """Return who holds a player seat. Caller holds the lock."""
+        return self.black if seat == Seat.BLACK else self.white
+
+    def occupied(self) -> bool:
+        """Return whether any connection is still attached."""
+        return self.white is not None or self.black is not None or bool(self.spectators)
+
+    def touch(self) -> None:
+        """Record activity so the game is not evicted as idle."""
+        self.last_active = time.monotonic()
+
+
+class GameRegistry:
+    """
+    Live games by ID.
+
+    Lookups are plain dict accesses; the registry lock is only taken to add
+    or remove a game, and play is serialized per game by `Game.lock`.
+    Unattended games are evicted once idle for `idle_timeout` seconds.
+    With a `hibernation` store, games idle for `hibernate_after` seconds,
+    attended or not, hibernate until their next request. Shared games are
+    recorded in the `journal`, if one is given.
+
+    A player seat can be given a resume token, which lets a new connection
+    take the seat over after the old one dropped; tokens are forgotten
+    with their game.
+    """
+
+    def __init__(
+        self,
+        max_games: int = MAX_GAMES,
+        idle_timeout: float = IDLE_TIMEOUT,
+        journal: Journal | None = None,
+        hibernation: HibernationStore | None = None,
+        hibernate_after: float = HIBERNATE_AFTER,
+    ) -> None:
+        """Create an empty registry bounded to `max_games` games."""
+        self.max_games = max_games
+        self.idle_timeout = idle_timeout
+        self.journal = journal
+        self.hibernation = hibernation
+        self.hibernate_after = hibernate_after
+        self._games: dict[str, Game] = {}
+        self._tokens: dict[str, tuple[Game, Seat]] = {}
+        self._lock = Lock()
+        self._next_eviction = time.monotonic() + EVICT_INTERVAL
+
+    def __len__(self) -> int:
+        """Return the number of live games."""
+        return len(self._games)
+
+    def create(self, shared: bool = False) -> Game:  # noqa: FBT001, FBT002
+        """
+        Register a new game under a fresh random ID.
+
+        Raises:
+            RegistryFull: If `max_games` games are already live.
+        """
+        with self._lock:
+            if len(self._games) >= self.max_games:
+                msg = f'registry holds {self.max_games} games'
+                raise RegistryFull(msg)
+            game_id = secrets.token_hex(4)
+            while game_id in self._games:
+                game_id = secrets.token_hex(4)
+            game = self._games[game_id] = Game(game_id, shared, self.hibernation)
+        if shared and self.journal is not None:
+            self.journal.created(game_id)
+        return game
+
+    def get(self, game_id: str) -> Game | None:
+        """Return the live game with this ID, if any."""
+        return self._games.get(game_id)
+
+    def issue_token(self, game: Game, seat: Seat) -> str:
+        """Return the resume token of a player seat, issuing it if needed."""
+        with game.lock:
+            token = game.tokens.get(seat)
+            if token is None:
+                token = secrets.token_urlsafe(TOKEN_BYTES)
+                with self._lock:
+                    # A removed game has had its tokens forgotten already.
+                    if self._games.get(game.game_id) is game:
+                        game.tokens[seat] = token
+                        self._tokens[token] = (game, seat)
+        return token
+
+    def resumable(self, token: str) -> tuple[Game, Seat] | None:
+        """Return the game and seat a resume token was issued for, if live."""
+        entry = self._tokens.get(token)
+        if entry is None or entry[0].ended:
+            return None
+        return entry
+
+    def remove(self, game: Game) -> None:
+        """Mark a game as ended and forget it."""
+        game.ended = True
+        with self._lock:
+            if self._games.get(game.game_id) is not game:
+                return
+            del self._games[game.game_id]
+            for token in game.tokens.values():
+                self._tokens.pop(token, None)
+        if self.hibernation is not None:
+            with game.lock:
+                self.hibernation.discard(game.game_id)
+        if game.shared and self.journal is not None:
+            self.journal.ended(game.game_id)
+
+    def moved(self, game: Game) -> None:
+        """Journal the move just played in a shared game, under its lock."""
+        if game.shared and self.journal is not None:
+            self.journal.moved(game)
+
+    def recover(self) -> int:
+        """
+        Restore the games live in the journal and start journaling.
+
+        Restored games are not refused beyond `max_games`. They start
+        unattended, so they are evicted if nobody rejoins them within
+        `idle_timeout`.
+
+        Returns:
+            The number of games restored.
+        """
+        boards = self.journal.replay()
+        with self._lock:
+            for game_id, board in boards.items():
+                game = Game(game_id, shared=True, store=self.hibernation)
+                self._games[game_id] = game
+                game.state = CompactGame(board)
+                game.logged = len(game.state.moves)
+        self.journal.start(self._snapshots)
+        return len(boards)
+
+    def _snapshots(self) -> list[tuple[str, chess.Board]]:
+        with self._lock:
+            games = [game for game in self._games.values() if game.shared]
+        boards = []
+        for game in games:
+            with game.lock:
+                if not game.ended:
+                    boards.append((game.game_id, game.board()))
+        return boards
+
+    def evict_idle(self, now: float | None = None) -> int:
+        """Remove unattended games idle for longer than `idle_timeout`."""
+        deadline = (time.monotonic() if now is None else now) - self.idle_timeout
+        with self._lock:
+            games = list(self._games.values())
+        evicted = 0
+        for game in games:
+            if game.last_active < deadline and not game.occupied():
+                self.remove(game)
+                evicted += 1
+        return evicted
+
+    def hibernate_idle(self, now: float | None = None) -> int:
+        """Hibernate games idle for longer than `hibernate_after`."""
+        if self.hibernation is None:
+            return 0
+        deadline = (time.monotonic() if now is None else now) - self.hibernate_after
+        with self._lock:
+            games = list(self._games.values())
+        hibernated = 0
+        for game in games:
+            if game.last_active >= deadline or game.hibernated:
+                continue
+            with game.lock:
+                # Moves still to be journaled are read from the state.
+                if not (game.ended or game.dirty or game.hibernated):
+                    game.hibernate()
+                    hibernated += 1
+        if hibernated:
+            logger.debug('💤 Hibernated {} idle games', hibernated)
+        return hibernated
+
+    def pack_idle(self, now: float | None = None) -> int:
+        """Pack the boards of games idle for longer than `PACK_AFTER`."""
+        deadline = (time.monotonic() if now is None else now) - PACK_AFTER
+        with self._lock:
+            games = list(self._games.values())
+        packed = 0
+        for game in games:
+            if game.last_active >= deadline or game.packed:
+                continue
+            with game.lock:
+                if not game.packed:
+                    game.pack()
+                    packed += 1
+        return packed
+
+    def maybe_evict(self) -> None:
+        """Evict, pack and hibernate idle games, once per `EVICT_INTERVAL`."""
+        now = time.monotonic()
+        if now >= self._next_eviction:
+            self._next_eviction = now + EVICT_INTERVAL
+            self.evict_idle(now)
+            self.pack_idle(now)
+            self.hibernate_idle(now)
+
+
+@contextmanager
+def open_registry(
+    max_games: int = MAX_GAMES,
+    idle_timeout: float = IDLE_TIMEOUT,
+    *,
+    journal_path: Path | None = None,
+    fsync_interval: float = FSYNC_INTERVAL,
+    hibernate_after: float = 0.0,
+    hibernate_dir: Path | None = None,
+) -> Iterator[GameRegistry]:
+    """
+    Yield a registry, recovered from and journaled to `journal_path`.
+
+    Games idle for `hibernate_after` seconds hibernate to a segment file in
+    `hibernate_dir`; 0 keeps every game in memory.
+    """
+    with ExitStack() as stack:
+        hibernation = None
+        if hibernate_after:
+            hibernation = HibernationStore(hibernate_dir)
+            stack.callback(hibernation.close)
+        if journal_path is None:
+            yield GameRegistry(max_games, idle_timeout, None, hibernation, hibernate_after)
+            return
+
+        journal = Journal(journal_path, fsync_interval)
+        registry = GameRegistry(max_games, idle_timeout, journal, hibernation, hibernate_after)
+        restored = registry.recover()
+        logger.info('📓 Journaling to {}, restored {} games', journal_path, restored)
+        stack.callback(journal.close)
+        yield registry
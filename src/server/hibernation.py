@@ -0,0 +1,124 @@
+"""
+Idle games parked on disk until their next request.
+
+A game nobody has touched for a while gives its `CompactGame` to the
+store, which appends it (`bytes(game)`: the packed position, then the move
+codes) to a segment file and keeps its offset in an in-memory index. The
+next request for the game reads the record back with a single `pread` and
+forgets it. Records are never rewritten in place: a record read back or
+discarded is garbage, and once the garbage outweighs the live records
+(and at least `COMPACT_MIN_BYTES`) the live ones are copied into a fresh
+segment.
+
+The segment is an anonymous temporary file, removed when the store is
+closed or the process exits, so each worker process has its own and
+nothing is left behind. Durability is the journal's job.
+"""
+
+import os
+import tempfile
+from pathlib import Path
+from threading import Lock
+from typing import BinaryIO
+
+from loguru import logger
+
+from src.protocol import CompactGame
+
+COMPACT_MIN_BYTES = 1 << 20
+
+
+class HibernationStore:
+    """An append-only segment of hibernated games, indexed by game ID."""
+
+    def __init__(self, directory: Path | None = None) -> None:
+        """Open an empty segment in `directory`, or the temporary directory."""
+        self.directory = directory
+        self.hibernations = 0
+        self.rehydrations = 0
+        self._index: dict[str, tuple[int, int]] = {}
+        self._lock = Lock()
+        self._file = self._open()
+        self._end = 0
+        self._garbage = 0
+
+    def __len__(self) -> int:
+        """Return the number of games hibernated."""
+        return len(self._index)
+
+    def __contains__(self, game_id: str) -> bool:
+        """Return whether the game is hibernated."""
+        return game_id in self._index
+
+    @property
+    def size(self) -> int:
+        """Return the bytes the segment takes on disk."""
+        return self._end
+
+    def put(self, game_id: str, game: CompactGame) -> None:
+        """Append a game to the segment."""
+        record = bytes(game)
+        with self._lock:
+            os.pwrite(self._file.fileno(), record, self._end)
+            self._index[game_id] = (self._end, len(record))
+            self._end += len(record)
+            self.hibernations += 1
+
+    def take(self, game_id: str) -> CompactGame:
+        """
+        Read a game back and remove it from the store.
+
+        Raises:
+            KeyError: If the game is not hibernated.
+        """
+        with self._lock:
+            offset, length = self._index.pop(game_id)
+            record = os.pread(self._file.fileno(), length, offset)
+            self.rehydrations += 1
+            self._garbage += length
+            self._maybe_compact()
+        return CompactGame.frombytes(record)
+
+    def peek(self, game_id: str) -> CompactGame:
+        """
+        Read a game without removing it from the store.
+
+        Raises:
+            KeyError: If the game is not hibernated.
+        """
+        with self._lock:
+            offset, length = self._index[game_id]
+            record = os.pread(self._file.fileno(), length, offset)
+        return CompactGame.frombytes(record)
+
+    def discard(self, game_id: str) -> None:
+        """Forget a hibernated game, if it is one."""
+        with self._lock:
+            entry = self._index.pop(game_id, None)
+            if entry is not None:
+                self._garbage += entry[1]
+                self._maybe_compact()
+
+    def close(self) -> None:
+        """Close and remove the segment."""
+        with self._lock:
+            self._index.clear()
+            self._file.close()
+
+    def _open(self) -> BinaryIO:
+        return tempfile.TemporaryFile(prefix='chess-hibernation-', dir=self.directory)
+
+    def _maybe_compact(self) -> None:
+        """Copy the live records to a new segment once garbage dominates."""
+        if self._garbage < COMPACT_MIN_BYTES or self._garbage <= self._end - self._garbage:
+            return
+        old, new = self._file.fileno(), self._open()
+        index: dict[str, tuple[int, int]] = {}
+        end = 0
+        for game_id, (offset, length) in self._index.items():
+            os.pwrite(new.fileno(), os.pread(old, length, offset), end)
+            index[game_id] = (end, length)
+            end += length
+        logger.debug('💤 Compacted hibernation segment from {} to {} bytes', self._end, end)
+        self._file.close()
+        self._file, self._index, self._end, self._garbage = new, index, end, 0
@@ -0,0 +1,231 @@
+"""
+Append-only journal of shared games, replayed to rebuild them on startup.
+
+Each record is one text line:
+
+    N <game_id>               a shared game was started
+    M <game_id> <ply> <uci>   a legal move left the game at <ply> half-moves
+    S <game_id> <ply> <fen>   a snapshot written by compaction
+    E <game_id>               the game ended
+
+A move only marks its game as dirty, once per commit window. Every
+`fsync_interval` seconds a writer thread collects the moves the dirty games
+made since the last commit from their move histories, writes them and fsyncs
+once for all of them (group commit), so a crash loses at most the last
+window. Every `compact_every` records the writer replaces the file with one
+snapshot per live game. Moves keep their ply so replay can skip the ones a
+snapshot already contains.
+"""
+
+import os
+from collections import deque
+from collections.abc import Callable
+from pathlib import Path
+from threading import Event, Lock, Thread
+from typing import Protocol, TextIO
+
+import chess
+from loguru import logger
+
+from src.protocol import GameBoard
+from src.protocol.compact import decode_move
+
+FSYNC_INTERVAL = 0.1
+COMPACT_EVERY = 100_000
+
+# UCI text of every non-promotion move, indexed by from | to << 6.
+_UCI = [f'{source}{target}' for target in chess.SQUARE_NAMES for source in chess.SQUARE_NAMES]
+
+type Snapshots = Callable[[], list[tuple[str, chess.Board]]]
+
+
+class Journaled(Protocol):
+    """A game whose moves the journal collects from its move history."""
+
+    game_id: str
+    lock: Lock
+    dirty: bool  # moves were made since the game was last collected
+    logged: int  # length of the move history already in the journal
+
+    def moves_since(self, logged: int) -> tuple[list[int], int]:
+        """Return the move codes after the first `logged`, and the first ply."""
+
+
+class Journal:
+    """
+    A group-committed write-ahead log of shared games.
+
+    Recorders only append to a deque, which is safe without a lock since
+    the writer thread is the only one taking items off it. Items are either
+    complete lines or games whose new moves are still to be collected.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        fsync_interval: float = FSYNC_INTERVAL,
+        compact_every: int = COMPACT_EVERY,
+    ) -> None:
+        """Prepare a journal at `path`; nothing is written until `start`."""
+        self.path = path
+        self.fsync_interval = fsync_interval
+        self.compact_every = compact_every
+        self._pending: deque[str | Journaled] = deque()
+        self._stop = Event()
+        self._file: TextIO | None = None
+        self._thread: Thread | None = None
+        self._snapshots: Snapshots | None = None
+        self._since_compaction = 0
+
+    def replay(self) -> dict[str, chess.Board]:
+        """
+        Rebuild the boards of the games still live in the journal.
+
+        Reading stops at the first malformed record, which can only be a
+        line torn by a crash in the middle of a write.
+        """
+        boards: dict[str, chess.Board] = {}
+        if not self.path.exists():
+            return boards
+        with self.path.open(encoding='utf-8') as fh:
+            for number, line in enumerate(fh, 1):
+                try:
+                    _apply(boards, line)
+                except ValueError, IndexError:
+                    logger.warning('📓 Ignoring journal from torn record at line {}', number)
+                    break
+        return boards
+
+    def start(self, snapshots: Snapshots) -> None:
+        """
+        Compact the journal and start the writer thread.
+
+        `snapshots` returns a copy of every live game's board; it is called
+        from the writer thread whenever the journal is compacted.
+        """
+        self._snapshots = snapshots
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._compact()
+        self._thread = Thread(target=self._run, name='journal-writer', daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        """Stop the writer thread and commit everything recorded so far."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self._file is not None:
+            self._flush()
+            self._file.close()
+            self._file = None
+
+    def created(self, game_id: str) -> None:
+        """Record that a shared game was started."""
+        self._pending.append(f'N {game_id}\n')
+
+    def moved(self, game: Journaled) -> None:
+        """Record that `game` made a move, under its lock."""
+        if not game.dirty:
+            game.dirty = True
+            self._pending.append(game)
+
+    def ended(self, game_id: str) -> None:
+        """Record that a shared game ended."""
+        self._pending.append(f'E {game_id}\n')
+
+    def _take(self) -> list[str]:
+        """Remove the pending items and return them as lines, oldest first."""
+        pending = self._pending
+        lines: list[str] = []
+        for _ in range(len(pending)):
+            item = pending.popleft()
+            if isinstance(item, str):
+                lines.append(item)
+            else:
+                lines += _collect(item)
+        return lines
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.fsync_interval):
+            try:
+                self._flush()
+                if self._since_compaction >= self.compact_every:
+                    self._compact()
+            except OSError as exc:
+                logger.error('📓 Journal write failed: {}', exc)
+
+    def _flush(self) -> None:
+        """Write the pending batch and fsync it once."""
+        batch = self._take()
+        if batch:
+            self._file.write(''.join(batch))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._since_compaction += len(batch)
+
+    def _compact(self) -> None:
+        """
+        Replace the journal with a snapshot of every live game.
+
+        The snapshots go to a temporary file together with whatever was
+        recorded while they were taken, and the file then atomically takes
+        the journal's place, so a crash leaves either the old journal or
+        the new one.
+        """
+        if self._file is not None:
+            self._flush()
+        tmp = self.path.with_name(f'{self.path.name}.tmp')
+        boards = self._snapshots()
+        fh = tmp.open('w', encoding='utf-8')
+        fh.writelines(f'S {game_id} {board.ply()} {board.fen()}\n' for game_id, board in boards)
+        fh.writelines(self._take())
+        fh.flush()
+        os.fsync(fh.fileno())
+        tmp.replace(self.path)
+        _fsync_dir(self.path.parent)
+        if self._file is not None:
+            self._file.close()
+        self._file = fh
+        self._since_compaction = 0
+        logger.debug('📓 Compacted journal to {} games', len(boards))
+
+
+def _collect(game: Journaled) -> list[str]:
+    """Return the moves `game` made since it was last collected."""
+    with game.lock:
+        game.dirty = False
+        codes, first = game.moves_since(game.logged)
+        game.logged += len(codes)
+    lines = []
+    for ply, code in enumerate(codes, first):
+        uci = decode_move(code).uci() if code >> 12 else _UCI[code]
+        lines.append(f'M {game.game_id} {ply} {uci}\n')
+    return lines
+
+
+def _apply(boards: dict[str, chess.Board], line: str) -> None:
+    kind, game_id, *rest = line.rstrip().split(maxsplit=3)
+    if kind == 'N':
+        # A game started while compaction took its snapshots can be in them
+        # with its start recorded after; the snapshot is the later position.
+        boards.setdefault(game_id, GameBoard())
+    elif kind == 'S':
+        boards[game_id] = GameBoard(rest[1])
+    elif kind == 'M':
+        board = boards.get(game_id)
+        # A snapshot taken after the move already contains it.
+        if board is not None and int(rest[0]) == board.ply() + 1:
+            board.push(chess.Move.from_uci(rest[1]))
+    elif kind == 'E':
+        boards.pop(game_id, None)
+    else:
+        msg = f'unknown record {kind!r}'
+        raise ValueError(msg)
+
+
+def _fsync_dir(path: Path) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
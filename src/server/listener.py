@@ -0,0 +1,43 @@
+import ipaddress
+import socket
+
+ACCEPT_TIMEOUT = 0.2
+
+type Address = tuple[str, int] | tuple[str, int, int, int]
+
+
+def server_address(interface: str, port: int) -> tuple[socket.AddressFamily, Address]:
+    """Return the socket family and bind address for an interface and port."""
+    ip = ipaddress.ip_address(interface)
+    if ip.version == 6:  # noqa: PLR2004
+        return socket.AF_INET6, (interface, port, 0, 0)
+    return socket.AF_INET, (interface, port)
+
+
+def is_loopback(addr: Address | None) -> bool:
+    """Return whether a peer address is local to this host."""
+    if not addr:
+        return False
+    ip = ipaddress.ip_address(addr[0])
+    if ip.version == 6 and ip.ipv4_mapped is not None:  # noqa: PLR2004
+        ip = ip.ipv4_mapped
+    return ip.is_loopback
+
+
+def bind_listener(
+    family: socket.AddressFamily,
+    bind_addr: Address,
+    reuse_port: bool = False,  # noqa: FBT001, FBT002
+) -> socket.socket:
+    """Create a bound TCP socket that times out accepts so stops are noticed."""
+    listener = socket.socket(family, socket.SOCK_STREAM)
+    try:
+        listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if reuse_port:
+            listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        listener.settimeout(ACCEPT_TIMEOUT)
+        listener.bind(bind_addr)
+    except OSError:
+        listener.close()
+        raise
+    return listener
@@ -0,0 +1,164 @@
+"""
+Server logging setup, with an optional sink that keeps writes off the hot path.
+
+In `sync` mode every record is written and flushed by the thread that logs
+it, as loguru does by default. In `async` mode records are only appended
+to an in-memory queue, and a writer thread drains it every
+`FLUSH_INTERVAL` seconds with one write and one flush per batch. Loguru
+still builds and formats ordinary records on the logging thread, which
+costs far more than the write, so the per-request traces bypass it in this
+mode: `trace` queues the template and its value and the writer thread
+formats them. Traces are also sampled by connection: only one connection
+in `trace_sample` logs its requests and responses, and none does unless
+debug logging is on.
+"""
+
+import atexit
+import sys
+import time
+from collections import deque
+from enum import StrEnum
+from itertools import count
+from pathlib import Path
+from threading import Event, Lock, Thread
+from typing import TextIO
+
+from loguru import logger
+
+FLUSH_INTERVAL = 0.2
+
+
+class LogMode(StrEnum):
+    """How log records reach their sink."""
+
+    SYNC = 'sync'  # written and flushed by the logging thread
+    ASYNC = 'async'  # queued and written in batches by a writer thread
+
+
+class BatchingSink:
+    """
+    A loguru sink queuing messages for a writer thread.
+
+    Appending to the deque needs no lock, since the writer thread is the
+    only one taking items off it. The sink is stopped, and everything
+    queued written out, when loguru removes it or the process exits.
+    """
+
+    def __init__(
+        self,
+        stream: TextIO,
+        interval: float = FLUSH_INTERVAL,
+        owned: bool = False,  # noqa: FBT001, FBT002
+    ) -> None:
+        """Write batches to `stream` every `interval`; close it if `owned`."""
+        self.stream = stream
+        self.interval = interval
+        self.owned = owned
+        self._queue: deque[str | tuple[float, str, object]] = deque()
+        self._stop = Event()
+        self._stop_lock = Lock()
+        self._thread = Thread(target=self._run, name='log-writer', daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def write(self, message: str) -> None:
+        """Queue a formatted record; never blocks on I/O."""
+        self._queue.append(message)
+
+    def trace(self, template: str, value: object) -> None:
+        """Queue a DEBUG trace, formatted later by the writer thread."""
+        self._queue.append((time.time(), template, value))
+
+    def isatty(self) -> bool:
+        """Let loguru colorize like it would for the wrapped stream."""
+        return self.stream.isatty()
+
+    def stop(self) -> None:
+        """Stop the writer thread and write what is still queued."""
+        with self._stop_lock:
+            if self._stop.is_set():
+                return
+            self._stop.set()
+        self._thread.join()
+        self._drain()
+        if self.owned:
+            self.stream.close()
+        atexit.unregister(self.stop)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._drain()
+
+    def _drain(self) -> None:
+        queue = self._queue
+        batch = [queue.popleft() for _ in range(len(queue))]
+        if batch:
+            self.stream.write(''.join(map(_format, batch)))
+            self.stream.flush()
+
+
+def _format(item: str | tuple[float, str, object]) -> str:
+    """Return a queued message, laying out traces like loguru's default."""
+    if isinstance(item, str):
+        return item
+    stamp, template, value = item
+    when = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(stamp))
+    millis = int(stamp % 1 * 1000)
+    return f'{when}.{millis:03d} | DEBUG    | {template.format(value)}\n'
+
+
+_trace_every = 1
+_connections = count()
+_batching: BatchingSink | None = None
+
+
+def configure_logging(
+    verbose: bool = False,  # noqa: FBT001, FBT002
+    log_file: Path | None = None,
+    mode: LogMode = LogMode.SYNC,
+    trace_sample: int = 1,
+    enqueue: bool = False,  # noqa: FBT001, FBT002
+) -> None:
+    """
+    Replace loguru's sinks with one for the server.
+
+    Logs go to `log_file`, or to stderr, at DEBUG level when `verbose` and
+    INFO otherwise. `trace_sample` sets which share of connections trace
+    their requests (one in `trace_sample`; 0 traces none). `enqueue` is
+    passed on to a synchronous file sink shared by several processes.
+    """
+    global _trace_every, _batching  # noqa: PLW0603
+    _trace_every = trace_sample if verbose else 0
+
+    logger.remove()
+    level = 'DEBUG' if verbose else 'INFO'
+    if mode == LogMode.ASYNC:
+        if log_file is None:
+            _batching = BatchingSink(sys.stderr)
+        else:
+            _batching = BatchingSink(log_file.open('a', encoding='utf-8'), owned=True)
+        logger.add(_batching, level=level)
+        return
+    _batching = None
+    if log_file is not None:
+        logger.add(str(log_file), level=level, enqueue=enqueue)
+    else:
+        logger.add(sys.stderr, level=level)
+
+
+def traced() -> bool:
+    """Return whether a new connection should trace its requests."""
+    return _trace_every > 0 and next(_connections) % _trace_every == 0
+
+
+def trace(template: str, value: object) -> None:
+    """
+    Log a request or response of a traced connection at DEBUG level.
+
+    In `async` mode the record skips loguru altogether: the template and
+    value are queued as they are and only formatted by the writer thread.
+    """
+    if _batching is None:
+        logger.opt(depth=1).debug(template, value)
+    else:
+        _batching.trace(template, value)
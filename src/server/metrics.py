@@ -0,0 +1,159 @@
+"""
+Low-overhead server instrumentation, reported by the `stats` command.
+
+Recording is a few integer increments. Moves, the bulk of the traffic,
+are counted without even a dict lookup: only the other lines are counted
+by command, and moves are what remains of the request total. The stages
+of one request in `SAMPLE_EVERY` are timed, and the durations go to
+log-linear histograms with four buckets per power of two (within 25% of
+the true value); nothing is formatted until a report is asked for.
+Counters are plain attributes bumped without a lock, so under heavy
+contention between threads an increment can occasionally be lost; reports
+are meant for watching trends, not accounting. With metrics disabled the
+server holds None instead and skips every measurement.
+"""
+
+import time
+from collections import Counter
+from collections.abc import Callable
+
+from src.protocol.scanner import Token, TokenKind
+from src.server.hibernation import HibernationStore
+
+# Request stages timed per line, in the order they happen.
+STAGES = ('parse', 'legality', 'format', 'send')
+QUANTILES = (0.5, 0.9, 0.99)
+SAMPLE_EVERY = 256
+SAMPLE_MASK = SAMPLE_EVERY - 1
+
+_BUCKETS = 256
+
+# Label of each line in `commands_total`: its command, else its kind.
+_KINDS = {kind: kind.name.lower() for kind in TokenKind}
+
+
+def _bucket(ns: int) -> int:
+    bits = ns.bit_length()
+    if bits <= 2:  # noqa: PLR2004
+        return ns
+    return (bits - 2) << 2 | (ns >> (bits - 3)) & 3
+
+
+def _upper_bound(bucket: int) -> int:
+    """Return the largest duration in nanoseconds counted in `bucket`."""
+    if bucket < 4:  # noqa: PLR2004
+        return bucket
+    shift = (bucket >> 2) - 1
+    return ((4 | bucket & 3) + 1 << shift) - 1
+
+
+class Histogram:
+    """Counts of durations in nanoseconds, in log-linear buckets."""
+
+    __slots__ = ('counts', 'total')
+
+    def __init__(self) -> None:
+        """Start with no observations."""
+        self.counts = [0] * _BUCKETS
+        self.total = 0
+
+    def observe(self, ns: int) -> None:
+        """Record one duration."""
+        self.counts[_bucket(ns)] += 1
+        self.total += ns
+
+    def count(self) -> int:
+        """Return how many durations were recorded."""
+        return sum(self.counts)
+
+    def quantile(self, q: float) -> int:
+        """Return an upper bound of the `q` quantile, in nanoseconds."""
+        counts = list(self.counts)
+        rank = q * sum(counts)
+        seen = 0
+        for bucket, count in enumerate(counts):
+            seen += count
+            if count and seen >= rank:
+                return _upper_bound(bucket)
+        return 0
+
+
+class Metrics:
+    """Connection, game, command and latency metrics of one server process."""
+
+    def __init__(
+        self,
+        games: Callable[[], int] = lambda: 0,
+        hibernation: HibernationStore | None = None,
+    ) -> None:
+        """Start counting now; `games` returns the number of live games."""
+        self.games = games
+        self.hibernation = hibernation
+        self.started = time.monotonic()
+        self.active = 0
+        self.connections = 0
+        self.requests = 0
+        self.moves = 0
+        self.commands: Counter[str] = Counter()
+        self.errors: Counter[str] = Counter()
+        self.latency = {stage: Histogram() for stage in STAGES}
+        self._last_report = (self.started, 0)
+
+    def connected(self) -> None:
+        """Count a new connection."""
+        self.active += 1
+        self.connections += 1
+
+    def disconnected(self) -> None:
+        """Count a connection that ended."""
+        self.active -= 1
+
+    def count(self, token: Token) -> None:
+        """Count a line that is not a move by its command or kind."""
+        self.commands[token.command or _KINDS[token.kind]] += 1
+
+    def report(self) -> str:
+        """
+        Return the metrics in the Prometheus text exposition format.
+
+        `moves_per_second` covers the time since the previous report, or
+        since startup for the first one.
+        """
+        now = time.monotonic()
+        moves = self.moves
+        since, moves_before = self._last_report
+        self._last_report = (now, moves)
+        rate = (moves - moves_before) / (now - since) if now > since else 0.0
+        lines = [
+            f'uptime_seconds {now - self.started:.1f}',
+            f'connections_active {self.active}',
+            f'connections_total {self.connections}',
+            f'games_active {self.games()}',
+            f'moves_total {moves}',
+            f'moves_per_second {rate:.1f}',
+        ]
+        if self.hibernation is not None:
+            lines += [
+                f'games_hibernated {len(self.hibernation)}',
+                f'hibernations_total {self.hibernation.hibernations}',
+                f'rehydrations_total {self.hibernation.rehydrations}',
+                f'hibernation_bytes {self.hibernation.size}',
+            ]
+        commands = self.commands.copy()
+        commands['move'] = self.requests - commands.total()
+        lines += (
+            f'commands_total{{command="{command}"}} {count}'
+            for command, count in sorted(commands.items())
+        )
+        lines += (
+            f'errors_total{{error="{error}"}} {count}'
+            for error, count in sorted(self.errors.items())
+        )
+        for stage, histogram in self.latency.items():
+            lines += (
+                f'latency_us{{stage="{stage}",quantile="{q}"}} {histogram.quantile(q) / 1000:.1f}'
+                for q in QUANTILES
+            )
+            lines.append(f'latency_us_count{{stage="{stage}"}} {histogram.count()}')
+            lines.append(f'latency_us_sum{{stage="{stage}"}} {histogram.total / 1000:.0f}')
+        return '\n'.join(lines)
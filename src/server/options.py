@@ -0,0 +1,121 @@
+import socket
+from dataclasses import dataclass, replace
+from pathlib import Path
+from threading import Event
+from typing import Self
+
+from src.protocol import GameBoard
+from src.protocol.positions import POSITION_CACHE_PLY, POSITION_CACHE_SIZE
+from src.server.admission import (
+    CONNECTION_TIMEOUT,
+    DRAIN_TIMEOUT,
+    MAX_CONNECTIONS,
+    READ_TIMEOUT,
+    Connections,
+    Overflow,
+)
+from src.server.aio import serve_asyncio
+from src.server.batching import BATCH_TICK, MoveBatcher
+from src.server.fanout import QUEUE_LIMIT, Fanout, Policy
+from src.server.games import IDLE_TIMEOUT, MAX_GAMES, open_registry
+from src.server.journal import FSYNC_INTERVAL
+from src.server.logs import LogMode
+from src.server.metrics import Metrics
+from src.server.profiling import ProfileMode, Profiler
+from src.server.threaded import serve_threaded
+from src.validation import Engine
+
+
+@dataclass(frozen=True, slots=True)
+class ServerOptions:
+    """Everything a server process needs to serve a bound listener."""
+
+    engine: Engine = Engine.THREADED
+    batch_tick: float = BATCH_TICK
+    verbose: bool = False
+    log_file: Path | None = None
+    log_mode: LogMode = LogMode.SYNC
+    trace_sample: int = 1
+    max_games: int = MAX_GAMES
+    game_timeout: float = IDLE_TIMEOUT
+    fanout_queue: int = QUEUE_LIMIT
+    fanout_policy: Policy = Policy.DROP
+    journal: Path | None = None
+    journal_interval: float = FSYNC_INTERVAL
+    hibernate_after: float = 0.0
+    hibernate_dir: Path | None = None
+    position_cache: int = POSITION_CACHE_SIZE
+    position_cache_ply: int = POSITION_CACHE_PLY
+    metrics: bool = False
+    max_connections: int = MAX_CONNECTIONS
+    overflow: Overflow = Overflow.REJECT
+    idle_timeout: float = CONNECTION_TIMEOUT
+    read_timeout: float = READ_TIMEOUT
+    drain_timeout: float = DRAIN_TIMEOUT
+    profile: ProfileMode = ProfileMode.OFF
+    profile_output: Path | None = None
+
+    def for_worker(self, index: int) -> Self:
+        """
+        Return the options of worker `index`, with its own output files.
+
+        A restarted worker gets the same files and takes over the journal of
+        the one it replaces.
+        """
+        return replace(
+            self,
+            journal=_suffixed(self.journal, index),
+            profile_output=_suffixed(self.profile_output, index),
+        )
+
+
+def serve(listener: socket.socket, options: ServerOptions, stop_event: Event | None) -> None:
+    """Serve the listening socket with `options` until `stop_event` is set."""
+    GameBoard.share_positions(options.position_cache, options.position_cache_ply)
+    fanout = Fanout(options.fanout_queue, options.fanout_policy)
+    with open_registry(
+        options.max_games,
+        options.game_timeout,
+        journal_path=options.journal,
+        fsync_interval=options.journal_interval,
+        hibernate_after=options.hibernate_after,
+        hibernate_dir=options.hibernate_dir,
+    ) as registry:
+        recorder = Metrics(registry.__len__, registry.hibernation) if options.metrics else None
+        connections = Connections(
+            options.max_connections, options.overflow, options.idle_timeout, options.read_timeout
+        )
+        profiler = Profiler(options.profile, options.profile_output)
+        batcher = MoveBatcher(options.batch_tick) if options.engine == Engine.BATCHED else None
+        try:
+            if options.engine == Engine.ASYNCIO:
+                serve_asyncio(
+                    listener,
+                    stop_event,
+                    registry=registry,
+                    fanout=fanout,
+                    metrics=recorder,
+                    connections=connections,
+                    profiler=profiler,
+                    drain_timeout=options.drain_timeout,
+                )
+            else:
+                serve_threaded(
+                    listener,
+                    stop_event,
+                    registry=registry,
+                    fanout=fanout,
+                    metrics=recorder,
+                    connections=connections,
+                    profiler=profiler,
+                    batcher=batcher,
+                    drain_timeout=options.drain_timeout,
+                )
+        finally:
+            profiler.close()
+            if batcher is not None:
+                batcher.close()
+
+
+def _suffixed(path: Path | None, index: int) -> Path | None:
+    return None if path is None else path.with_name(f'{path.name}.{index}')
@@ -0,0 +1,284 @@
+"""
+Server profiler attributing CPU time to protocol commands and request stages.
+
+Two modes can run alone or together, chosen with `--profile` and switched at
+runtime with the `profile` command, which only connections from the server's
+own host may send. In `sampling` mode a thread wakes every `SAMPLE_INTERVAL`
+seconds and records the Python stack of every thread busy with a request,
+rooted at the command it handles. A thread is busy from the moment a line is
+scanned until its replies are written, so connections waiting for input are
+never sampled; all the request path pays is storing the line's token in a
+dict and popping it once the replies are written, which is cheap enough to
+leave on. A sample counts towards the stage of the outermost frame that
+belongs to one (`is_legal` is `legality`, `describe_move` is `format`, and
+so on).
+
+In `deterministic` mode every request is timed instead, stage by stage,
+with the CPU clock of its thread, so the report gives exact CPU time per
+command and stage for a few clock reads per stage. What the stages do not
+cover (locking, lobby and bookkeeping work) is reported as `other`.
+
+`profile dump` returns, and `--profile-output` receives when profiling is
+turned off or the server stops, collapsed stacks: one `frame;frame;...
+count` line per distinct stack, the input of flamegraph tools. They are the
+sampled stacks, or without samples `command;stage` lines weighted in
+microseconds of CPU. Counters are updated without a lock, like the metrics.
+"""
+
+import sys
+from collections import Counter
+from collections.abc import Callable
+from enum import StrEnum
+from functools import cache
+from pathlib import Path
+from threading import Event, Lock, Thread, get_ident
+from time import thread_time_ns
+from types import CodeType
+
+import chess
+from loguru import logger
+
+from src.protocol.core import MoveEvent, move_event
+from src.protocol.scanner import Token, TokenKind
+
+SAMPLE_INTERVAL = 0.01
+
+# Stage of the functions whose frames mark one in a sampled stack. Timed
+# requests have the same stages, `send` excepted from their own CPU time.
+FRAME_STAGES = {
+    'scan': 'parse',
+    'is_legal': 'legality',
+    'move_event': 'format',
+    'describe_move': 'format',
+    'format_move': 'format',
+    'encode_event': 'format',
+    'encode_reply': 'format',
+    'push': 'push',
+    'is_checkmate': 'checkmate',
+    'is_check': 'check',
+    'render_board': 'render',
+    '_display_board': 'render',
+    'send': 'send',
+    '_send': 'send',
+}
+
+# Label of each request: its command, else its kind.
+_KINDS = {kind: kind.name.lower() for kind in TokenKind}
+
+
+class ProfileMode(StrEnum):
+    """What the profiler records."""
+
+    OFF = 'off'
+    SAMPLING = 'sampling'  # stacks of busy threads, sampled by a thread
+    DETERMINISTIC = 'deterministic'  # CPU time of every request's stages
+    BOTH = 'both'
+
+
+@cache
+def _frame_name(code: CodeType) -> str:
+    return f'{Path(code.co_filename).stem}:{code.co_qualname}'
+
+
+@cache
+def _frame_stage(code: CodeType) -> str | None:
+    return FRAME_STAGES.get(code.co_name)
+
+
+def _stage(codes: tuple[CodeType, ...]) -> str:
+    """Return the stage of a stack, given from its outermost frame."""
+    for code in codes:
+        stage = _frame_stage(code)
+        if stage is not None:
+            return stage
+    return 'other'
+
+
+class Profiler:
+    """Sampled stacks and per-stage CPU time of one server process."""
+
+    def __init__(
+        self,
+        mode: ProfileMode = ProfileMode.OFF,
+        output: Path | None = None,
+        interval: float = SAMPLE_INTERVAL,
+    ) -> None:
+        """Start profiling in `mode`, writing collapsed stacks to `output`."""
+        self.output = output
+        self.interval = interval
+        self.mode = ProfileMode.OFF
+        self.sampling = self.deterministic = False
+        self.busy: dict[int, Token] = {}  # thread ident -> token of its request
+        self.requests: Counter[str] = Counter()
+        self.stacks: Counter[tuple[str, tuple[CodeType, ...]]] = Counter()
+        self.cpu: Counter[tuple[str, str]] = Counter()
+        self.totals: Counter[str] = Counter()
+        self._lock = Lock()
+        self._stop = Event()
+        self._thread: Thread | None = None
+        self.switch(mode)
+
+    def enter(self, token: Token) -> str:
+        """Count a timed request and return its label."""
+        label = token.command or _KINDS[token.kind]
+        self.requests[label] += 1
+        return label
+
+    def leave(self) -> None:
+        """Mark this thread as no longer busy with a request."""
+        self.busy.pop(get_ident(), None)
+
+    def record(self, label: str, stage: str, ns: int) -> None:
+        """Add the CPU time of one stage of a request."""
+        self.cpu[label, stage] += ns
+
+    def finish(self, label: str, ns: int) -> None:
+        """Add the CPU time of a whole request, its reply's send excepted."""
+        self.totals[label] += ns
+
+    def control(self, action: str) -> str:
+        """Answer the `profile` command: report, switch mode, dump or reset."""
+        if not action:
+            return self.report()
+        if action == 'dump':
+            return self.collapsed() or 'No profile recorded'
+        if action == 'reset':
+            self.reset()
+            return 'Profile reset'
+        try:
+            mode = ProfileMode(action)
+        except ValueError:
+            return f'Unknown profile action {action}'
+        self.switch(mode)
+        return f'Profiling {mode}'
+
+    def switch(self, mode: ProfileMode) -> None:
+        """Change what is recorded, keeping what was recorded so far."""
+        with self._lock:
+            sampling = mode in {ProfileMode.SAMPLING, ProfileMode.BOTH}
+            if sampling and self._thread is None:
+                self._stop.clear()
+                self._thread = Thread(target=self._run, name='profiler', daemon=True)
+                self._thread.start()
+            elif not sampling and self._thread is not None:
+                self._stop.set()
+                self._thread.join()
+                self._thread = None
+                self.busy.clear()
+            self.mode = mode
+            self.sampling = sampling
+            self.deterministic = mode in {ProfileMode.DETERMINISTIC, ProfileMode.BOTH}
+        if mode != ProfileMode.OFF:
+            logger.info('🔬 Profiling in {} mode', mode)
+        elif self.output is not None and (self.stacks or self.cpu):
+            self.write()
+
+    def reset(self) -> None:
+        """Forget everything recorded so far."""
+        self.requests.clear()
+        self.stacks.clear()
+        self.cpu.clear()
+        self.totals.clear()
+
+    def close(self) -> None:
+        """Stop profiling and write the collapsed stacks out."""
+        self.switch(ProfileMode.OFF)
+
+    def sample(self) -> None:
+        """Record the stack of every thread busy with a request."""
+        frames = sys._current_frames()  # noqa: SLF001
+        for ident, token in list(self.busy.items()):
+            frame = frames.get(ident)
+            codes = []
+            while frame is not None:
+                codes.append(frame.f_code)
+                frame = frame.f_back
+            if codes:
+                label = token.command or _KINDS[token.kind]
+                self.stacks[label, tuple(reversed(codes))] += 1
+
+    def report(self) -> str:
+        """Return samples, timed requests and CPU time by command and stage."""
+        stacks = self.stacks.copy()
+        samples: Counter[tuple[str, str]] = Counter()
+        for (label, codes), count in stacks.items():
+            samples[label, _stage(codes)] += count
+        lines = [f'profile_mode {self.mode}', f'profile_samples_total {stacks.total()}']
+        lines += (
+            f'profile_requests_total{{command="{label}"}} {count}'
+            for label, count in sorted(self.requests.copy().items())
+        )
+        lines += (
+            f'profile_samples{{command="{label}",stage="{stage}"}} {count}'
+            for (label, stage), count in sorted(samples.items())
+        )
+        lines += (
+            f'profile_cpu_us{{command="{label}",stage="{stage}"}} {ns / 1000:.0f}'
+            for (label, stage), ns in sorted(self._cpu().items())
+        )
+        return '\n'.join(lines)
+
+    def collapsed(self) -> str:
+        """Return collapsed stacks: sampled ones, else CPU time by stage."""
+        stacks = self.stacks.copy()
+        if stacks:
+            lines = (
+                f'{label};{";".join(map(_frame_name, codes))} {count}'
+                for (label, codes), count in stacks.items()
+            )
+        else:
+            lines = (
+                f'{label};{stage} {ns // 1000}'
+                for (label, stage), ns in self._cpu().items()
+                if ns >= 1000  # noqa: PLR2004
+            )
+        return '\n'.join(sorted(lines))
+
+    def write(self) -> None:
+        """Write the collapsed stacks to `output`."""
+        self.output.write_text(self.collapsed() + '\n', encoding='utf-8')
+        logger.info('🔬 Profile written to {}', self.output)
+
+    def _cpu(self) -> Counter[tuple[str, str]]:
+        """Return CPU time by command and stage, the remainder as `other`."""
+        cpu = self.cpu.copy()
+        for label, total in self.totals.copy().items():
+            staged = sum(ns for (owner, stage), ns in cpu.items() if owner == label)
+            staged -= cpu[label, 'send']
+            if total > staged:
+                cpu[label, 'other'] = total - staged
+        return +cpu
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+
+def profile_move(
+    board: chess.Board, move: chess.Move, record: Callable[[str, int], None]
+) -> MoveEvent | None:
+    """Play a move like `play_move`, recording the CPU time of each stage."""
+    start = thread_time_ns()
+    legal = board.is_legal(move)
+    checked = thread_time_ns()
+    record('legality', checked - start)
+    if not legal:
+        return None
+
+    event = move_event(board, move)
+    described = thread_time_ns()
+    record('format', described - checked)
+    board.push(move)
+    pushed = thread_time_ns()
+    record('push', pushed - described)
+
+    checkmate = board.is_checkmate()
+    mated = thread_time_ns()
+    record('checkmate', mated - pushed)
+    if checkmate:
+        return event._replace(check=True, checkmate=True)
+    check = board.is_check()
+    record('check', thread_time_ns() - mated)
+    if check:
+        return event._replace(check=True)
+    return event
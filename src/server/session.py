@@ -0,0 +1,516 @@
+from collections.abc import Callable
+from functools import partial
+from threading import get_ident
+from time import perf_counter_ns, thread_time_ns
+
+import chess
+from loguru import logger
+
+from src.protocol import (
+    GameOver,
+    MoveEvent,
+    answer_move,
+    describe_move,
+    play_move,
+    process_line,
+)
+from src.protocol.binary import (
+    FrameDecoder,
+    FrameError,
+    Opcode,
+    decode_move,
+    encode_event,
+    encode_frame,
+)
+from src.protocol.replay import REJECTIONS
+from src.protocol.scanner import Token, TokenKind, scan
+from src.server.batching import MoveBatcher
+from src.server.fanout import Broadcast, Subscriber
+from src.server.games import Game, GameRegistry, RegistryFull, Seat
+from src.server.logs import trace, traced
+from src.server.metrics import SAMPLE_MASK, Metrics
+from src.server.profiling import Profiler, profile_move
+from src.validation import Command
+
+READ_SIZE = 64 * 1024
+MAX_LINE = 64 * 1024
+
+INVALID_FRAME = encode_frame(Opcode.INVALID)
+
+MOVE_TOKEN = Token(TokenKind.MOVE)
+LOBBY_COMMANDS = frozenset(
+    {Command.START_GAME, Command.JOIN_GAME, Command.END_GAME, Command.RESUME}
+)
+
+
+class Session:
+    """Per-connection protocol state shared by every server engine."""
+
+    def __init__(
+        self,
+        registry: GameRegistry | None = None,
+        metrics: Metrics | None = None,
+        profiler: Profiler | None = None,
+        *,
+        admin: bool = False,
+        batcher: MoveBatcher | None = None,
+    ) -> None:
+        """
+        Start a new solo game for the connection.
+
+        Only `admin` connections, those from this host, may run `profile`.
+        With a `batcher`, moves are played in its batches, except those of
+        requests the profiler times.
+
+        Raises:
+            RegistryFull: If the registry cannot hold another game.
+        """
+        self.registry = registry if registry is not None else GameRegistry()
+        self.metrics = metrics
+        self.timed = False  # whether the last request's stages were timed
+        self.profiler = profiler
+        self.admin = admin
+        self.batcher = batcher
+        self.profiling = False  # whether the profiler counts this thread busy
+        self.profiled = False  # whether the last request's CPU time was recorded
+        self.label = ''  # the last request's label for the profiler
+        self._started = 0  # thread CPU time when the last request was scanned
+        self._handled = 0  # thread CPU time when the last request was answered
+        self.trace = traced()  # whether requests and responses are logged
+        self.game = self.registry.create()
+        self.seat = Seat.SOLO
+        with self.game.lock:
+            self.game.seat(self, Seat.SOLO)
+        self.subscriber: Subscriber | None = None
+        self._pending = b''
+        self._frames: FrameDecoder | None = None
+
+    @property
+    def board(self) -> chess.Board:
+        """Return a board in the position of the connection's game."""
+        return self.game.board()
+
+    @property
+    def binary(self) -> bool:
+        """Return whether the connection switched to binary framing."""
+        return self._frames is not None
+
+    @property
+    def partial(self) -> bool:
+        """Return whether an incomplete line or frame is buffered."""
+        if self._frames is not None:
+            return self._frames.pending > 0
+        return bool(self._pending)
+
+    def feed(self, data: bytes) -> tuple[bytes, bool]:
+        """
+        Process every complete line received so far and batch the replies.
+
+        Lines are handled in order and their replies concatenated so that the
+        caller can send them with a single write. Processing stops at the
+        first line that ends the game; anything after it is discarded. An
+        empty `data` signals end of stream and flushes an unterminated line.
+        After a `binary` line the rest of the stream is read as frames.
+
+        Returns:
+            The encoded replies and whether the game is over.
+
+        Raises:
+            ValueError: If a line or frame grows beyond `MAX_LINE` bytes.
+        """
+        buffer = self._pending + data
+        replies: list[bytes] = []
+        start = 0
+        while self._frames is None:
+            end = buffer.find(b'\n', start)
+            if end < 0:
+                if data or start >= len(buffer):
+                    break
+                end = len(buffer)
+            line = buffer[start:end].decode('utf-8', 'replace').strip()
+            start = end + 1
+
+            if scan(line).command == Command.BINARY:
+                logger.debug('🔢 Switching to binary framing')
+                self._frames = FrameDecoder()
+                replies.append(encode_reply('OK'))
+                continue
+
+            response, game_over = self.handle(line)
+            replies.append(encode_reply(response))
+            if game_over:
+                self._pending = b''
+                return b''.join(replies), True
+
+        rest = buffer[start:]
+        if self._frames is not None:
+            self._pending = b''
+            game_over = self._feed_frames(rest, replies)
+            return b''.join(replies), game_over
+
+        if len(rest) > MAX_LINE:
+            msg = f'line exceeds {MAX_LINE} bytes'
+            raise ValueError(msg)
+        self._pending = rest
+        return b''.join(replies), False
+
+    def handle(self, line: str) -> tuple[str, bool]:
+        """Return the response for one line and whether the game is over."""
+        if self.trace:
+            trace('<< {}', line)
+        token = self._scan(line)
+        if token.command in LOBBY_COMMANDS:
+            response, game_over = self._lobby(token), False
+        elif token.command == Command.STATS:
+            response, game_over = self._stats(), False
+        elif token.command == Command.PROFILE:
+            response, game_over = self._profile(token.argument), False
+        else:
+            response, game_over = self._play(token, line)
+        if self.metrics is not None and response in REJECTIONS:
+            self.metrics.errors[response] += 1
+        if self.profiled:
+            self._finish()
+        if self.trace:
+            trace('>> {}', response)
+        return response, game_over
+
+    def deliver(self, message: Broadcast) -> None:
+        """Queue a broadcast from the game for this connection."""
+        if self.subscriber is not None:
+            self.subscriber.offer(message.wire(self.binary))
+
+    def done(self) -> None:
+        """Tell the profiler that the replies so far have been written."""
+        if self.profiled:
+            self.profiler.record(self.label, 'send', thread_time_ns() - self._handled)
+        self.profiler.leave()
+        self.profiling = False
+
+    def close(self, *, clean: bool = False) -> None:
+        """
+        Detach from the current game when the connection ends.
+
+        A `clean` close, the client ending the stream itself, removes a solo
+        game even if a resume token was issued for it: the player left, so
+        nobody comes back to resume it.
+        """
+        if self.profiling:
+            self.profiler.leave()
+        self._leave(clean=clean)
+        if self.subscriber is not None:
+            self.subscriber.close()
+
+    def _play(self, token: Token, line: str) -> tuple[str, bool]:
+        game = self.game
+        with game.lock:
+            refusal = self._refusal(game, token)
+            if refusal is not None:
+                return refusal, False
+            game.touch()
+            board = game.play()
+            played = len(board.move_stack)
+            try:
+                response, game_over = self._respond(board, token, line), False
+            except GameOver as e:
+                response, game_over = str(e), True
+            moved = len(board.move_stack) > played
+            if moved and self.seat != Seat.SOLO:
+                game.broadcast(Broadcast(response), self)
+                self.registry.moved(game)
+        if moved and self.metrics is not None:
+            self.metrics.moves += 1
+        if game_over:
+            self.registry.remove(game)
+            logger.info('🏁 Game over, closing connection')
+        return response, game_over
+
+    def _respond(self, board: chess.Board, token: Token, line: str) -> str:
+        """Return `process_line`'s response, timing or profiling its stages."""
+        if token.kind == TokenKind.MOVE:
+            return answer_move(
+                self._play_move(board, token.move), partial(self._format, describe_move)
+            )
+        if not self.profiled or token.command != Command.DISPLAY_BOARD:
+            return process_line(board, line)
+        start = thread_time_ns()
+        response = process_line(board, line)
+        self.profiler.record(self.label, 'render', thread_time_ns() - start)
+        return response
+
+    def _counted(self, event: MoveEvent | None) -> MoveEvent | None:
+        """Count a framed move as played or invalid, and return its event."""
+        if self.metrics is not None:
+            if event is None:
+                self.metrics.errors['Invalid move'] += 1
+            else:
+                self.metrics.moves += 1
+        return event
+
+    def _play_move(self, board: chess.Board, move: chess.Move) -> MoveEvent | None:
+        """
+        Push a move if legal and return its event, else None, like `play_move`.
+
+        The move is played by the batcher if there is one. A profiled request
+        records the CPU time of each stage, and a sampled one is timed.
+        """
+        if self.profiled:
+            return profile_move(board, move, partial(self.profiler.record, self.label))
+        if self.batcher is not None:
+            return self.batcher.play(board, move)
+        if not self.timed:
+            return play_move(board, move)
+        start = perf_counter_ns()
+        event = play_move(board, move)
+        self.metrics.latency['legality'].observe(perf_counter_ns() - start)
+        return event
+
+    def _format[T](self, render: Callable[[MoveEvent], T], event: MoveEvent) -> T:
+        """Return `render(event)`, profiled or timed as the format stage."""
+        if self.profiled:
+            start = thread_time_ns()
+            reply = render(event)
+            self.profiler.record(self.label, 'format', thread_time_ns() - start)
+            return reply
+        if not self.timed:
+            return render(event)
+        start = perf_counter_ns()
+        reply = render(event)
+        self.metrics.latency['format'].observe(perf_counter_ns() - start)
+        return reply
+
+    def _scan(self, line: str) -> Token:
+        """Scan a line, counting and timing it for the metrics and profiler."""
+        start = self._start()
+        metrics = self.metrics
+        if metrics is not None and self._sample(metrics):
+            parsing = perf_counter_ns()
+            token = scan(line)
+            metrics.latency['parse'].observe(perf_counter_ns() - parsing)
+        else:
+            token = scan(line)
+        if metrics is not None and token.move is None:
+            metrics.count(token)
+        self._begin(token, start)
+        return token
+
+    def _start(self) -> int:
+        """Decide whether a request is profiled, and return its CPU start."""
+        profiler = self.profiler
+        self.profiled = profiler is not None and profiler.deterministic
+        return thread_time_ns() if self.profiled else 0
+
+    def _begin(self, token: Token, start: int) -> None:
+        """Mark this thread busy with a request for the profiler."""
+        profiler = self.profiler
+        if profiler is not None and profiler.sampling:
+            profiler.busy[get_ident()] = token
+            self.profiling = True
+        if self.profiled:
+            self._enter(token, start)
+
+    def _enter(self, token: Token, start: int) -> None:
+        """Label a profiled request and record the CPU time of its parsing."""
+        self.label = self.profiler.enter(token)
+        self.profiling = True
+        # Sampled metrics would time the profiler's clock reads too.
+        self.timed = False
+        self._started = start
+        self.profiler.record(self.label, 'parse', thread_time_ns() - start)
+
+    def _finish(self) -> None:
+        self._handled = thread_time_ns()
+        self.profiler.finish(self.label, self._handled - self._started)
+
+    def _sample(self, metrics: Metrics) -> bool:
+        """Count a request and decide whether its stages are timed."""
+        metrics.requests += 1
+        self.timed = not metrics.requests & SAMPLE_MASK
+        return self.timed
+
+    def _stats(self) -> str:
+        if self.metrics is None:
+            return 'Metrics are disabled'
+        return self.metrics.report()
+
+    def _profile(self, action: str) -> str:
+        if not self.admin:
+            return 'Profiling is restricted to local connections'
+        if self.profiler is None:
+            return 'Profiling is disabled'
+        return self.profiler.control(action)
+
+    def _refusal(self, game: Game, token: Token) -> str | None:
+        """Return why this connection may not act on the game, if it may not."""
+        if game.ended:
+            return f'Game {game.game_id} ended'
+        if self.seat != Seat.SPECTATOR and game.holder(self.seat) is not self:
+            return f'Game {game.game_id} was resumed elsewhere'
+        if token.kind != TokenKind.MOVE or self.seat == Seat.SOLO:
+            return None
+        if self.seat == Seat.SPECTATOR:
+            return 'Spectators cannot move'
+        if (self.seat == Seat.WHITE) != (game.turn == chess.WHITE):
+            return 'Not your turn'
+        return None
+
+    def _lobby(self, token: Token) -> str:
+        try:
+            if token.command == Command.START_GAME:
+                return self._start_game()
+            if token.command == Command.JOIN_GAME:
+                return self._join_game(token.argument)
+            if token.command == Command.RESUME:
+                return self._resume(token.argument)
+            return self._end_game()
+        except RegistryFull:
+            logger.warning('🚫 Game registry is full')
+            return 'Server is full'
+
+    def _start_game(self) -> str:
+        game = self.registry.create(shared=True)
+        with game.lock:
+            game.seat(self, Seat.WHITE)
+        self._switch(game, Seat.WHITE)
+        token = self.registry.issue_token(game, Seat.WHITE)
+        return f'Game {game.game_id} started, you play white\nResume token {token}'
+
+    def _join_game(self, game_id: str) -> str:
+        if not game_id:
+            return 'scan error'
+        game = self.registry.get(game_id)
+        if game is None or game.ended:
+            return f'Unknown game {game_id}'
+        if game is self.game:
+            return f'Already in game {game_id}'
+        with game.lock:
+            if game.black is None:
+                seat = Seat.BLACK
+            elif game.white is None:
+                seat = Seat.WHITE
+            else:
+                seat = Seat.SPECTATOR
+            game.seat(self, seat)
+        self._switch(game, seat)
+        if seat == Seat.SPECTATOR:
+            return f'Watching game {game_id}'
+        token = self.registry.issue_token(game, seat)
+        return f'Joined game {game_id} as {seat}\nResume token {token}'
+
+    def _resume(self, token: str) -> str:
+        """
+        Take over the seat of a resume token, or issue one for this seat.
+
+        The seat's previous holder, typically a connection that dropped
+        without the server noticing yet, is unseated and refused from then
+        on. Nothing is replayed: the game carries on from its position.
+        """
+        if not token:
+            if self.seat == Seat.SPECTATOR:
+                return 'Spectators cannot resume'
+            return f'Resume token {self.registry.issue_token(self.game, self.seat)}'
+        entry = self.registry.resumable(token)
+        if entry is None:
+            return 'Unknown resume token'
+        game, seat = entry
+        if game is self.game:
+            return f'Already in game {game.game_id}'
+        with game.lock:
+            if game.ended:
+                return 'Unknown resume token'
+            previous = game.holder(seat)
+            if previous is not None:
+                game.leave(previous)
+            game.seat(self, seat)
+        self._switch(game, seat)
+        logger.debug('🔁 Resumed game {} as {}', game.game_id, seat)
+        return f'Resumed game {game.game_id} as {seat}'
+
+    def _end_game(self) -> str:
+        game = self.game
+        replacement = self.registry.create()
+        with replacement.lock:
+            replacement.seat(self, Seat.SOLO)
+        if self.seat == Seat.SPECTATOR:
+            response = f'Left game {game.game_id}'
+        else:
+            self.registry.remove(game)
+            response = f'Game {game.game_id} ended'
+        self._switch(replacement, Seat.SOLO)
+        return response
+
+    def _switch(self, game: Game, seat: Seat) -> None:
+        self._leave()
+        self.game, self.seat = game, seat
+
+    def _leave(self, *, clean: bool = False) -> None:
+        game = self.game
+        with game.lock:
+            game.leave(self)
+        # Nobody else can reach a solo game, so it goes with its connection,
+        # unless a resume token was issued for it and the connection dropped.
+        if self.seat == Seat.SOLO and (clean or not game.tokens):
+            self.registry.remove(game)
+
+    def _feed_frames(self, data: bytes, replies: list[bytes]) -> bool:
+        for opcode, payload in self._frames.feed(data):
+            if opcode == Opcode.MOVE:
+                reply, game_over = self._play_frame(decode_move(payload))
+                replies.append(reply)
+                if game_over:
+                    return True
+            elif opcode == Opcode.LINE:
+                response, game_over = self.handle(payload.decode('utf-8', 'replace').strip())
+                replies.append(encode_frame(Opcode.TEXT, response.encode()))
+                if game_over:
+                    return True
+            else:
+                msg = f'unexpected opcode {opcode.name} from client'
+                raise FrameError(msg)
+
+        if self._frames.pending > MAX_LINE:
+            msg = f'frame exceeds {MAX_LINE} bytes'
+            raise ValueError(msg)
+        return False
+
+    def _play_frame(self, move: chess.Move) -> tuple[bytes, bool]:
+        if self.trace:
+            trace('<< {}', move)
+        start = self._start()
+        if self.metrics is not None:
+            self._sample(self.metrics)
+        self._begin(MOVE_TOKEN, start)
+        game = self.game
+        with game.lock:
+            refusal = self._refusal(game, MOVE_TOKEN)
+            if refusal is None:
+                game.touch()
+                event = self._counted(self._play_move(game.play(), move))
+                if event is not None and self.seat != Seat.SOLO:
+                    game.broadcast(Broadcast(describe_move(event)), self)
+                    self.registry.moved(game)
+        if refusal is not None:
+            reply, game_over = encode_frame(Opcode.TEXT, refusal.encode()), False
+        elif event is None:
+            reply, game_over = INVALID_FRAME, False
+        else:
+            if event.checkmate:
+                self.registry.remove(game)
+                logger.info('🏁 Game over, closing connection')
+            reply, game_over = self._format(_event_frame, event), event.checkmate
+        if self.profiled:
+            self._finish()
+        return reply, game_over
+
+
+def _event_frame(event: MoveEvent) -> bytes:
+    return encode_frame(Opcode.EVENT, encode_event(event))
+
+
+def encode_reply(text: str) -> bytes:
+    """Return the wire form of a response: text followed by a blank line."""
+    return f'{text}\n\n'.encode()
+
+
+FULL_REPLY = encode_reply('Server is full')
+BUSY_REPLY = encode_reply('Server is busy, try again later')
@@ -0,0 +1,200 @@
+import socket
+from contextlib import suppress
+from functools import partial
+from threading import Event, Lock, Thread
+from time import perf_counter_ns
+
+from loguru import logger
+
+from src.server.admission import DRAIN_TIMEOUT, Connections, HandlerPool, Overflow
+from src.server.batching import MoveBatcher
+from src.server.fanout import Fanout, Subscriber
+from src.server.games import GameRegistry, RegistryFull
+from src.server.listener import ACCEPT_TIMEOUT, is_loopback
+from src.server.metrics import Metrics
+from src.server.profiling import Profiler
+from src.server.session import BUSY_REPLY, FULL_REPLY, READ_SIZE, Session
+
+
+def serve_threaded(
+    listener: socket.socket,
+    stop_event: Event | None = None,
+    *,
+    registry: GameRegistry | None = None,
+    fanout: Fanout | None = None,
+    metrics: Metrics | None = None,
+    connections: Connections | None = None,
+    profiler: Profiler | None = None,
+    batcher: MoveBatcher | None = None,
+    drain_timeout: float = DRAIN_TIMEOUT,
+) -> None:
+    """
+    Accept connections and serve each one on a thread of a bounded pool.
+
+    With the `queue` overflow policy nothing is accepted while every slot
+    is taken, so new connections wait in the listen backlog; with `reject`
+    they are accepted, told the server is busy and closed. With a
+    `batcher`, the moves of all connections are played in its batches.
+    Once stopped, open connections get `drain_timeout` seconds to finish.
+    """
+    registry = registry if registry is not None else GameRegistry()
+    fanout = fanout if fanout is not None else Fanout()
+    connections = connections if connections is not None else Connections()
+    pool = HandlerPool(connections.limit)
+    queue = connections.overflow == Overflow.QUEUE
+    reserved = False
+    handle = partial(
+        _handle_client,
+        registry=registry,
+        fanout=fanout,
+        metrics=metrics,
+        connections=connections,
+        profiler=profiler,
+        batcher=batcher,
+    )
+    try:
+        while stop_event is None or not stop_event.is_set():
+            registry.maybe_evict()
+            connections.maybe_reap()
+            if queue and not reserved:
+                reserved = pool.acquire(timeout=ACCEPT_TIMEOUT)
+                if not reserved:
+                    continue
+            try:
+                sock, addr = listener.accept()
+            except TimeoutError:
+                continue
+
+            if not reserved and not pool.acquire(timeout=0):
+                _refuse(sock, addr, metrics)
+                continue
+            reserved = False
+            pool.run(handle, sock, addr)
+    finally:
+        pool.join(timeout=drain_timeout)
+
+
+def _refuse(sock: socket.socket, addr: tuple[str, int], metrics: Metrics | None) -> None:
+    logger.debug('🚧 All connection slots taken, refusing {}', addr)
+    if metrics is not None:
+        metrics.errors['Server is busy'] += 1
+    with sock, suppress(OSError):
+        sock.sendall(BUSY_REPLY)
+
+
+def _shutdown(sock: socket.socket) -> None:
+    """Wake a thread blocked on `sock` by ending the stream both ways."""
+    with suppress(OSError):
+        sock.shutdown(socket.SHUT_RDWR)
+
+
+def _handle_client(
+    sock: socket.socket,
+    addr: tuple[str, int],
+    *,
+    registry: GameRegistry,
+    fanout: Fanout,
+    metrics: Metrics | None,
+    connections: Connections,
+    profiler: Profiler | None,
+    batcher: MoveBatcher | None,
+) -> None:
+    with sock:
+        logger.info('🌐 Client connected: {}', addr)
+        try:
+            session = Session(registry, metrics, profiler, admin=is_loopback(addr), batcher=batcher)
+        except RegistryFull:
+            logger.warning('🚫 Game registry is full, refusing {}', addr)
+            with suppress(OSError):
+                sock.sendall(FULL_REPLY)
+            return
+
+        if metrics is not None:
+            metrics.connected()
+        writer = _Writer(sock)
+        session.subscriber = writer.subscriber = fanout.subscribe(writer.wake)
+        connection = connections.open(partial(_shutdown, sock))
+        clean = False
+        try:
+            while True:
+                data = sock.recv(READ_SIZE)
+                replies, game_over = session.feed(data)
+                connection.touch(session.partial)
+                if replies and not session.timed:
+                    writer.send(replies)
+                elif replies:
+                    start = perf_counter_ns()
+                    writer.send(replies)
+                    metrics.latency['send'].observe(perf_counter_ns() - start)
+                if session.profiling:
+                    session.done()
+                if game_over or not data:
+                    # The client ending the stream itself has left for good.
+                    clean = not connection.reaped
+                    break
+        except (OSError, ValueError) as exc:
+            logger.debug('⚠️ Connection error from {}: {}', addr, exc)
+        finally:
+            connections.closed(connection)
+            session.close(clean=clean)
+            writer.stop()
+            if metrics is not None:
+                metrics.disconnected()
+
+        logger.info('👋 Client disconnected')
+
+
+class _Writer:
+    """
+    Serialize writes to a socket and push broadcasts from a helper thread.
+
+    Replies are sent by the connection's own thread; broadcasts queued on
+    the subscriber are sent by a thread started the first time one arrives,
+    so a slow reader blocks neither the mover nor its own replies' sender
+    for longer than one write.
+    """
+
+    def __init__(self, sock: socket.socket) -> None:
+        """Wrap a connected socket."""
+        self.sock = sock
+        self.subscriber: Subscriber | None = None
+        self._send_lock = Lock()
+        self._start_lock = Lock()
+        self._ready = Event()
+        self._thread: Thread | None = None
+        self._stopped = False
+
+    def send(self, data: bytes) -> None:
+        """Send a complete message without interleaving it with others."""
+        with self._send_lock:
+            self.sock.sendall(data)
+
+    def wake(self) -> None:
+        """Signal that broadcasts are queued; never blocks."""
+        self._ready.set()
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None and not self._stopped:
+                    self._thread = Thread(target=self._push, daemon=True)
+                    self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the push thread once the connection is done."""
+        self._stopped = True
+        self._ready.set()
+
+    def _push(self) -> None:
+        while True:
+            self._ready.wait()
+            self._ready.clear()
+            if self._stopped:
+                return
+            if self.subscriber.closed:
+                logger.info('🐢 Subscriber fell too far behind, disconnecting')
+                _shutdown(self.sock)
+                return
+            try:
+                for payload in self.subscriber.drain():
+                    self.send(payload)
+            except OSError:
+                return
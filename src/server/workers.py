@@ -0,0 +1,93 @@
+import multiprocessing as mp
+import signal
+from multiprocessing.process import BaseProcess
+from multiprocessing.synchronize import Event as ProcessEvent
+from threading import Event
+
+from loguru import logger
+
+from src.server.listener import Address, bind_listener
+from src.server.logs import configure_logging
+from src.server.options import ServerOptions, serve
+
+SUPERVISE_INTERVAL = 0.2
+# Seconds past the drain timeout a worker gets to close its games and exit.
+DRAIN_MARGIN = 1.0
+
+# Workers are spawned rather than forked so that they never inherit the
+# supervisor's threads or locks mid-operation.
+_context = mp.get_context('spawn')
+
+
+def serve_workers(
+    family: int,
+    bind_addr: Address,
+    workers: int,
+    options: ServerOptions,
+    stop_event: Event | None = None,
+) -> None:
+    """
+    Supervise `workers` processes that share the port with SO_REUSEPORT.
+
+    The kernel spreads incoming connections across the workers, and every
+    game lives in the worker that accepted its connection, so `join_game`
+    only finds games registered by the same worker. Each worker keeps its
+    own journal, `journal` suffixed with its index, and its own metrics,
+    so `stats` reports the worker serving the connection, its own profiler,
+    writing to `profile_output` suffixed with its index, and its own
+    `max_connections` slots. Crashed workers are restarted; on shutdown
+    the workers stop accepting and get `drain_timeout` seconds to finish
+    their connections, and are terminated `DRAIN_MARGIN` seconds later.
+    """
+    drain = _context.Event()
+
+    def start(index: int) -> BaseProcess:
+        proc = _context.Process(
+            target=_worker_main,
+            args=(index, family, bind_addr, options.for_worker(index), drain),
+            name=f'chess-worker-{index}',
+            daemon=True,
+        )
+        proc.start()
+        logger.info('🚀 Worker {} started (pid {})', index, proc.pid)
+        return proc
+
+    stop_event = stop_event or Event()
+    procs = [start(index) for index in range(workers)]
+    try:
+        while not stop_event.wait(SUPERVISE_INTERVAL):
+            for index, proc in enumerate(procs):
+                if not proc.is_alive():
+                    logger.warning(
+                        '💥 Worker {} exited with code {}, restarting', index, proc.exitcode
+                    )
+                    procs[index] = start(index)
+    finally:
+        logger.info('🚰 Draining {} workers', workers)
+        drain.set()
+        for proc in procs:
+            proc.join(timeout=options.drain_timeout + DRAIN_MARGIN)
+            if proc.is_alive():
+                logger.warning('⏱️ Worker {} did not drain in time, terminating', proc.name)
+                proc.terminate()
+                proc.join()
+
+
+def _worker_main(
+    index: int,
+    family: int,
+    bind_addr: Address,
+    options: ServerOptions,
+    drain: ProcessEvent,
+) -> None:
+    # The supervisor owns Ctrl-C and turns it into a graceful drain.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    configure_logging(
+        options.verbose, options.log_file, options.log_mode, options.trace_sample, enqueue=True
+    )
+    logger.debug('🧵 Worker {} binding {}', index, bind_addr)
+
+    with bind_listener(family, bind_addr, reuse_port=True) as listener:
+        listener.listen()
+        serve(listener, options, drain)
@@ -1,10 +1,7 @@
-import ipaddress
 import re
 from enum import StrEnum
 from pathlib import Path
 
-import typer
-
 STRIKE = re.compile(r'[a-h][1-8]-[a-h][1-8]', re.IGNORECASE)
 COMMENT = re.compile(r'//.*')
 
@@ -13,15 +10,39 @@ class Command(StrEnum):
     """Supported protocol commands."""
 
     DISPLAY_BOARD = 'display_board'
+    BINARY = 'binary'
+    START_GAME = 'start_game'
+    JOIN_GAME = 'join_game'
+    END_GAME = 'end_game'
+    RESUME = 'resume'
+    STATS = 'stats'
+    PROFILE = 'profile'
+
+
+class Engine(StrEnum):
+    """Server connection engines."""
+
+    THREADED = 'threaded'
+    ASYNCIO = 'asyncio'
+    BATCHED = 'batched'
+
+
+class ClientEngine(StrEnum):
+    """Client connection engines."""
+
+    THREADED = 'threaded'
+    ASYNCIO = 'asyncio'
 
 
 def validate_interface(value: str) -> str:
     """Ensure the provided interface value is a valid IP address."""
+    import ipaddress  # noqa: PLC0415
+
     try:
         ipaddress.ip_address(value)
     except ValueError as exc:
         msg = 'Interface must be a valid IPv4 or IPv6 address.'
-        raise typer.BadParameter(msg) from exc
+        raise _bad_parameter(msg) from exc
     return value
 
 
@@ -29,7 +50,51 @@ def validate_port(value: int) -> int:
     """Ensure the port is within the TCP user range."""
     if not (1 <= value <= 65535):  # noqa: PLR2004
         msg = 'Port must be between 1 and 65535.'
-        raise typer.BadParameter(msg)
+        raise _bad_parameter(msg)
+    return value
+
+
+def validate_workers(value: int) -> int:
+    """Ensure at least one worker process is requested."""
+    if value < 1:
+        msg = 'Workers must be at least 1.'
+        raise _bad_parameter(msg)
+    return value
+
+
+def validate_window(value: int) -> int:
+    """Ensure at least one move may be in flight."""
+    if value < 1:
+        msg = 'Window must be at least 1.'
+        raise _bad_parameter(msg)
+    return value
+
+
+def validate_positive[T: (int, float)](value: T) -> T:
+    """Ensure a limit or timeout is strictly positive."""
+    if value <= 0:
+        msg = 'Value must be greater than 0.'
+        raise _bad_parameter(msg)
+    return value
+
+
+def validate_engine(value: Engine) -> Engine:
+    """Ensure NumPy is installed when the batched engine is requested."""
+    from importlib.util import find_spec  # noqa: PLC0415
+
+    if value == Engine.BATCHED and find_spec('numpy') is None:
+        msg = 'The batched engine needs NumPy: install the batch extra.'
+        raise _bad_parameter(msg)
+    return value
+
+
+def validate_batch(value: bool) -> bool:  # noqa: FBT001
+    """Ensure NumPy is installed when batched replay is requested."""
+    from importlib.util import find_spec  # noqa: PLC0415
+
+    if value and find_spec('numpy') is None:
+        msg = 'Batched replay needs NumPy: install the batch extra.'
+        raise _bad_parameter(msg)
     return value
 
 
@@ -40,7 +105,7 @@ def validate_filename(value: Path | None) -> Path | None:
     value = value.expanduser().resolve()
     if not value.is_file():
         msg = 'Filename must point to an existing file.'
-        raise typer.BadParameter(msg)
+        raise _bad_parameter(msg)
     return value
 
 
@@ -50,3 +115,15 @@ def parse_command(value: str) -> Command | None:
         return Command(value)
     except ValueError:
         return None
+
+
+def _bad_parameter(msg: str) -> Exception:
+    """
+    Return typer's error for a refused option value.
+
+    Typer is imported only once a value is refused, so that modules using
+    `Command` or the patterns above do not load the command line toolkit.
+    """
+    from typer import BadParameter  # noqa: PLC0415
+
+    return BadParameter(msg)
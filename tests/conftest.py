@@ -8,6 +8,8 @@ import pytest
 from chess import Board
 
 from src.cli import chess_server
+from src.server.options import ServerOptions
+from src.validation import Engine
 
 
 @pytest.fixture
@@ -40,9 +42,11 @@ def invalid_comment() -> str:
     return 'This is not a comment'
 
 
-@pytest.fixture
-def server():
+@pytest.fixture(params=list(Engine), ids=str)
+def server(request):
     """Start the server on a random port and ensure it shuts down cleanly."""
+    if request.param == Engine.BATCHED:
+        pytest.importorskip('numpy')
     port_queue: Queue[int] = Queue()
     errors: Queue[BaseException] = Queue()
     stop_event = threading.Event()
@@ -54,6 +58,7 @@ def server():
                 port=0,
                 port_queue=port_queue,
                 stop_event=stop_event,
+                options=ServerOptions(engine=request.param),
             )
         except BaseException as exc:  # noqa: BLE001
             errors.put(exc)
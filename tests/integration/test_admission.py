@@ -0,0 +1,97 @@
+# ruff: noqa: PLR2004
+import threading
+import time
+from collections.abc import Callable, Iterator
+from queue import Queue
+
+import pytest
+
+from src.cli import chess_server
+from src.client.codec import read_message
+from src.server import admission
+from src.server.admission import Overflow
+from src.server.options import ServerOptions
+from src.validation import Engine
+
+type Start = Callable[..., int]
+
+
+@pytest.fixture(params=list(Engine), ids=str)
+def start_server(request, monkeypatch) -> Iterator[Start]:
+    """Start a server with the given options and stop it afterwards."""
+    if request.param == Engine.BATCHED:
+        pytest.importorskip('numpy')
+    monkeypatch.setattr(admission, 'REAP_INTERVAL', 0.05)
+    stop_event = threading.Event()
+    threads: list[threading.Thread] = []
+
+    def start(**options: object) -> int:
+        port_queue: Queue[int] = Queue()
+        thread = threading.Thread(
+            target=chess_server.run_server,
+            kwargs={
+                'interface': '127.0.0.1',
+                'port': 0,
+                'port_queue': port_queue,
+                'stop_event': stop_event,
+                'options': ServerOptions(engine=request.param, **options),
+            },
+            daemon=True,
+        )
+        thread.start()
+        threads.append(thread)
+        return port_queue.get(timeout=2)
+
+    yield start
+    stop_event.set()
+    for thread in threads:
+        thread.join(timeout=3)
+        assert not thread.is_alive(), 'Server thread did not exit cleanly.'
+
+
+def test_connections_beyond_the_limit_are_rejected(start_server: Start, connect) -> None:
+    """A client past `max_connections` is told the server is busy."""
+    port = start_server(max_connections=1)
+    with connect(port) as first, first.makefile('r', encoding='utf-8') as first_fh:
+        first.sendall(b'e2-e4\n')
+        assert read_message(first_fh) == '1. White pawn moves from e2 to e4'
+        with connect(port) as second, second.makefile('r', encoding='utf-8') as second_fh:
+            assert read_message(second_fh) == 'Server is busy, try again later'
+
+    # The slot is free again once the first client leaves.
+    deadline = time.monotonic() + 2.0
+    while True:
+        with connect(port) as third, third.makefile('r', encoding='utf-8') as third_fh:
+            third.sendall(b'e2-e4\n')
+            reply = read_message(third_fh)
+        if reply != 'Server is busy, try again later' or time.monotonic() > deadline:
+            break
+        time.sleep(0.05)
+    assert reply == '1. White pawn moves from e2 to e4'
+
+
+def test_connections_beyond_the_limit_are_queued(start_server: Start, connect) -> None:
+    """A queued client is served as soon as a slot frees up."""
+    port = start_server(max_connections=1, overflow=Overflow.QUEUE)
+    with connect(port) as first, first.makefile('r', encoding='utf-8') as first_fh:
+        first.sendall(b'e2-e4\n')
+        assert read_message(first_fh) == '1. White pawn moves from e2 to e4'
+        second = connect(port)
+        second.settimeout(3.0)
+        second.sendall(b'e2-e4\n')
+    with second, second.makefile('r', encoding='utf-8') as second_fh:
+        assert read_message(second_fh) == '1. White pawn moves from e2 to e4'
+
+
+def test_idle_and_stalled_clients_are_disconnected(start_server: Start, connect) -> None:
+    """Clients silent or stuck mid-line past their timeout are closed."""
+    port = start_server(idle_timeout=1.0, read_timeout=0.2)
+    with connect(port) as idle, connect(port) as stalled:
+        idle.settimeout(3.0)
+        stalled.settimeout(3.0)
+        stalled.sendall(b'e2-')
+        start = time.monotonic()
+        assert stalled.recv(64) == b''
+        assert time.monotonic() - start < 0.8
+        assert idle.recv(64) == b''
+        assert time.monotonic() - start < 2.5
@@ -1,10 +1,19 @@
+# ruff: noqa: PLR2004
+import asyncio
+import os
 import socket
+import struct
+from collections.abc import Iterator
 
 import pytest
 import typer
 
 from src.cli.chess_client import run_client
+from src.client import log, threaded
+from src.client.__main__ import main as fast_replay
+from src.client.aio import run_session, run_sessions
 from src.protocol.core import _display_board
+from src.validation import ClientEngine
 
 
 def test_client_display_board(server: int, board, feeder, capsys) -> None:
@@ -26,6 +35,37 @@ def test_client_move_and_invalid(server: int, feeder, capsys, invalid_comment) -
     ]
 
 
+@pytest.mark.parametrize('binary', [False, True], ids=['text', 'binary'])
+def test_client_resumes_its_game_after_a_drop(server: int, capsys, monkeypatch, binary) -> None:
+    """The REPL reconnects, resumes its seat and carries on the same game."""
+    sockets: list[socket.socket] = []
+    original = threaded.connect
+
+    def connect(interface: str, port: int) -> socket.socket:
+        sockets.append(original(interface, port))
+        return sockets[-1]
+
+    def inputs() -> Iterator[str]:
+        yield 'e2-e4'
+        # Reset the connection, as a network failure would, rather than
+        # close it cleanly.
+        sockets[-1].setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+        os.close(sockets[-1].detach())
+        yield 'e7-e5'
+        yield 'e2-e4'
+
+    monkeypatch.setattr(threaded, 'RECONNECT_DELAY', 0.0)
+    monkeypatch.setattr(threaded, 'connect', connect)
+    run_client(interface='127.0.0.1', port=server, binary=binary, input_func=inputs().__next__)
+
+    assert len(sockets) == 2
+    assert capsys.readouterr().out.splitlines() == [
+        '1. White pawn moves from e2 to e4',
+        '1. Black pawn moves from e7 to e5',
+        'Invalid move',
+    ]
+
+
 def test_client_handles_connection_failure_gracefully(feeder, capsys) -> None:
     """Client exits cleanly when server is unavailable."""
     with pytest.raises(typer.Exit):
@@ -37,3 +77,170 @@ def test_client_handles_connection_failure_gracefully(feeder, capsys) -> None:
 
     captured = capsys.readouterr()
     assert 'Could not connect to 127.0.0.1' in captured.err
+
+
+def test_client_replays_game_file(server: int, tmp_path, capsys) -> None:
+    """Client streams a game file, skipping comments, and stops at mate."""
+    game = tmp_path / 'game.txt'
+    game.write_text(
+        '// scholar mate\ne2-e4\n\ne7-e5\nd1-h5\nb8-c6\nf1-c4\ng8-f6\nh5-f7\ne8-e7\n',
+        encoding='utf-8',
+    )
+    run_client(interface='127.0.0.1', port=server, filename=game, window=2)
+
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0] == '1. White pawn moves from e2 to e4'
+    assert lines[-1] == '4. White queen on h5 takes black pawn on f7. Checkmate, white wins'
+    assert len(lines) == 7
+
+
+def test_client_replay_reports_every_line(server: int, tmp_path, capsys) -> None:
+    """Client prints a reply for every non-comment line of the file."""
+    game = tmp_path / 'game.txt'
+    game.write_text('g1-f3\ng8-f6\nf3-g1\nf6-g8\n' * 50 + 'e2-e5\n', encoding='utf-8')
+    run_client(interface='127.0.0.1', port=server, filename=game, window=8)
+
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 201
+    assert lines[-1] == 'Invalid move'
+
+
+def test_binary_client_matches_text_output(server: int, feeder, capsys) -> None:
+    """Binary mode prints exactly what the text protocol prints."""
+    commands = ['e2-e4', 'e7-e5', 'e2-e5', '// note', 'nonsense', 'display_board']
+    run_client(interface='127.0.0.1', port=server, input_func=feeder(commands))
+    text = capsys.readouterr().out
+
+    run_client(interface='127.0.0.1', port=server, input_func=feeder(commands), binary=True)
+    assert capsys.readouterr().out == text
+    assert 'Invalid move' in text
+
+
+def test_binary_client_replays_game_file(server: int, tmp_path, capsys) -> None:
+    """Binary mode streams a game file and stops at mate."""
+    game = tmp_path / 'game.txt'
+    game.write_text('e2-e4\ne7-e5\nd1-h5\nb8-c6\nf1-c4\ng8-f6\nh5-f7\ne8-e7\n', encoding='utf-8')
+    run_client(interface='127.0.0.1', port=server, filename=game, binary=True)
+
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 7
+    assert lines[-1] == '4. White queen on h5 takes black pawn on f7. Checkmate, white wins'
+
+
+@pytest.mark.parametrize('binary', [False, True], ids=['text', 'binary'])
+def test_fast_replay_entry(server: int, tmp_path, capsys, monkeypatch, binary) -> None:
+    """`python -m src.client` replays a file and prints only the replies."""
+    monkeypatch.setattr(log.logger, 'silenced', False)
+    game = tmp_path / 'game.txt'
+    game.write_text('// mate\ne2-e4\ne7-e5\nd1-h5\nb8-c6\nf1-c4\ng8-f6\nh5-f7\n', encoding='utf-8')
+    argv = [str(game), '-p', str(server), *(['--binary'] if binary else [])]
+    assert fast_replay(argv) == 0
+
+    captured = capsys.readouterr()
+    lines = captured.out.splitlines()
+    assert lines[0] == '1. White pawn moves from e2 to e4'
+    assert lines[-1] == '4. White queen on h5 takes black pawn on f7. Checkmate, white wins'
+    assert len(lines) == 7
+    assert captured.err == ''
+
+
+def test_fast_replay_entry_reports_connection_failure(tmp_path, capsys, monkeypatch) -> None:
+    """The fast entry exits with status 1 when the server is unavailable."""
+    monkeypatch.setattr(log.logger, 'silenced', False)
+    game = tmp_path / 'game.txt'
+    game.write_text('e2-e4\n', encoding='utf-8')
+    assert fast_replay([str(game), '-p', '2000']) == 1
+    assert 'Could not connect to 127.0.0.1:2000' in capsys.readouterr().err
+
+
+@pytest.mark.parametrize('binary', [False, True], ids=['text', 'binary'])
+def test_async_client_matches_threaded_output(server: int, feeder, capsys, binary) -> None:
+    """The asyncio engine prints the same replies as the lock-step REPL."""
+    commands = ['e2-e4', 'e7-e5', 'e2-e5', '// note', 'nonsense', 'display_board']
+    run_client(interface='127.0.0.1', port=server, input_func=feeder(commands), binary=binary)
+    threaded = capsys.readouterr().out
+
+    run_client(
+        interface='127.0.0.1',
+        port=server,
+        input_func=feeder(commands),
+        binary=binary,
+        engine=ClientEngine.ASYNCIO,
+    )
+    assert capsys.readouterr().out == threaded
+
+
+def test_async_client_prints_pushed_moves(server: int) -> None:
+    """The opponent's move is printed while the client has nothing to send."""
+    printed: list[str] = []
+
+    async def play() -> None:
+        arrived: asyncio.Queue[str] = asyncio.Queue()
+
+        def out(message: str) -> None:
+            printed.append(message)
+            arrived.put_nowait(message)
+
+        async def white():
+            yield 'start_game'
+            game_id = (await arrived.get()).split()[1]
+            reader, writer = await asyncio.open_connection('127.0.0.1', server)
+            writer.write(f'join_game {game_id}\n'.encode())
+            await reader.readuntil(b'\n\n')
+            yield 'e2-e4'
+            await arrived.get()
+            writer.write(b'e7-e5\n')
+            await arrived.get()
+            writer.close()
+
+        await asyncio.wait_for(run_session('127.0.0.1', server, white(), out=out), timeout=5)
+
+    asyncio.run(play())
+    assert printed[1:] == [
+        '1. White pawn moves from e2 to e4',
+        '1. Black pawn moves from e7 to e5',
+    ]
+
+
+def test_async_client_reports_connection_failure(feeder, capsys) -> None:
+    """The asyncio engine exits cleanly when the server is unavailable."""
+    with pytest.raises(typer.Exit):
+        run_client(
+            interface='127.0.0.1',
+            port=2000,
+            input_func=feeder(['display_board']),
+            engine=ClientEngine.ASYNCIO,
+        )
+    assert 'Could not connect to 127.0.0.1' in capsys.readouterr().err
+
+
+def test_run_sessions_replays_games_concurrently(server: int) -> None:
+    """Every game gets its own connection and labelled replies."""
+    printed: list[str] = []
+    games = [(f'g{i}', ['g1-f3', 'g8-f6'] * 20 + ['e2-e5']) for i in range(20)]
+    failed = asyncio.run(
+        run_sessions('127.0.0.1', server, games, concurrency=5, out=printed.append)
+    )
+
+    assert failed == 0
+    assert len(printed) == 20 * 41
+    for label, _ in games:
+        replies = [line for line in printed if line.startswith(f'{label}: ')]
+        assert len(replies) == 41
+        assert replies[-1] == f'{label}: Invalid move'
+
+
+def test_fast_replay_entry_replays_several_files(server: int, tmp_path, capsys) -> None:
+    """Several files are replayed at once, each reply tagged with its file."""
+    paths = []
+    for name in ('one.txt', 'two.txt'):
+        paths.append(tmp_path / name)
+        paths[-1].write_text('e2-e4\ne7-e5\n', encoding='utf-8')
+    assert fast_replay([*map(str, paths), '-p', str(server)]) == 0
+
+    lines = capsys.readouterr().out.splitlines()
+    for path in paths:
+        assert [line for line in lines if line.startswith(f'{path}: ')] == [
+            f'{path}: 1. White pawn moves from e2 to e4',
+            f'{path}: 1. Black pawn moves from e7 to e5',
+        ]
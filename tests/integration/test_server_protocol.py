@@ -1,4 +1,6 @@
-from src.cli.chess_client import _read_message
+import time
+
+from src.client.codec import read_message
 from src.protocol.core import _display_board
 
 
@@ -6,7 +8,7 @@ def test_display_board_roundtrip(server: int, connect, board) -> None:
     """Server returns the board snapshot for the `display_board` command."""
     with connect(server) as sock, sock.makefile('r', encoding='utf-8') as fh:
         sock.sendall(b'display_board\n')
-        response = _read_message(fh)
+        response = read_message(fh)
 
     assert response == _display_board(board)
 
@@ -15,21 +17,116 @@ def test_move_and_invalid_responses(server: int, connect) -> None:
     """Server returns formatted moves and rejects unsupported input."""
     with connect(server) as sock, sock.makefile('r', encoding='utf-8') as fh:
         sock.sendall(b'e2-e4\n')
-        assert _read_message(fh) == '1. White pawn moves from e2 to e4'
+        assert read_message(fh) == '1. White pawn moves from e2 to e4'
 
         sock.sendall(b'not a thing\n')
-        assert _read_message(fh) == 'scan error'
+        assert read_message(fh) == 'scan error'
 
 
 def test_each_client_has_its_own_board(server: int, connect) -> None:
     """Each client connection has an independent board state."""
     with connect(server) as first, first.makefile('r', encoding='utf-8') as first_fh:
         first.sendall(b'e2-e4\n')
-        assert _read_message(first_fh) == '1. White pawn moves from e2 to e4'
+        assert read_message(first_fh) == '1. White pawn moves from e2 to e4'
 
         first.sendall(b'e7-e5\n')
-        assert _read_message(first_fh) == '1. Black pawn moves from e7 to e5'
+        assert read_message(first_fh) == '1. Black pawn moves from e7 to e5'
 
         with connect(server) as second, second.makefile('r', encoding='utf-8') as second_fh:
             second.sendall(b'e2-e4\n')
-            assert _read_message(second_fh) == '1. White pawn moves from e2 to e4'
+            assert read_message(second_fh) == '1. White pawn moves from e2 to e4'
+
+
+def test_pipelined_lines_are_answered_in_order(server: int, connect) -> None:
+    """Lines sent in one write are answered in order, up to the game end."""
+    with connect(server) as sock, sock.makefile('r', encoding='utf-8') as fh:
+        sock.sendall(b'e2-e4\ne7-e5\nd1-h5\nb8-c6\nf1-c4\ng8-f6\nh5-f7\ndisplay_board\n')
+        replies = [read_message(fh) for _ in range(8)]
+
+    assert replies[:2] == ['1. White pawn moves from e2 to e4', '1. Black pawn moves from e7 to e5']
+    assert replies[6] == '4. White queen on h5 takes black pawn on f7. Checkmate, white wins'
+    assert replies[7] == ''
+
+
+def test_two_clients_share_a_game(server: int, connect, board) -> None:
+    """A second connection joins the first one's game by ID and plays black."""
+    with (
+        connect(server) as white,
+        white.makefile('r', encoding='utf-8') as white_fh,
+        connect(server) as black,
+        black.makefile('r', encoding='utf-8') as black_fh,
+    ):
+        white.sendall(b'start_game\n')
+        started = read_message(white_fh)
+        game_id = started.split()[1]
+        assert started.startswith(f'Game {game_id} started, you play white\nResume token ')
+
+        black.sendall(f'join_game {game_id}\n'.encode())
+        assert read_message(black_fh).startswith(f'Joined game {game_id} as black\n')
+
+        white.sendall(b'e2-e4\n')
+        assert read_message(white_fh) == '1. White pawn moves from e2 to e4'
+        assert read_message(black_fh) == '1. White pawn moves from e2 to e4'
+
+        board.push_uci('e2e4')
+        black.sendall(b'display_board\n')
+        assert read_message(black_fh) == _display_board(board)
+
+
+def test_spectator_receives_pushed_moves(server: int, connect) -> None:
+    """Moves are pushed to spectators without them sending anything."""
+    with (
+        connect(server) as white,
+        white.makefile('r', encoding='utf-8') as white_fh,
+        connect(server) as black,
+        black.makefile('r', encoding='utf-8') as black_fh,
+        connect(server) as viewer,
+        viewer.makefile('r', encoding='utf-8') as viewer_fh,
+    ):
+        white.sendall(b'start_game\n')
+        game_id = read_message(white_fh).split()[1]
+        black.sendall(f'join_game {game_id}\n'.encode())
+        read_message(black_fh)
+        viewer.sendall(f'join_game {game_id}\n'.encode())
+        assert read_message(viewer_fh) == f'Watching game {game_id}'
+
+        white.sendall(b'e2-e4\n')
+        read_message(white_fh)
+        black.sendall(b'e7-e5\n')
+        read_message(black_fh)
+
+        assert read_message(viewer_fh) == '1. White pawn moves from e2 to e4'
+        assert read_message(viewer_fh) == '1. Black pawn moves from e7 to e5'
+
+
+def test_solo_resume_token_is_released_on_clean_close(server: int, connect) -> None:
+    """A client that closes its connection leaves no solo game to resume."""
+    with connect(server) as sock, sock.makefile('r', encoding='utf-8') as fh:
+        sock.sendall(b'resume\n')
+        token = read_message(fh).removeprefix('Resume token ')
+
+    deadline = time.monotonic() + 2.0
+    with connect(server) as sock, sock.makefile('r', encoding='utf-8') as fh:
+        while True:
+            sock.sendall(f'resume {token}\n'.encode())
+            reply = read_message(fh)
+            if reply == 'Unknown resume token' or time.monotonic() > deadline:
+                break
+            time.sleep(0.05)
+    assert reply == 'Unknown resume token'
+
+
+def test_profiling_is_switched_on_at_runtime(server: int, connect) -> None:
+    """`profile` turns the profiler on and reports by command, send included."""
+    with connect(server) as sock, sock.makefile('r', encoding='utf-8') as fh:
+        sock.sendall(b'profile both\n')
+        assert read_message(fh) == 'Profiling both'
+        sock.sendall(b'e2-e4\n')
+        assert read_message(fh) == '1. White pawn moves from e2 to e4'
+        sock.sendall(b'profile\n')
+        report = read_message(fh).splitlines()
+        sock.sendall(b'profile off\n')
+        assert read_message(fh) == 'Profiling off'
+
+    assert 'profile_requests_total{command="move"} 1' in report
+    assert any(line.startswith('profile_cpu_us{command="move",stage="send"}') for line in report)
@@ -0,0 +1,41 @@
+import threading
+from queue import Queue
+
+import pytest
+
+from src.cli import chess_server
+from src.client.codec import read_message
+
+
+@pytest.fixture
+def worker_server():
+    """Start a two-worker server on a random port and stop it afterwards."""
+    port_queue: Queue[int] = Queue()
+    stop_event = threading.Event()
+    thread = threading.Thread(
+        target=chess_server.run_server,
+        kwargs={
+            'interface': '127.0.0.1',
+            'port': 0,
+            'port_queue': port_queue,
+            'stop_event': stop_event,
+            'workers': 2,
+        },
+        daemon=True,
+    )
+    thread.start()
+    yield port_queue.get(timeout=5)
+    stop_event.set()
+    thread.join(timeout=10)
+    assert not thread.is_alive(), 'Supervisor did not drain its workers.'
+
+
+def test_workers_serve_independent_games(worker_server: int, connect) -> None:
+    """Every connection gets its own game whichever worker accepts it."""
+    for _ in range(4):
+        with connect(worker_server) as sock, sock.makefile('r', encoding='utf-8') as fh:
+            sock.sendall(b'e2-e4\n')
+            assert read_message(fh) == '1. White pawn moves from e2 to e4'
+
+            sock.sendall(b'e7-e5\n')
+            assert read_message(fh) == '1. Black pawn moves from e7 to e5'
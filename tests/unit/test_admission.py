@@ -0,0 +1,101 @@
+# ruff: noqa: PLR2004
+import time
+from threading import Event
+
+from src.server.admission import Connections, HandlerPool
+
+
+def test_reap_closes_idle_connections() -> None:
+    """Closes connections silent for longer than the idle timeout."""
+    closed: list[str] = []
+    connections = Connections(idle_timeout=10.0, read_timeout=5.0)
+    quiet = connections.open(lambda: closed.append('quiet'))
+    busy = connections.open(lambda: closed.append('busy'))
+    now = time.monotonic()
+    quiet.last_read = now - 11.0
+    busy.last_read = now - 9.0
+    assert connections.reap(now) == 1
+    assert closed == ['quiet']
+    assert quiet.reaped
+    assert not busy.reaped
+    assert len(connections) == 1
+    assert connections.reap(now) == 0
+
+
+def test_reap_closes_lines_left_unfinished() -> None:
+    """Closes a connection that started a line and never finished it."""
+    closed: list[None] = []
+    connections = Connections(idle_timeout=10.0, read_timeout=5.0)
+    connection = connections.open(lambda: closed.append(None))
+    connection.touch(partial=True)
+    started = connection.partial_since
+    connection.touch(partial=True)
+    assert connection.partial_since == started
+    assert connections.reap(started + 4.0) == 0
+    assert connections.reap(started + 6.0) == 1
+    assert closed == [None]
+
+
+def test_touch_clears_finished_lines() -> None:
+    """A read completing the line restarts only the idle clock."""
+    connections = Connections(idle_timeout=10.0, read_timeout=5.0)
+    connection = connections.open(lambda: None)
+    connection.touch(partial=True)
+    connection.touch(partial=False)
+    assert connection.partial_since is None
+    connections.closed(connection)
+    assert len(connections) == 0
+
+
+def test_pool_bounds_slots_and_reuses_threads() -> None:
+    """Never hands out more than `size` slots and reuses idle threads."""
+    pool = HandlerPool(size=2)
+    release = Event()
+    assert pool.acquire(timeout=0)
+    assert pool.acquire(timeout=0)
+    assert not pool.acquire(timeout=0)
+    pool.run(release.wait)
+    pool.run(release.wait)
+    assert pool.threads == 2
+    release.set()
+    assert pool.acquire(timeout=1.0)
+    assert pool.acquire(timeout=1.0)
+
+    done = Event()
+    pool.run(done.set)
+    assert done.wait(1.0)
+    assert pool.threads == 2
+    pool.join(timeout=1.0)
+    assert pool.threads == 0
+
+
+def test_pool_threads_exit_when_idle() -> None:
+    """Threads without work for `linger` seconds exit."""
+    pool = HandlerPool(size=4, linger=0.05)
+    for _ in range(3):
+        assert pool.acquire(timeout=0)
+        pool.run(time.sleep, 0.01)
+    assert pool.threads == 3
+    deadline = time.monotonic() + 2.0
+    while pool.threads and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert pool.threads == 0
+    # Exited threads are replaced on demand.
+    done = Event()
+    assert pool.acquire(timeout=0)
+    pool.run(done.set)
+    assert done.wait(1.0)
+
+
+def test_pool_join_bounds_the_whole_drain() -> None:
+    """Busy threads share one `timeout` rather than getting one each."""
+    pool = HandlerPool(size=3)
+    release = Event()
+    for _ in range(3):
+        assert pool.acquire(timeout=0)
+        pool.run(release.wait)
+    start = time.monotonic()
+    pool.join(timeout=0.2)
+    assert time.monotonic() - start < 0.5
+    assert pool.threads == 3
+    release.set()
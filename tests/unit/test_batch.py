@@ -0,0 +1,177 @@
+# ruff: noqa: PLR2004
+import random
+import threading
+from pathlib import Path
+
+import chess
+import pytest
+
+pytest.importorskip('numpy')
+
+from src.protocol.batch import BatchBoards, process_batch
+from src.protocol.board import GameBoard
+from src.protocol.core import GameOver, play_move, process_line
+from src.protocol.replay import Result, replay_file, replay_files
+from src.server.batching import MoveBatcher
+
+SCHOLARS_MATE = ['e2-e4', 'e7-e5', 'd1-h5', 'b8-c6', 'f1-c4', 'g8-f6', 'h5-f7']
+OTHER_LINES = ['display_board', '// comment', 'bogus', '  E2-E4  ', 'a7-a8']
+
+
+def _name(move: chess.Move) -> str:
+    return f'{chess.square_name(move.from_square)}-{chess.square_name(move.to_square)}'
+
+
+def _line(board: chess.Board, rng: random.Random) -> str:
+    """Return a line for `board`: mostly legal moves, checks and oddities."""
+    legal = list(board.legal_moves)
+    roll = rng.random()
+    if roll < 0.25:
+        special = [
+            move
+            for move in legal
+            if board.is_castling(move) or board.is_en_passant(move) or board.gives_check(move)
+        ]
+        if special:
+            return _name(rng.choice(special))
+    if roll < 0.6 and legal:
+        return _name(rng.choice(legal))
+    if roll < 0.85:
+        own = list(chess.SquareSet(board.occupied_co[board.turn]))
+        return f'{chess.square_name(rng.choice(own))}-{chess.square_name(rng.randrange(64))}'
+    if roll < 0.93:
+        return f'{chess.square_name(rng.randrange(64))}-{chess.square_name(rng.randrange(64))}'
+    return rng.choice(OTHER_LINES)
+
+
+def _expected(board: chess.Board, line: str) -> tuple[str, bool]:
+    try:
+        return process_line(board, line), False
+    except GameOver as exc:
+        return str(exc), True
+
+
+def test_batch_agrees_with_process_line_on_random_games() -> None:
+    """Answers every line and reaches every position like `process_line`."""
+    rng = random.Random(25)
+    boards = [GameBoard() for _ in range(80)]
+    batch = BatchBoards(len(boards))
+    playing = list(range(len(boards)))
+    mates = 0
+    for _ in range(120):
+        lines = [_line(boards[game], rng) for game in playing]
+        replies = process_batch(batch, playing, lines)
+        still = []
+        for game, line, reply in zip(playing, lines, replies, strict=True):
+            assert reply == _expected(boards[game], line), (line, boards[game].fen())
+            assert batch.board(game).fen() == boards[game].fen()
+            assert batch.plies[game] == len(boards[game].move_stack)
+            mates += reply[1]
+            if not reply[1] and not boards[game].is_game_over():
+                still.append(game)
+        playing = still
+    assert mates
+
+
+def test_batch_plays_special_moves() -> None:
+    """Castling, en passant, mate and rejected promotions match too."""
+    games = [
+        SCHOLARS_MATE,
+        ['e2-e4', 'g8-f6', 'e4-e5', 'd7-d5', 'e5-d6', 'e7-e6', 'g1-f3', 'f8-d6', 'f1-c4', 'e8-h8'],
+        ['e2-e4', 'e7-e5', 'g1-f3', 'b8-c6', 'f1-c4', 'g8-f6', 'e1-g1', 'f8-c5', 'f1-e1', 'e8-g8'],
+        ['h2-h4', 'g7-g5', 'h4-g5', 'h7-h6', 'g5-h6', 'a7-a6', 'h6-g7', 'a6-a5', 'g7-h8'],
+    ]
+    boards = [GameBoard() for _ in games]
+    batch = BatchBoards(len(games))
+    for ply in range(max(map(len, games))):
+        playing = [game for game, moves in enumerate(games) if ply < len(moves)]
+        lines = [games[game][ply] for game in playing]
+        replies = process_batch(batch, playing, lines)
+        for game, line, reply in zip(playing, lines, replies, strict=True):
+            assert reply == _expected(boards[game], line)
+    assert [batch.board(game).fen() for game in range(len(games))] == [
+        board.fen() for board in boards
+    ]
+
+
+def test_replay_files_summarizes_like_replay_file(tmp_path: Path) -> None:
+    """Replays files together with the summaries of one at a time."""
+    contents = [
+        '\n'.join(SCHOLARS_MATE) + '\nbogus\n',
+        '// opening\ne2-e4\ne2-e4\n\nbogus\ne7-e5\n',
+        'e2-e4\r\ndisplay_board',
+        '',
+        'e7-e5\n',
+    ]
+    paths = []
+    for number, content in enumerate(contents):
+        path = tmp_path / f'{number}.txt'
+        path.write_text(content, encoding='utf-8')
+        paths.append(path)
+    paths.append(tmp_path / 'missing.txt')
+
+    summaries = replay_files(paths)
+    assert summaries == [replay_file(path) for path in paths]
+    assert [summary.result for summary in summaries] == [
+        Result.CHECKMATE,
+        Result.INVALID,
+        Result.OK,
+        Result.OK,
+        Result.INVALID,
+        Result.UNREADABLE,
+    ]
+
+
+def test_validate_batch_flag(tmp_path: Path) -> None:
+    """`--batch` writes the same summary as the per-file replay."""
+    from typer.testing import CliRunner  # noqa: PLC0415
+
+    from src.cli.chess_validate import app  # noqa: PLC0415
+
+    games = tmp_path / 'games'
+    games.mkdir()
+    for number in range(5):
+        (games / f'{number}.txt').write_text('e2-e4\ne7-e5\n' * number, encoding='utf-8')
+    plain, batched = tmp_path / 'plain.tsv', tmp_path / 'batched.tsv'
+    runner = CliRunner()
+    assert runner.invoke(app, [str(games), '-w', '1', '-o', str(plain)]).exit_code == 1
+    args = [str(games), '-w', '2', '--batch', '--chunk-size', '2', '-o', str(batched)]
+    assert runner.invoke(app, args).exit_code == 1
+    assert batched.read_text(encoding='utf-8') == plain.read_text(encoding='utf-8')
+
+
+def test_move_batcher_plays_moves_from_many_threads() -> None:
+    """Batches concurrent moves and plays each like `play_move`."""
+    rng = random.Random(7)
+    games = []
+    for _ in range(16):
+        moves, board = [], chess.Board()
+        while len(moves) < 40 and not board.is_game_over():
+            if rng.random() < 0.8:
+                move = rng.choice(list(board.legal_moves))
+                board.push(move)
+            else:
+                move = chess.Move(rng.randrange(64), rng.randrange(64))
+            moves.append(move)
+        games.append(moves)
+
+    batcher = MoveBatcher(tick=0.01)
+    results: dict[int, list] = {}
+
+    def play(number: int) -> None:
+        board = GameBoard()
+        results[number] = [(batcher.play(board, move), board.fen()) for move in games[number]]
+
+    threads = [threading.Thread(target=play, args=(number,)) for number in range(len(games))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    batcher.close()
+
+    for number, moves in enumerate(games):
+        board = GameBoard()
+        assert results[number] == [(play_move(board, move), board.fen()) for move in moves]
+    # Promotions are played on the spot.
+    assert batcher.moves == sum(not move.promotion for moves in games for move in moves)
+    assert batcher.batches < batcher.moves
@@ -0,0 +1,67 @@
+# ruff: noqa: PLR2004
+import chess
+import pytest
+
+from src.protocol import MoveEvent, describe_move
+from src.protocol.binary import (
+    FrameDecoder,
+    FrameError,
+    Opcode,
+    decode_event,
+    decode_move,
+    decode_varint,
+    encode_event,
+    encode_frame,
+    encode_move,
+    encode_varint,
+)
+
+
+@pytest.mark.parametrize('value', [0, 1, 127, 128, 300, 2**21, 2**32 - 1])
+def test_varint_roundtrip(value) -> None:
+    """Encodes and decodes varints of every width."""
+    data = encode_varint(value)
+    assert decode_varint(data) == (value, len(data))
+    assert decode_varint(data[:-1]) is None
+
+
+def test_frame_decoder_handles_split_frames() -> None:
+    """Returns frames only once they are complete."""
+    stream = encode_frame(Opcode.LINE, b'display_board') + encode_frame(Opcode.MOVE, b'\x01\x02')
+    decoder = FrameDecoder()
+    assert decoder.feed(stream[:5]) == []
+    assert decoder.feed(stream[5:]) == [
+        (Opcode.LINE, b'display_board'),
+        (Opcode.MOVE, b'\x01\x02'),
+    ]
+    assert decoder.pending == 0
+
+
+def test_frame_decoder_rejects_unknown_opcode() -> None:
+    """Refuses frames it does not understand."""
+    with pytest.raises(FrameError):
+        FrameDecoder().feed(b'\x7f\x00')
+
+
+def test_move_roundtrip() -> None:
+    """Packs moves, promotions included, into two bytes."""
+    for move in (chess.Move.from_uci('e2e4'), chess.Move.from_uci('a7a8q'), chess.Move(0, 0)):
+        data = encode_move(move)
+        assert len(data) == 2
+        assert decode_move(data) == move
+
+
+def test_event_roundtrip_renders_like_text() -> None:
+    """Records decode to events that describe exactly like the originals."""
+    events = [
+        MoveEvent(1, chess.WHITE, chess.PAWN, chess.E2, chess.E4),
+        MoveEvent(300, chess.BLACK, chess.QUEEN, chess.D8, chess.H4, captured=chess.ROOK),
+        MoveEvent(12, chess.WHITE, chess.KING, chess.E1, chess.G1, castling=True, check=True),
+        MoveEvent(
+            4, chess.WHITE, chess.QUEEN, chess.H5, chess.F7, chess.PAWN, check=True, checkmate=True
+        ),
+    ]
+    for event in events:
+        decoded = decode_event(encode_event(event))
+        assert decoded == event
+        assert describe_move(decoded) == describe_move(event)
@@ -0,0 +1,46 @@
+# ruff: noqa: PLR2004
+import random
+
+import chess
+
+from src.protocol import GameBoard
+
+
+def test_game_board_agrees_with_chess_board() -> None:
+    """Gives the same legality, check and mate answers over random games."""
+    rng = random.Random(7)
+    for _ in range(40):
+        plain, cached = chess.Board(), GameBoard()
+        while legal := list(plain.legal_moves):
+            probes = [chess.Move(rng.randrange(64), rng.randrange(64)) for _ in range(8)]
+            probes += legal[:8]
+            probes += [
+                chess.Move(move.from_square, move.to_square, chess.QUEEN) for move in legal[:4]
+            ]
+            for move in probes:
+                assert cached.is_legal(move) == plain.is_legal(move), (plain.fen(), move)
+            assert cached.is_check() == plain.is_check()
+            assert cached.is_checkmate() == plain.is_checkmate()
+
+            move = rng.choice(legal)
+            plain.push(move)
+            cached.push(move)
+            if rng.random() < 0.1:
+                plain.pop()
+                cached.pop()
+            if len(plain.move_stack) > 120:
+                break
+        assert cached.is_checkmate() == plain.is_checkmate()
+
+
+def test_game_board_forgets_position_on_setup() -> None:
+    """Drops cached answers when a new position is set up."""
+    board = GameBoard('4k3/8/8/8/8/8/8/4K2R w - - 0 1')
+    assert not board.is_check()
+    board.set_fen('4k3/8/8/8/8/8/8/4R1K1 b - - 0 1')
+    assert board.is_check()
+    assert board.is_legal(chess.Move.from_uci('e8d7'))
+    assert not board.is_legal(chess.Move.from_uci('e8e7'))
+    board.reset()
+    assert not board.is_check()
+    assert board.is_legal(chess.Move.from_uci('e2e4'))
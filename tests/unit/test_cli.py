@@ -1,7 +1,12 @@
+import subprocess
+import sys
+
 from typer.testing import CliRunner
 
 from src.cli.chess_client import app as client_app
+from src.cli.chess_client import iter_moves
 from src.cli.chess_server import app as server_app
+from src.cli.chess_validate import app as validate_app
 
 runner = CliRunner()
 
@@ -18,6 +23,27 @@ class TestServerCLI:
         assert '--interface' in out
         assert '-p' in out
         assert '--port' in out
+        assert '-e' in out
+        assert '--engine' in out
+        assert '-w' in out
+        assert '--workers' in out
+        assert '--max-games' in out
+        assert '--game-timeout' in out
+        assert '--fanout-queue' in out
+        assert '--fanout-policy' in out
+        assert '--journal' in out
+        assert '--hibernate-after' in out
+        assert '--hibernate-dir' in out
+        assert '--position-cache' in out
+        assert '--metrics' in out
+        assert '--profile' in out
+        assert '--profile-output' in out
+        assert '--max-connections' in out
+        assert '--overflow' in out
+        assert '--idle-timeout' in out
+        assert '--read-timeout' in out
+        assert '--log-mode' in out
+        assert '--trace-sample' in out
         assert '-v' in out
         assert '--verbose' in out
         assert '-l' in out
@@ -38,6 +64,11 @@ class TestServerCLI:
         result = runner.invoke(server_app, ['-p', '70000'])
         assert result.exit_code != 0
 
+    def test_server_invalid_engine_errors(self) -> None:
+        """Rejects unknown connection engines before starting sockets."""
+        result = runner.invoke(server_app, ['-e', 'forking'])
+        assert result.exit_code != 0
+
 
 class TestClientCLI:
     """Client CLI tests for help and option validation."""
@@ -53,6 +84,12 @@ class TestClientCLI:
         assert '--port' in out
         assert '-f' in out
         assert '--filename' in out
+        assert '-w' in out
+        assert '--window' in out
+        assert '-e' in out
+        assert '--engine' in out
+        assert '-r' in out
+        assert '--reconnect' in out
         assert '-v' in out
         assert '--verbose' in out
         assert '-l' in out
@@ -72,3 +109,65 @@ class TestClientCLI:
         """Rejects invalid client port before connecting."""
         result = runner.invoke(client_app, ['-p', '70000'])
         assert result.exit_code != 0
+
+    def test_client_rejects_server_only_engines(self) -> None:
+        """Rejects the batched engine, which only the server has."""
+        result = runner.invoke(client_app, ['-e', 'batched'])
+        assert result.exit_code != 0
+        assert "'batched' is not one of" in result.output
+
+
+class TestValidateCLI:
+    """Offline validator CLI tests."""
+
+    def test_validate_help_shows_options(self) -> None:
+        """Shows validator help with expected flags."""
+        result = runner.invoke(validate_app, ['--help'])
+        out = result.output
+        assert result.exit_code == 0
+        assert '--workers' in out
+        assert '--chunk-size' in out
+        assert '--batch' in out
+        assert '--output' in out
+
+    def test_validate_writes_summary_and_fails_on_invalid(self, tmp_path) -> None:
+        """Summarizes every file under a directory and exits 1 on rejects."""
+        games = tmp_path / 'games'
+        games.mkdir()
+        (games / 'good.txt').write_text('e2-e4\ne7-e5\n', encoding='utf-8')
+        (games / 'bad.txt').write_text('e2-e5\n', encoding='utf-8')
+        summary = tmp_path / 'summary.tsv'
+        result = runner.invoke(validate_app, [str(games), '-w', '2', '-o', str(summary)])
+        assert result.exit_code == 1
+        assert summary.read_text(encoding='utf-8').splitlines() == [
+            f'{games / "bad.txt"}\tinvalid\t0\t1\te2-e5',
+            f'{games / "good.txt"}\tok\t2\t\t',
+        ]
+
+
+def test_iter_moves_skips_comments_and_blanks(tmp_path) -> None:
+    """Yields only the lines the server has to answer."""
+    game = tmp_path / 'game.txt'
+    game.write_text('// opening\na2-a4\n\n  h7-h5  \n// done\n', encoding='utf-8')
+    assert list(iter_moves(game)) == ['a2-a4', 'h7-h5']
+
+
+def _imported(module: str) -> set[str]:
+    """Return the top-level packages a fresh interpreter loads for `module`."""
+    code = f'import sys, {module}; print(*sorted({{m.partition(".")[0] for m in sys.modules}}))'
+    result = subprocess.run(
+        [sys.executable, '-c', code], capture_output=True, text=True, check=True
+    )
+    return set(result.stdout.split())
+
+
+def test_fast_replay_entry_imports_only_the_standard_library() -> None:
+    """`python -m src.client` loads none of the heavy dependencies."""
+    assert _imported('src.client.__main__').isdisjoint(
+        {'chess', 'typer', 'click', 'rich', 'loguru', 'asyncio'}
+    )
+
+
+def test_client_command_line_defers_rich_and_chess() -> None:
+    """The full client loads rich and python-chess only when it needs them."""
+    assert _imported('src.cli.chess_client').isdisjoint({'chess', 'rich'})
@@ -0,0 +1,63 @@
+# ruff: noqa: PLR2004
+import random
+
+import chess
+
+from src.protocol import CompactGame, GameBoard, play_move
+from src.protocol.compact import decode_move, encode_move
+
+
+def test_compact_game_follows_random_games() -> None:
+    """Materializes the same position and answers as a board with a stack."""
+    rng = random.Random(11)
+    for _ in range(30):
+        plain, game = chess.Board(), CompactGame()
+        while (legal := list(plain.legal_moves)) and plain.ply() < 150:
+            move = rng.choice(legal)
+            board = game.board()
+            assert board.fen() == plain.fen()
+            assert board.is_check() == plain.is_check()
+            assert game.turn == plain.turn
+            assert play_move(board, move) is not None
+            game.update(board)
+            plain.push(move)
+        assert game.board().is_checkmate() == plain.is_checkmate()
+        assert list(map(decode_move, game.moves)) == plain.move_stack
+        assert game.ply() == plain.ply()
+
+
+def test_compact_game_keeps_castling_en_passant_and_promotion() -> None:
+    """Round-trips the state a FEN carries beyond the piece placement."""
+    board = GameBoard('r3k2r/1P6/8/3pP3/8/8/8/R3K2R w KQkq d6 0 30')
+    game = CompactGame(board)
+    assert game.board().fen() == board.fen()
+    assert game.ply() == 58
+
+    for uci in ('e5d6', 'e8g8', 'b7a8q'):
+        materialized = game.board()
+        materialized.push_uci(uci)
+        board.push_uci(uci)
+        game.update(materialized)
+        assert game.board().fen() == board.fen()
+    assert [decode_move(code).uci() for code in game.moves] == ['e5d6', 'e8g8', 'b7a8q']
+
+
+def test_compact_game_ignores_boards_without_moves() -> None:
+    """Keeps its position when a materialized board played nothing."""
+    game = CompactGame()
+    board = game.board()
+    board.set_fen('4k3/8/8/8/8/8/8/4K3 w - - 0 1')
+    board.clear_stack()
+    game.update(board)
+    assert game.board().fen() == chess.STARTING_FEN
+    assert len(game.moves) == 0
+
+
+def test_move_codes_fit_sixteen_bits() -> None:
+    """Encodes every from, to and promotion combination reversibly."""
+    for promotion in (None, chess.KNIGHT, chess.QUEEN):
+        for from_square in chess.SQUARES:
+            move = chess.Move(from_square, 63 - from_square, promotion)
+            code = encode_move(move)
+            assert 0 <= code < 1 << 16
+            assert decode_move(code) == move
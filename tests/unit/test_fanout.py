@@ -0,0 +1,45 @@
+# ruff: noqa: PLR2004
+from src.protocol.binary import FrameDecoder, Opcode
+from src.server.fanout import Broadcast, Fanout, Policy, Subscriber
+
+
+def test_broadcast_encodes_once_per_protocol() -> None:
+    """Every subscriber of a protocol receives the same bytes object."""
+    message = Broadcast('1. White pawn moves from e2 to e4')
+    assert message.wire(binary=False) == b'1. White pawn moves from e2 to e4\n\n'
+    assert message.wire(binary=False) is message.wire(binary=False)
+    assert FrameDecoder().feed(message.wire(binary=True)) == [
+        (Opcode.TEXT, b'1. White pawn moves from e2 to e4')
+    ]
+    assert message.wire(binary=True) is message.wire(binary=True)
+
+
+def test_subscriber_queues_and_wakes() -> None:
+    """Offers are queued in order and each one wakes the owner."""
+    wakes: list[None] = []
+    subscriber = Subscriber(lambda: wakes.append(None))
+    assert subscriber.offer(b'a')
+    assert subscriber.offer(b'b')
+    assert len(wakes) == 2
+    assert subscriber.drain() == [b'a', b'b']
+    assert subscriber.drain() == []
+
+
+def test_subscriber_drops_oldest_when_full() -> None:
+    """The drop policy keeps the newest messages and counts the losses."""
+    subscriber = Subscriber(lambda: None, limit=2, policy=Policy.DROP)
+    for payload in (b'a', b'b', b'c', b'd'):
+        assert subscriber.offer(payload)
+    assert subscriber.drain() == [b'c', b'd']
+    assert subscriber.dropped == 2
+    assert not subscriber.closed
+
+
+def test_subscriber_disconnects_when_full() -> None:
+    """The disconnect policy closes the subscriber on overflow."""
+    subscriber = Fanout(limit=1, policy=Policy.DISCONNECT).subscribe(lambda: None)
+    assert subscriber.offer(b'a')
+    assert not subscriber.offer(b'b')
+    assert subscriber.closed
+    assert subscriber.drain() == []
+    assert not subscriber.offer(b'c')
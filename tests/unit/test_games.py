@@ -0,0 +1,71 @@
+# ruff: noqa: PLR2004
+import pytest
+
+from src.server.games import GameRegistry, RegistryFull, Seat
+
+
+def test_registry_creates_and_finds_games() -> None:
+    """Registers games under distinct IDs and looks them up."""
+    registry = GameRegistry()
+    first, second = registry.create(), registry.create()
+    assert first.game_id != second.game_id
+    assert registry.get(first.game_id) is first
+    assert len(registry) == 2
+
+    registry.remove(first)
+    assert first.ended
+    assert registry.get(first.game_id) is None
+
+
+def test_registry_is_bounded() -> None:
+    """Refuses new games beyond the configured limit."""
+    registry = GameRegistry(max_games=1)
+    registry.create()
+    with pytest.raises(RegistryFull):
+        registry.create()
+
+
+def test_registry_evicts_unattended_idle_games() -> None:
+    """Evicts idle games nobody is attached to, and only those."""
+    registry = GameRegistry(idle_timeout=10)
+    idle, attended, fresh = registry.create(), registry.create(), registry.create()
+    attended.seat(object(), Seat.WHITE)
+    idle.last_active = attended.last_active = fresh.last_active - 60
+
+    assert registry.evict_idle(now=fresh.last_active) == 1
+    assert idle.ended
+    assert registry.get(attended.game_id) is attended
+    assert registry.get(fresh.game_id) is fresh
+
+
+def test_game_seats_and_leave() -> None:
+    """Tracks seated players and spectators until they leave."""
+    registry = GameRegistry()
+    game = registry.create()
+    owner, watcher = object(), object()
+    game.seat(owner, Seat.SOLO)
+    game.seat(watcher, Seat.SPECTATOR)
+    assert game.white is owner
+    assert game.black is owner
+
+    game.leave(owner)
+    assert game.occupied()
+    game.leave(watcher)
+    assert not game.occupied()
+
+
+def test_registry_packs_the_boards_of_idle_games() -> None:
+    """Keeps an active game's board and folds its moves back once idle."""
+    registry = GameRegistry()
+    game = registry.create()
+    board = game.play()
+    board.push_uci('e2e4')
+    assert game.play() is board
+    assert game.board().fen() == board.fen()
+    assert not game.packed
+
+    assert registry.pack_idle(now=game.last_active + 30) == 0
+    assert registry.pack_idle(now=game.last_active + 90) == 1
+    assert game.packed
+    assert len(game.state.moves) == 1
+    assert game.play().fen() == board.fen()
@@ -0,0 +1,103 @@
+# ruff: noqa: PLR2004
+import pytest
+
+from src.protocol import CompactGame, GameBoard
+from src.server import hibernation
+from src.server.games import GameRegistry
+from src.server.hibernation import HibernationStore
+from src.server.metrics import Metrics
+from src.server.session import Session
+
+
+def _game(*moves: str) -> CompactGame:
+    board = GameBoard()
+    for uci in moves:
+        board.push_uci(uci)
+    return CompactGame(board)
+
+
+def test_compact_game_round_trips_through_bytes() -> None:
+    """Restores the position and move history it serialized."""
+    game = _game('e2e4', 'e7e5', 'g1f3')
+    restored = CompactGame.frombytes(bytes(game))
+    assert restored.position == game.position
+    assert restored.moves == game.moves
+    assert restored.board().fen() == game.board().fen()
+
+
+def test_store_gives_back_each_game_once(tmp_path) -> None:
+    """Reads games back by ID and forgets them once taken or discarded."""
+    store = HibernationStore(tmp_path)
+    store.put('a', _game('e2e4'))
+    store.put('b', _game('d2d4', 'd7d5'))
+    assert len(store) == 2
+    assert 'a' in store
+
+    assert store.peek('b').ply() == 2
+    assert store.take('b').ply() == 2
+    assert 'b' not in store
+    with pytest.raises(KeyError):
+        store.take('b')
+
+    store.discard('a')
+    store.discard('a')
+    assert len(store) == 0
+    assert (store.hibernations, store.rehydrations) == (2, 1)
+    store.close()
+
+
+def test_store_compacts_once_garbage_dominates(monkeypatch) -> None:
+    """Copies the live records to a new segment and keeps them readable."""
+    monkeypatch.setattr(hibernation, 'COMPACT_MIN_BYTES', 1)
+    store = HibernationStore()
+    shuffle = ['g1f3', 'g8f6', 'f3g1', 'f6g8']
+    games = {str(index): _game(*shuffle[: index % 4]) for index in range(8)}
+    for game_id, game in games.items():
+        store.put(game_id, game)
+    full = store.size
+
+    for game_id in list(games)[:5]:
+        store.take(game_id)
+    assert store.size < full
+    for game_id in list(games)[5:]:
+        assert bytes(store.take(game_id)) == bytes(games[game_id])
+    assert store.size == 0
+    store.close()
+
+
+def test_registry_wakes_hibernated_games_on_their_next_request() -> None:
+    """Hibernates idle games and rehydrates them transparently."""
+    store = HibernationStore()
+    registry = GameRegistry(hibernation=store, hibernate_after=60)
+    metrics = Metrics(registry.__len__, store)
+    session = Session(registry, metrics)
+    session.feed(b'e2-e4\ne7-e5\n')
+    game = session.game
+    fen = game.board().fen()
+
+    assert registry.hibernate_idle(now=game.last_active + 30) == 0
+    assert registry.hibernate_idle(now=game.last_active + 90) == 1
+    assert game.hibernated
+    assert game.board().fen() == fen
+    assert game.hibernated
+    assert 'games_hibernated 1' in metrics.report()
+
+    replies, _ = session.feed(b'g1-f3\n')
+    assert replies == b'2. White knight moves from g1 to f3\n\n'
+    assert not game.hibernated
+    assert len(game.state.moves) == 3
+    report = metrics.report()
+    assert 'hibernations_total 1' in report
+    assert 'rehydrations_total 1' in report
+    store.close()
+
+
+def test_registry_forgets_hibernated_games_it_removes() -> None:
+    """Discards the record of a game removed while hibernated."""
+    store = HibernationStore()
+    registry = GameRegistry(hibernation=store, hibernate_after=60)
+    game = registry.create()
+    registry.hibernate_idle(now=game.last_active + 90)
+    registry.remove(game)
+    assert len(store) == 0
+    store.close()
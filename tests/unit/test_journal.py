@@ -0,0 +1,137 @@
+from pathlib import Path
+
+import chess
+
+from src.server.games import GameRegistry, open_registry
+from src.server.journal import Journal
+from src.server.session import Session
+
+
+def _shared_game(registry: GameRegistry, moves: list[str]) -> tuple[str, chess.Board]:
+    white, black = Session(registry), Session(registry)
+    white.handle('start_game')
+    game_id = white.game.game_id
+    black.handle(f'join_game {game_id}')
+    for index, move in enumerate(moves):
+        (white, black)[index % 2].handle(move)
+    return game_id, white.board.copy(stack=False)
+
+
+def test_journal_restores_shared_games(tmp_path: Path) -> None:
+    """Shared games come back with their position; solo games do not."""
+    path = tmp_path / 'games.journal'
+    with open_registry(journal_path=path) as registry:
+        game_id, board = _shared_game(registry, ['e2-e4', 'e7-e5', 'g1-f3'])
+        Session(registry).handle('d2-d4')
+
+    with open_registry(journal_path=path) as registry:
+        assert len(registry) == 1
+        restored = registry.get(game_id)
+        assert restored.shared
+        assert restored.state.board().fen() == board.fen()
+        response, _ = Session(registry).handle(f'join_game {game_id}')
+        assert response.startswith(f'Joined game {game_id} as black\n')
+
+
+def test_journal_forgets_ended_games(tmp_path: Path) -> None:
+    """A game that ended before the restart is not restored."""
+    path = tmp_path / 'games.journal'
+    with open_registry(journal_path=path) as registry:
+        white = Session(registry)
+        white.handle('start_game')
+        white.handle('end_game')
+
+    with open_registry(journal_path=path) as registry:
+        assert len(registry) == 0
+
+
+def test_journal_compaction_keeps_positions(tmp_path: Path) -> None:
+    """Compaction rewrites the file as snapshots that replay identically."""
+    path = tmp_path / 'games.journal'
+    journal = Journal(path, fsync_interval=60)
+    registry = GameRegistry(journal=journal)
+    registry.recover()
+    game_id, board = _shared_game(registry, ['e2-e4', 'e7-e5', 'd1-h5', 'b8-c6'])
+    journal._flush()
+    journal._compact()
+    _shared_game(registry, ['d2-d4'])
+    journal.close()
+
+    lines = path.read_text().splitlines()
+    assert lines[0] == f'S {game_id} 4 {board.fen()}'
+    assert Journal(path).replay()[game_id].fen() == board.fen()
+
+
+def test_journal_stops_at_torn_record(tmp_path: Path) -> None:
+    """A record cut short by a crash ends the replay without failing it."""
+    path = tmp_path / 'games.journal'
+    path.write_text('N abc\nM abc 1 e2e4\nM abc 2 e7\n')
+    board = Journal(path).replay()['abc']
+    assert (
+        board.fen()
+        == chess.Board('rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1').fen()
+    )
+
+
+def test_journal_skips_moves_covered_by_snapshot(tmp_path: Path) -> None:
+    """Moves recorded while a snapshot was taken are not applied twice."""
+    board = chess.Board()
+    board.push_uci('e2e4')
+    path = tmp_path / 'games.journal'
+    path.write_text(f'S abc 1 {board.fen()}\nM abc 1 e2e4\nM abc 2 e7e5\n')
+    board.push_uci('e7e5')
+    assert Journal(path).replay()['abc'].fen() == board.fen()
+
+
+def test_journal_keeps_games_started_during_compaction(tmp_path: Path) -> None:
+    """A start recorded after the game's snapshot does not reset it."""
+    path = tmp_path / 'games.journal'
+    journal = Journal(path, fsync_interval=60)
+    registry = GameRegistry(journal=journal)
+    registry.recover()
+    game_id, board = _shared_game(registry, ['e2-e4', 'e7-e5'])
+    journal._flush()
+    snapshots = registry._snapshots
+
+    def racing() -> list[tuple[str, chess.Board]]:
+        # The game's start is queued between the snapshots and the drain.
+        taken = snapshots()
+        journal.created(game_id)
+        return taken
+
+    journal._snapshots = racing
+    journal._compact()
+    journal.close()
+
+    assert path.read_text().splitlines()[:2] == [f'S {game_id} 2 {board.fen()}', f'N {game_id}']
+    assert Journal(path).replay()[game_id].fen() == board.fen()
+
+
+def test_journal_flush_keeps_active_boards_unpacked(tmp_path: Path) -> None:
+    """Collecting a game's moves neither packs its board nor loses moves."""
+    path = tmp_path / 'games.journal'
+    journal = Journal(path, fsync_interval=60)
+    registry = GameRegistry(journal=journal)
+    registry.recover()
+    white, black = Session(registry), Session(registry)
+    white.handle('start_game')
+    game = white.game
+    black.handle(f'join_game {game.game_id}')
+    white.handle('e2-e4')
+    journal._flush()
+    assert not game.packed
+
+    black.handle('e7-e5')
+    game.pack()
+    white.handle('g1-f3')
+    journal._flush()
+    assert not game.packed
+    journal.close()
+
+    lines = path.read_text().splitlines()
+    assert [line for line in lines if line.startswith('M ')] == [
+        f'M {game.game_id} 1 e2e4',
+        f'M {game.game_id} 2 e7e5',
+        f'M {game.game_id} 3 g1f3',
+    ]
+    assert Journal(path).replay()[game.game_id].fen() == white.board.fen()
@@ -0,0 +1,78 @@
+# ruff: noqa: PLR2004
+import io
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from loguru import logger
+
+from src.server.games import GameRegistry
+from src.server.logs import BatchingSink, LogMode, configure_logging
+from src.server.session import Session
+
+
+@pytest.fixture(autouse=True)
+def _restore_logging() -> Iterator[None]:
+    """Put loguru back to its default stderr sink after each test."""
+    yield
+    configure_logging(verbose=True)
+
+
+def test_batching_sink_writes_on_its_own_thread() -> None:
+    """Queues messages and writes them in one batch, at the latest on stop."""
+    stream = io.StringIO()
+    sink = BatchingSink(stream, interval=60)
+    sink.write('one\n')
+    sink.write('two\n')
+    assert stream.getvalue() == ''
+    sink.stop()
+    assert stream.getvalue() == 'one\ntwo\n'
+    sink.stop()  # stopping twice is harmless
+
+
+def test_async_mode_writes_the_log_file(tmp_path: Path) -> None:
+    """Writes every record to the file once the sink is removed."""
+    log_file = tmp_path / 'server.log'
+    configure_logging(verbose=True, log_file=log_file, mode=LogMode.ASYNC)
+    logger.info('hello')
+    logger.debug('details')
+    logger.remove()
+    lines = log_file.read_text(encoding='utf-8').splitlines()
+    assert len(lines) == 2
+    assert lines[0].endswith('hello')
+    assert lines[1].endswith('details')
+
+
+def test_connections_trace_by_sample() -> None:
+    """Traces one connection in `trace_sample`, and none without -v."""
+    registry = GameRegistry()
+    configure_logging(verbose=True, trace_sample=3, mode=LogMode.ASYNC)
+    assert sum(Session(registry).trace for _ in range(9)) == 3
+    configure_logging(verbose=False, trace_sample=1, mode=LogMode.ASYNC)
+    assert not any(Session(registry).trace for _ in range(9))
+
+
+def test_untraced_sessions_do_not_log_requests(tmp_path: Path) -> None:
+    """Logs request and response lines only for traced connections."""
+    log_file = tmp_path / 'server.log'
+    configure_logging(verbose=True, log_file=log_file, trace_sample=0)
+    Session().handle('e2-e4')
+    configure_logging(verbose=True, log_file=log_file, trace_sample=1)
+    Session().handle('e2-e4')
+    logger.remove()
+    text = log_file.read_text(encoding='utf-8')
+    assert text.count('<< e2-e4') == 1
+    assert text.count('>> 1. White pawn moves from e2 to e4') == 1
+
+
+def test_async_traces_are_formatted_by_the_writer(tmp_path: Path) -> None:
+    """Writes queued traces in the same layout as loguru records."""
+    log_file = tmp_path / 'server.log'
+    configure_logging(verbose=True, log_file=log_file, mode=LogMode.ASYNC)
+    Session().handle('e2-e4')
+    logger.remove()
+    lines = log_file.read_text(encoding='utf-8').splitlines()
+    assert [line.split(' | ', 1)[1] for line in lines] == [
+        'DEBUG    | << e2-e4',
+        'DEBUG    | >> 1. White pawn moves from e2 to e4',
+    ]
@@ -0,0 +1,76 @@
+# ruff: noqa: PLR2004
+import chess
+
+from src.protocol.binary import Opcode, encode_frame, encode_move
+from src.server.games import GameRegistry
+from src.server.metrics import SAMPLE_EVERY, Histogram, Metrics
+from src.server.session import Session
+
+
+def test_histogram_quantiles_are_within_a_bucket() -> None:
+    """Reports quantiles no lower and at most 25% above the true value."""
+    histogram = Histogram()
+    for ns in range(1, 10_001):
+        histogram.observe(ns)
+    assert histogram.count() == 10_000
+    for q, exact in ((0.5, 5000), (0.9, 9000), (0.99, 9900)):
+        assert exact <= histogram.quantile(q) <= exact * 1.25
+    assert Histogram().quantile(0.5) == 0
+
+
+def test_session_records_lines_moves_and_errors() -> None:
+    """Counts commands, moves and rejections."""
+    registry = GameRegistry()
+    metrics = Metrics(registry.__len__)
+    session = Session(registry, metrics)
+    session.feed(b'e2-e4\ne2-e4\nhello\n// note\ne7-e5\n')
+
+    assert metrics.requests == 5
+    assert metrics.moves == 2
+    assert metrics.commands == {'error': 1, 'comment': 1}
+    assert metrics.errors == {'Invalid move': 1, 'scan error': 1}
+
+
+def test_session_times_sampled_moves() -> None:
+    """Times the stages of one request in `SAMPLE_EVERY`."""
+    metrics = Metrics()
+    session = Session(GameRegistry(), metrics)
+    shuffle = ('g1-f3', 'g8-f6', 'f3-g1', 'f6-g8') * SAMPLE_EVERY
+    session.feed(''.join(f'{move}\n' for move in shuffle).encode())
+
+    assert metrics.moves == 4 * SAMPLE_EVERY
+    for stage in ('parse', 'legality', 'format'):
+        assert metrics.latency[stage].count() == 4
+
+
+def test_stats_command_reports_metrics() -> None:
+    """Answers `stats` with the report, or says metrics are off."""
+    assert Session().handle('stats') == ('Metrics are disabled', False)
+
+    registry = GameRegistry()
+    metrics = Metrics(registry.__len__)
+    metrics.connected()
+    session = Session(registry, metrics)
+    session.feed(b'e2-e4\nhello\n')
+    report, game_over = session.handle('stats')
+    assert not game_over
+    lines = report.splitlines()
+    assert 'connections_active 1' in lines
+    assert 'games_active 1' in lines
+    assert 'moves_total 1' in lines
+    assert 'commands_total{command="move"} 1' in lines
+    assert 'commands_total{command="stats"} 1' in lines
+    assert 'errors_total{error="scan error"} 1' in lines
+    assert 'latency_us_count{stage="legality"} 0' in lines
+
+
+def test_binary_moves_are_recorded() -> None:
+    """Counts framed moves and times them like text ones."""
+    metrics = Metrics()
+    session = Session(GameRegistry(), metrics)
+    session.feed(b'binary\n')
+    move = encode_frame(Opcode.MOVE, encode_move(chess.Move.from_uci('e2e4')))
+    session.feed(move * SAMPLE_EVERY)
+    assert metrics.moves == 1
+    assert metrics.errors == {'Invalid move': SAMPLE_EVERY - 1}
+    assert metrics.latency['legality'].count() == 1
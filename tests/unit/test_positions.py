@@ -0,0 +1,106 @@
+# ruff: noqa: PLR2004
+import random
+from collections.abc import Iterator
+
+import chess
+import pytest
+
+from src.protocol import GameBoard
+from src.protocol.core import process_line
+from src.protocol.positions import PositionCache, evaluate, position_key
+
+
+@pytest.fixture
+def positions() -> Iterator[PositionCache]:
+    """Give `GameBoard` a fresh shared cache for the duration of a test."""
+    previous = GameBoard.positions
+    GameBoard.positions = PositionCache(max_entries=64, max_ply=8)
+    yield GameBoard.positions
+    GameBoard.positions = previous
+
+
+def test_evaluate_agrees_with_chess_board() -> None:
+    """Rebuilds legal moves, checkers and mate from the position key."""
+    rng = random.Random(3)
+    for _ in range(20):
+        board = chess.Board()
+        while not board.is_game_over() and board.ply() < 80:
+            position = evaluate(position_key(board))
+            assert position.legal == set(board.legal_moves), board.fen()
+            assert position.checkers == board.checkers_mask()
+            assert position.checkmate == board.is_checkmate()
+            board.push(rng.choice(list(board.legal_moves)))
+
+
+def test_transposition_is_a_hit(positions: PositionCache) -> None:
+    """Answers a position reached by another move order from the cache."""
+    boards = []
+    for line in ('g1f3 g8f6 b1c3', 'b1c3 g8f6 g1f3', 'g1f3 g8f6 b1c3'):
+        board = GameBoard()
+        for uci in line.split():
+            board.push_uci(uci)
+        boards.append(board)
+    e5 = chess.Move.from_uci('e7e5')
+    size = positions.info().currsize
+    assert boards[0].is_legal(e5)  # seen once, not admitted yet
+    assert positions.info().currsize == size
+    assert boards[1].is_legal(e5)  # seen twice, evaluated and admitted
+    assert positions.info().currsize == size + 1
+    hits = positions.info().hits
+    assert boards[2].is_legal(e5)
+    assert boards[2].is_check() is False
+    assert positions.info().hits == hits + 1
+
+
+def test_eviction_keeps_the_bound() -> None:
+    """Never holds more than `max_entries` positions."""
+    cache = PositionCache(max_entries=4, max_ply=20)
+    board = chess.Board()
+    for uci in ('g1f3', 'g8f6', 'f3g1', 'f6g8', 'b1c3', 'b8c6', 'c3b1', 'c6b8'):
+        cache.get(board)
+        cache.get(board)
+        board.push_uci(uci)
+    assert cache.info().currsize == 4
+
+
+@pytest.mark.usefixtures('positions')
+def test_shared_checkmate() -> None:
+    """Reports mate within the cached plies, first uncached then shared."""
+    for _ in range(3):
+        board = GameBoard()
+        for uci in ('f2f3', 'e7e5', 'g2g4', 'd8h4'):
+            board.push_uci(uci)
+        assert board.is_checkmate()
+        assert not board.is_legal(chess.Move.from_uci('e2e3'))
+
+
+@pytest.mark.usefixtures('positions')
+def test_king_to_rook_castling_on_a_warm_cache() -> None:
+    """Castles by king-to-rook once other games have cached the position."""
+    for _ in range(3):
+        board = GameBoard()
+        for line in ('e2-e4', 'e7-e5', 'g1-f3', 'b8-c6', 'f1-c4', 'f8-c5'):
+            process_line(board, line)
+        assert process_line(board, 'e1-h1') == '4. White king does a big castling from e1 to h1'
+
+
+def test_positions_past_ply_are_not_shared(positions: PositionCache) -> None:
+    """Leaves positions beyond `max_ply` to the board's own logic."""
+    board = GameBoard()
+    for uci in ('g1f3', 'g8f6', 'f3g1', 'f6g8') * 3:
+        board.push_uci(uci)
+    before = positions.info()
+    assert board.is_legal(chess.Move.from_uci('e2e4'))
+    assert positions.info() == before
+
+
+def test_share_positions_zero_disables() -> None:
+    """Turns sharing off with a zero-sized cache."""
+    previous = GameBoard.positions
+    try:
+        GameBoard.share_positions(0, 8)
+        assert GameBoard.positions is None
+        board = GameBoard()
+        assert board.is_legal(chess.Move.from_uci('e2e4'))
+    finally:
+        GameBoard.positions = previous
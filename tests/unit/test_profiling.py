@@ -0,0 +1,155 @@
+from pathlib import Path
+from threading import get_ident
+
+import chess
+
+from src.protocol.binary import Opcode, encode_frame, encode_move
+from src.protocol.scanner import scan
+from src.server.games import GameRegistry
+from src.server.listener import is_loopback
+from src.server.metrics import SAMPLE_EVERY, Metrics
+from src.server.profiling import ProfileMode, Profiler
+from src.server.session import Session
+
+SCHOLARS_MATE = b'e2-e4\ne7-e5\nd1-h5\nb8-c6\nf1-c4\ng8-f6\nh5-f7\n'
+
+
+def _cpu_stages(report: str, command: str) -> set[str]:
+    prefix = f'profile_cpu_us{{command="{command}",stage="'
+    lines = report.splitlines()
+    return {line.removeprefix(prefix).split('"')[0] for line in lines if line.startswith(prefix)}
+
+
+def test_deterministic_mode_times_every_stage() -> None:
+    """Records the CPU time of each stage of every request by command."""
+    profiler = Profiler(ProfileMode.DETERMINISTIC)
+    session = Session(GameRegistry(), profiler=profiler)
+    session.feed(b'e2-e4\ne2-e4\ndisplay_board\n')
+    session.done()
+
+    report = profiler.report()
+    assert 'profile_mode deterministic' in report.splitlines()
+    assert 'profile_requests_total{command="move"} 2' in report.splitlines()
+    assert 'profile_requests_total{command="display_board"} 1' in report.splitlines()
+    assert {'parse', 'legality', 'format', 'push', 'checkmate', 'check'} <= _cpu_stages(
+        report, 'move'
+    )
+    assert 'render' in _cpu_stages(report, 'display_board')
+    assert ('display_board', 'send') in profiler.cpu
+    assert profiler.totals['move'] > profiler.cpu['move', 'legality']
+
+
+def test_deterministic_mode_alongside_metrics() -> None:
+    """Times requests on the CPU clock when metrics time them too."""
+    profiler = Profiler(ProfileMode.DETERMINISTIC)
+    metrics = Metrics()
+    session = Session(GameRegistry(), metrics, profiler)
+    session.feed(b'// note\n' * (SAMPLE_EVERY + 44))
+    session.done()
+
+    assert metrics.latency['parse'].count()
+    assert profiler.cpu['comment', 'parse'] > 0
+    assert 0 < profiler.totals['comment'] < 10**12
+    assert all(ns >= 0 for ns in profiler.cpu.values())
+
+
+def test_deterministic_mode_times_binary_moves() -> None:
+    """Framed moves are profiled like text ones."""
+    profiler = Profiler(ProfileMode.DETERMINISTIC)
+    session = Session(GameRegistry(), profiler=profiler)
+    session.feed(b'binary\n')
+    session.feed(encode_frame(Opcode.MOVE, encode_move(chess.Move.from_uci('e2e4'))))
+
+    assert profiler.requests['move'] == 1
+    for stage in ('legality', 'push', 'format'):
+        assert ('move', stage) in profiler.cpu
+
+
+def test_profiled_games_play_like_unprofiled_ones() -> None:
+    """Profiling changes nothing in the replies."""
+    plain = Session(GameRegistry())
+    profiled = Session(GameRegistry(), profiler=Profiler(ProfileMode.BOTH, interval=3600))
+    try:
+        assert profiled.feed(SCHOLARS_MATE) == plain.feed(SCHOLARS_MATE)
+    finally:
+        profiled.profiler.close()
+
+
+def test_sampling_attributes_stacks_to_commands_and_stages() -> None:
+    """Samples busy threads only, keyed by command and outermost stage."""
+    profiler = Profiler(ProfileMode.SAMPLING, interval=3600)
+    try:
+        profiler.sample()
+        assert not profiler.stacks
+
+        def is_legal() -> None:
+            profiler.sample()
+
+        profiler.busy[get_ident()] = scan('e2-e4')
+        is_legal()
+        profiler.leave()
+        profiler.sample()
+    finally:
+        profiler.close()
+
+    assert profiler.stacks.total() == 1
+    assert 'profile_samples{command="move",stage="legality"} 1' in profiler.report().splitlines()
+    (line,) = profiler.collapsed().splitlines()
+    assert line.startswith('move;')
+    assert line.endswith('<locals>.is_legal;profiling:Profiler.sample 1')
+
+
+def test_profile_command_switches_modes_at_runtime(tmp_path: Path) -> None:
+    """`profile` reports, switches, dumps and resets the profile."""
+    assert Session(admin=True).handle('profile') == ('Profiling is disabled', False)
+
+    output = tmp_path / 'server.folded'
+    profiler = Profiler(output=output)
+    session = Session(GameRegistry(), profiler=profiler, admin=True)
+    assert session.handle('e2-e4')[0].startswith('1. ')
+    assert not profiler.requests
+    assert session.handle('profile dump') == ('No profile recorded', False)
+
+    assert session.handle('profile deterministic') == ('Profiling deterministic', False)
+    session.handle('e7-e5')
+    assert session.handle('profile nonsense') == ('Unknown profile action nonsense', False)
+    assert session.handle('profile')[0].startswith('profile_mode deterministic\n')
+    assert 'move;legality' in session.handle('profile dump')[0]
+
+    assert session.handle('profile off') == ('Profiling off', False)
+    assert 'move;legality' in output.read_text(encoding='utf-8')
+    assert session.handle('profile reset') == ('Profile reset', False)
+    assert not profiler.requests
+    assert not profiler.cpu
+
+
+def test_sampling_thread_starts_and_stops_with_the_mode() -> None:
+    """Only the sampling modes run the sampler thread."""
+    profiler = Profiler(interval=3600)
+    assert profiler._thread is None
+    profiler.switch(ProfileMode.BOTH)
+    assert profiler._thread.is_alive()
+    assert profiler.sampling
+    assert profiler.deterministic
+    profiler.switch(ProfileMode.DETERMINISTIC)
+    assert profiler._thread is None
+    assert not profiler.sampling
+    profiler.close()
+    assert profiler.mode == ProfileMode.OFF
+    assert not profiler.deterministic
+
+
+def test_profile_command_is_refused_to_remote_connections() -> None:
+    """Only connections from this host may control the profiler."""
+    profiler = Profiler()
+    session = Session(GameRegistry(), profiler=profiler)
+    for line in ('profile', 'profile both', 'profile dump', 'profile reset'):
+        assert session.handle(line) == ('Profiling is restricted to local connections', False)
+    assert profiler.mode == ProfileMode.OFF
+
+    assert is_loopback(('127.0.0.1', 5000))
+    assert is_loopback(('::1', 5000, 0, 0))
+    assert is_loopback(('::ffff:127.0.0.1', 5000, 0, 0))
+    assert not is_loopback(('192.0.2.7', 5000))
+    assert not is_loopback(('2001:db8::1', 5000, 0, 0))
+    assert not is_loopback(None)
@@ -2,8 +2,39 @@
 import chess
 import pytest
 
-from src.protocol import GameOver, process_line
-from src.protocol.core import _display_board
+from src.constants import PIECE_NAME
+from src.protocol import GameOver, MoveEvent, describe_move, process_line
+from src.protocol.core import _display_board, color_name
+
+
+def reference_describe_move(event: MoveEvent) -> str:
+    """Return the protocol message for a move event, built from scratch."""
+    color = color_name(event.color)
+    src = chess.square_name(event.from_square)
+    dst = chess.square_name(event.to_square)
+
+    if event.castling:
+        side = 'little' if dst[0] == 'g' else 'big'
+        message = (
+            f'{event.move_no}. {color.title()} king does a {side} castling from {src} to {dst}'
+        )
+    elif event.captured is not None:
+        name = PIECE_NAME[event.piece_type]
+        captured_color = color_name(not event.color)
+        captured_name = PIECE_NAME[event.captured]
+        message = (
+            f'{event.move_no}. {color.title()} {name} on {src} takes {captured_color} '
+            f'{captured_name} on {dst}'
+        )
+    else:
+        name = PIECE_NAME[event.piece_type]
+        message = f'{event.move_no}. {color.title()} {name} moves from {src} to {dst}'
+
+    if event.checkmate:
+        return f'{message}. Checkmate, {color} wins'
+    if event.check:
+        return f'{message}. Check'
+    return message
 
 
 def test_handle_line_legal_move(board) -> None:
@@ -106,3 +137,49 @@ def test_handle_line_scan_error(board) -> None:
     """Returns scan error for unsupported input line."""
     out = process_line(board, 'not a thing')
     assert out == 'scan error'
+
+
+def test_handle_line_null_move(board) -> None:
+    """Rejects a well-formed move that does not leave its square."""
+    out = process_line(board, 'a1-a1')
+    assert out == 'Invalid move'
+    assert len(board.move_stack) == 0
+
+
+@pytest.mark.parametrize('color', [chess.WHITE, chess.BLACK])
+def test_describe_move_matches_reference(color: chess.Color) -> None:
+    """Table-built messages are identical to the ones built from scratch."""
+    for from_square in chess.SQUARES:
+        for to_square in chess.SQUARES[::7]:
+            for piece_type in chess.PIECE_TYPES:
+                for captured in (None, *chess.PIECE_TYPES[:-1]):
+                    for check, checkmate in ((False, False), (True, False), (True, True)):
+                        event = MoveEvent(
+                            (from_square + to_square) * 7 % 600 + 1,
+                            color,
+                            piece_type,
+                            from_square,
+                            to_square,
+                            captured,
+                            check=check,
+                            checkmate=checkmate,
+                        )
+                        assert describe_move(event) == reference_describe_move(event)
+
+
+def test_describe_castling_matches_reference() -> None:
+    """Castling messages are identical to the ones built from scratch."""
+    for color, rank in ((chess.WHITE, 0), (chess.BLACK, 7)):
+        for to_file in (2, 6):
+            event = MoveEvent(
+                12,
+                color,
+                chess.KING,
+                chess.square(4, rank),
+                chess.square(to_file, rank),
+                castling=True,
+            )
+            assert describe_move(event) == reference_describe_move(event)
+            assert describe_move(event._replace(check=True)) == reference_describe_move(
+                event._replace(check=True)
+            )
@@ -0,0 +1,33 @@
+import random
+
+import chess
+
+from src.protocol.core import _display_board
+from src.protocol.render import render_board, render_cache_info
+
+
+def test_render_matches_display_board_over_random_games() -> None:
+    """Renders byte-identical snapshots after every move of random games."""
+    rng = random.Random(7)
+    for _ in range(20):
+        board = chess.Board()
+        for _ in range(120):
+            moves = list(board.legal_moves)
+            if not moves:
+                break
+            board.push(rng.choice(moves))
+            assert render_board(board) == _display_board(board)
+
+
+def test_render_matches_sparse_positions(white_castling_board) -> None:
+    """Handles jumps between unrelated positions, empty boards included."""
+    for board in (white_castling_board, chess.Board(None), chess.Board(), white_castling_board):
+        assert render_board(board) == _display_board(board)
+
+
+def test_render_serves_repeated_polls_from_cache(board) -> None:
+    """Polling an unchanged position hits the cache."""
+    render_board(board)
+    hits = render_cache_info().hits
+    render_board(board)
+    assert render_cache_info().hits == hits + 1
@@ -0,0 +1,41 @@
+# ruff: noqa: PLR2004
+from pathlib import Path
+
+from src.protocol.replay import Result, replay_file
+
+
+def test_replay_reports_first_rejected_line(tmp_path: Path) -> None:
+    """Goes on after rejected lines like the server, reporting the first."""
+    game = tmp_path / 'game.txt'
+    game.write_text('// opening\ne2-e4\ne2-e4\n\nbogus\ne7-e5\n', encoding='utf-8')
+    summary = replay_file(game)
+    assert summary.result == Result.INVALID
+    assert summary.moves == 2
+    assert summary.first_invalid == 3
+    assert summary.detail == 'e2-e4'
+
+
+def test_replay_stops_at_checkmate(tmp_path: Path) -> None:
+    """Ends at checkmate without reading further lines."""
+    game = tmp_path / 'mate.txt'
+    game.write_text('e2-e4\ne7-e5\nd1-h5\nb8-c6\nf1-c4\ng8-f6\nh5-f7\nbogus\n', encoding='utf-8')
+    summary = replay_file(game)
+    assert summary.result == Result.CHECKMATE
+    assert summary.moves == 7
+    assert summary.first_invalid is None
+
+
+def test_replay_accepts_empty_and_unterminated_files(tmp_path: Path) -> None:
+    """Handles files that cannot be mapped or lack a final newline."""
+    empty, short = tmp_path / 'empty.txt', tmp_path / 'short.txt'
+    empty.write_bytes(b'')
+    short.write_bytes(b'e2-e4\r\ndisplay_board')
+    assert replay_file(empty).result == Result.OK
+    assert replay_file(short)[1:3] == (Result.OK, 1)
+
+
+def test_replay_reports_unreadable_files(tmp_path: Path) -> None:
+    """Reports a missing file instead of raising."""
+    summary = replay_file(tmp_path / 'missing.txt')
+    assert summary.result == Result.UNREADABLE
+    assert summary.detail
@@ -0,0 +1,58 @@
+import chess
+import pytest
+
+from src.protocol.scanner import COMMENT_TOKEN, ERROR_TOKEN, TokenKind, scan
+from src.validation import COMMENT, STRIKE, Command, parse_command
+
+
+def test_scan_decodes_moves_in_any_case() -> None:
+    """Returns the decoded move for well-formed strikes."""
+    for line in ('e2-e4', 'E2-E4', 'e2-E4'):
+        token = scan(line)
+        assert token.kind == TokenKind.MOVE
+        assert token.move == chess.Move(chess.E2, chess.E4)
+
+
+def test_scan_classifies_comments_and_commands(valid_comment) -> None:
+    """Recognizes comments and every protocol command."""
+    assert scan(valid_comment) is COMMENT_TOKEN
+    assert scan('//') is COMMENT_TOKEN
+    for command in Command:
+        assert scan(command.value).command is command
+
+
+@pytest.mark.parametrize(
+    'line',
+    ['', 'a4-_h', 'a2a3', 'a1-e', 'a9-a1', 'e2-e45', 'DISPLAY_BOARD', 'display_board x', '/ x'],
+)
+def test_scan_rejects_garbage(line) -> None:
+    """Returns the error token for anything else."""
+    assert scan(line) is ERROR_TOKEN
+
+
+@pytest.mark.parametrize(
+    'line',
+    ['a2-a4', 'H7-h5', '// note', '//', 'display_board', 'binary', 'nope', 'a1-i1', 'b2-b'],
+)
+def test_scan_agrees_with_regex_cascade(line) -> None:
+    """Classifies lines exactly like the STRIKE/COMMENT/Command cascade."""
+    token = scan(line)
+    if STRIKE.fullmatch(line):
+        assert token.kind == TokenKind.MOVE
+    elif COMMENT.fullmatch(line):
+        assert token.kind == TokenKind.COMMENT
+    elif parse_command(line) is not None:
+        assert token.command == parse_command(line)
+    else:
+        assert token.kind == TokenKind.ERROR
+
+
+def test_scan_keeps_command_arguments() -> None:
+    """Splits the argument off the commands that take one."""
+    assert scan('join_game ab12').argument == 'ab12'
+    token = scan('resume  Zq-9_x ')
+    assert token.command is Command.RESUME
+    assert token.argument == 'Zq-9_x'
+    assert scan('resume').argument == ''
+    assert scan('profile sampling').argument == 'sampling'
+    assert scan('stats now') is ERROR_TOKEN
@@ -0,0 +1,218 @@
+# ruff: noqa: PLR2004
+import chess
+import pytest
+
+from src.protocol import describe_move
+from src.protocol.binary import FrameDecoder, Opcode, decode_event, encode_frame, encode_move
+from src.server.fanout import Subscriber
+from src.server.games import GameRegistry, RegistryFull, Seat
+from src.server.session import MAX_LINE, Session
+
+SCHOLARS_MATE = b'e2-e4\ne7-e5\nd1-h5\nb8-c6\nf1-c4\ng8-f6\nh5-f7\n'
+
+
+def test_feed_batches_replies_in_order() -> None:
+    """Handles every complete line and concatenates the replies."""
+    replies, game_over = Session().feed(b'e2-e4\ne7-e5\n')
+    assert replies == b'1. White pawn moves from e2 to e4\n\n1. Black pawn moves from e7 to e5\n\n'
+    assert not game_over
+
+
+def test_feed_buffers_partial_lines() -> None:
+    """Keeps an unterminated line until the rest of it arrives."""
+    session = Session()
+    assert session.feed(b'e2-') == (b'', False)
+    assert session.partial
+    assert session.feed(b'e4\ne7') == (b'1. White pawn moves from e2 to e4\n\n', False)
+    assert session.feed(b'') == (b'scan error\n\n', False)
+    assert not session.partial
+
+
+def test_feed_stops_at_game_over() -> None:
+    """Discards lines that follow the move ending the game."""
+    replies, game_over = Session().feed(SCHOLARS_MATE + b'display_board\n')
+    assert game_over
+    assert replies.endswith(b'Checkmate, white wins\n\n')
+    assert replies.count(b'\n\n') == 7
+
+
+def test_feed_rejects_overlong_lines() -> None:
+    """Refuses to buffer a line without end."""
+    with pytest.raises(ValueError, match='exceeds'):
+        Session().feed(b'x' * (MAX_LINE + 1))
+
+
+def test_feed_switches_to_binary_frames() -> None:
+    """Reads frames after the `binary` line, even within the same chunk."""
+    session = Session()
+    data = b'binary\n' + encode_frame(Opcode.MOVE, encode_move(chess.Move.from_uci('e2e4')))
+    replies, game_over = session.feed(data + encode_frame(Opcode.MOVE, b'\x00\x00'))
+    assert not game_over
+    assert session.binary
+
+    ack = b'OK\n\n'
+    assert replies.startswith(ack)
+    frames = FrameDecoder().feed(replies[len(ack) :])
+    assert [opcode for opcode, _ in frames] == [Opcode.EVENT, Opcode.INVALID]
+    assert describe_move(decode_event(frames[0][1])) == '1. White pawn moves from e2 to e4'
+
+
+def test_lobby_players_share_a_game() -> None:
+    """Two sessions play one game by ID, each on its own color."""
+    registry = GameRegistry()
+    white, black = Session(registry), Session(registry)
+
+    response, _ = white.handle('start_game')
+    game_id = white.game.game_id
+    tokens = white.game.tokens
+    assert response == f'Game {game_id} started, you play white\nResume token {tokens[Seat.WHITE]}'
+    response, _ = black.handle(f'join_game {game_id}')
+    assert response == f'Joined game {game_id} as black\nResume token {tokens[Seat.BLACK]}'
+
+    assert black.handle('e7-e5') == ('Not your turn', False)
+    assert white.handle('e2-e4') == ('1. White pawn moves from e2 to e4', False)
+    assert white.handle('d2-d4') == ('Not your turn', False)
+    assert black.handle('e7-e5') == ('1. Black pawn moves from e7 to e5', False)
+    assert white.game is black.game
+    assert white.board.fen() == black.board.fen()
+
+
+def test_lobby_spectators_cannot_move() -> None:
+    """A third connection watches the game instead of playing."""
+    registry = GameRegistry()
+    white, black, watcher = Session(registry), Session(registry), Session(registry)
+    white.handle('start_game')
+    game_id = white.game.game_id
+    black.handle(f'join_game {game_id}')
+
+    assert watcher.handle(f'join_game {game_id}') == (f'Watching game {game_id}', False)
+    assert watcher.handle('e2-e4') == ('Spectators cannot move', False)
+    assert watcher.handle('end_game') == (f'Left game {game_id}', False)
+    assert registry.get(game_id) is white.game
+
+
+def test_moves_are_broadcast_to_opponent_and_spectators() -> None:
+    """A legal move reaches everyone but the mover, in their own framing."""
+    registry = GameRegistry()
+    white, black, watcher = Session(registry), Session(registry), Session(registry)
+    for session in (white, black, watcher):
+        session.subscriber = Subscriber(lambda: None)
+    white.handle('start_game')
+    game_id = white.game.game_id
+    black.handle(f'join_game {game_id}')
+    watcher.feed(b'binary\n')
+    watcher.handle(f'join_game {game_id}')
+
+    white.handle('e2-e4')
+    white.handle('e7-e5')
+    assert white.subscriber.drain() == []
+    assert black.subscriber.drain() == [b'1. White pawn moves from e2 to e4\n\n']
+    (frame,) = watcher.subscriber.drain()
+    assert FrameDecoder().feed(frame) == [(Opcode.TEXT, b'1. White pawn moves from e2 to e4')]
+
+
+def test_lobby_end_game_and_unknown_ids() -> None:
+    """Ending a game removes it; its players are told when they act."""
+    registry = GameRegistry()
+    white, black = Session(registry), Session(registry)
+    white.handle('start_game')
+    game_id = white.game.game_id
+    black.handle(f'join_game {game_id}')
+
+    assert white.handle('end_game') == (f'Game {game_id} ended', False)
+    assert black.handle('e7-e5') == (f'Game {game_id} ended', False)
+    assert black.handle(f'join_game {game_id}') == (f'Unknown game {game_id}', False)
+    assert white.handle('e2-e4') == ('1. White pawn moves from e2 to e4', False)
+
+
+def test_solo_games_leave_with_their_connection() -> None:
+    """The implicit game of a connection is dropped when it disconnects."""
+    registry = GameRegistry()
+    session = Session(registry)
+    assert len(registry) == 1
+    session.close()
+    assert len(registry) == 0
+
+
+def test_resume_reattaches_a_dropped_player() -> None:
+    """A new connection takes over a seat by token and plays on from there."""
+    registry = GameRegistry()
+    white, black = Session(registry), Session(registry)
+    white.handle('start_game')
+    game = white.game
+    black.handle(f'join_game {game.game_id}')
+    white.handle('e2-e4')
+    black.close()
+
+    again = Session(registry)
+    response, _ = again.handle(f'resume {game.tokens[Seat.BLACK]}')
+    assert response == f'Resumed game {game.game_id} as black'
+    assert again.game is game
+    assert again.handle('e7-e5') == ('1. Black pawn moves from e7 to e5', False)
+    assert len(registry) == 1
+
+
+def test_resume_unseats_a_connection_that_did_not_notice_the_drop() -> None:
+    """The previous holder of a resumed seat is refused from then on."""
+    registry = GameRegistry()
+    stale = Session(registry)
+    token = stale.handle('resume')[0].removeprefix('Resume token ')
+    game = stale.game
+
+    again = Session(registry)
+    assert again.handle(f'resume {token}') == (f'Resumed game {game.game_id} as solo', False)
+    assert again.handle(f'resume {token}') == (f'Already in game {game.game_id}', False)
+    assert stale.handle('e2-e4') == (f'Game {game.game_id} was resumed elsewhere', False)
+    stale.close()
+    assert again.handle('e2-e4') == ('1. White pawn moves from e2 to e4', False)
+
+
+def test_solo_games_with_a_token_outlive_their_connection() -> None:
+    """A solo game that can be resumed waits for its player instead."""
+    registry = GameRegistry()
+    session = Session(registry)
+    session.handle('e2-e4')
+    response, _ = session.handle('resume')
+    token = response.removeprefix('Resume token ')
+    assert session.handle('resume') == (response, False)
+    session.close()
+    assert len(registry) == 1
+
+    again = Session(registry)
+    again.handle(f'resume {token}')
+    assert again.board.fen() == session.board.fen()
+    assert len(registry) == 1
+
+
+def test_solo_games_go_with_a_clean_close() -> None:
+    """A client ending its stream takes its solo game along, token or not."""
+    registry = GameRegistry()
+    session = Session(registry)
+    token = session.handle('resume')[0].removeprefix('Resume token ')
+    session.close(clean=True)
+    assert len(registry) == 0
+    assert registry.resumable(token) is None
+
+
+def test_resume_refuses_unknown_and_ended_games() -> None:
+    """Tokens are forgotten with their game; spectators get none."""
+    registry = GameRegistry()
+    white, black, watcher = Session(registry), Session(registry), Session(registry)
+    white.handle('start_game')
+    token = white.game.tokens[Seat.WHITE]
+    black.handle(f'join_game {white.game.game_id}')
+    watcher.handle(f'join_game {white.game.game_id}')
+    assert watcher.handle('resume') == ('Spectators cannot resume', False)
+
+    white.handle('end_game')
+    assert Session(registry).handle(f'resume {token}') == ('Unknown resume token', False)
+    assert Session(registry).handle('resume nope') == ('Unknown resume token', False)
+
+
+def test_session_refused_when_registry_full() -> None:
+    """A new connection cannot start when no game fits."""
+    registry = GameRegistry(max_games=1)
+    session = Session(registry)
+    with pytest.raises(RegistryFull):
+        Session(registry)
+    assert session.handle('start_game') == ('Server is full', False)
@@ -13,6 +13,8 @@ from src.validation import (
     validate_filename,
     validate_interface,
     validate_port,
+    validate_window,
+    validate_workers,
 )
 
 
@@ -35,6 +37,22 @@ def test_validate_port() -> None:
         validate_port(65536)
 
 
+def test_validate_workers() -> None:
+    """Accepts one or more workers and rejects zero."""
+    assert validate_workers(1) == 1
+    assert validate_workers(8) == 8
+    with pytest.raises(typer.BadParameter):
+        validate_workers(0)
+
+
+def test_validate_window() -> None:
+    """Accepts a window of one or more moves and rejects zero."""
+    assert validate_window(1) == 1
+    assert validate_window(64) == 64
+    with pytest.raises(typer.BadParameter):
+        validate_window(0)
+
+
 def test_strike_regex() -> None:
     """Matches valid strike moves and rejects invalid squares."""
     assert STRIKE.fullmatch('a2-a4')